@@ -1,4 +1,5 @@
 import asyncio
+import re
 from logging.config import fileConfig
 
 from sqlalchemy.engine import Connection
@@ -6,7 +7,10 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
+from alembic.script import ScriptDirectory
 
+from workout_api.configs.settings import settings
+from workout_api.contrib.migrations import MigrationLinter
 from workout_api.contrib.models import BaseModel
 from workout_api.contrib.repository.models import *
 
@@ -20,12 +24,26 @@ if config.config_file_name is not None:
 
 target_metadata = BaseModel.metadata
 
+# Revisions written before the online migration helpers are not linted.
+LINT_BASELINE = '71a993e9f9ce'
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Hash partitions of `athletes` belong to the partition_athletes migration.
+    if type_ == 'table' and reflected and re.fullmatch(r'athletes_p\d+', name):
+        return False
+    # So does the optional read model of the add_athlete_listings migration.
+    if type_ == 'table' and reflected and name == 'athlete_listings':
+        return False
+    return True
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -35,9 +53,18 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
+    script = ScriptDirectory.from_config(config)
+    linter = MigrationLinter(
+        settings.migration_lint,
+        {revision.revision for revision in script.iterate_revisions(LINT_BASELINE, 'base')}
+    )
+    linter.attach(connection)
+
     context.configure(
         connection=connection,
-        target_metadata=target_metadata
+        target_metadata=target_metadata,
+        include_object=include_object,
+        on_version_apply=linter.on_version_apply
     )
 
     with context.begin_transaction():
@@ -0,0 +1,67 @@
+"""add_workout_leaderboards
+
+Revision ID: 71a993e9f9ce
+Revises: 7065c55a4884
+Create Date: 2025-09-26 18:12:40.774120
+
+Materialized view with the best score of every live athlete on every
+workout, ranked within its category and within its training center. It is
+refreshed concurrently by the app (see `workout_result/leaderboards.py`),
+which needs the unique index.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '71a993e9f9ce'
+down_revision: Union[str, Sequence[str], None] = '7065c55a4884'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE MATERIALIZED VIEW workout_leaderboards AS
+        WITH scores AS (
+            SELECT 'category' AS scope, category_id AS scope_id, workout, athlete_id,
+                   max(score) AS high, min(score) AS low
+            FROM workout_results
+            GROUP BY category_id, workout, athlete_id
+            UNION ALL
+            SELECT 'training_center', training_center_id, workout, athlete_id,
+                   max(score), min(score)
+            FROM workout_results
+            GROUP BY training_center_id, workout, athlete_id
+        )
+        SELECT scores.scope, scores.scope_id, scores.workout,
+               athletes.id AS athlete_id, athletes.name,
+               scores.high, scores.low,
+               rank() OVER (PARTITION BY scores.scope, scores.scope_id, scores.workout
+                            ORDER BY scores.high DESC) AS high_rank,
+               rank() OVER (PARTITION BY scores.scope, scores.scope_id, scores.workout
+                            ORDER BY scores.low ASC) AS low_rank
+        FROM scores
+        JOIN athletes ON athletes.pk_id = scores.athlete_id AND athletes.deleted_at IS NULL
+    """)
+    op.create_index(
+        'ix_workout_leaderboards_athlete_id', 'workout_leaderboards',
+        ['athlete_id', 'workout', 'scope', 'scope_id'], unique=True
+    )
+    op.create_index(
+        'ix_workout_leaderboards_high_rank', 'workout_leaderboards',
+        ['scope', 'scope_id', 'workout', 'high_rank']
+    )
+    op.create_index(
+        'ix_workout_leaderboards_low_rank', 'workout_leaderboards',
+        ['scope', 'scope_id', 'workout', 'low_rank']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP MATERIALIZED VIEW workout_leaderboards')
@@ -0,0 +1,48 @@
+"""add_athlete_search_indexes
+
+Revision ID: 88241355e8f6
+Revises: 71a993e9f9ce
+Create Date: 2025-09-27 10:05:12.381904
+
+Composite indexes for the athlete search filters. They are built
+concurrently, and replace the single column indexes they start with.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from workout_api.contrib.migrations import create_index_concurrently, drop_index_concurrently, guard
+
+
+# revision identifiers, used by Alembic.
+revision: str = '88241355e8f6'
+down_revision: Union[str, Sequence[str], None] = '71a993e9f9ce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LIVE = 'deleted_at IS NULL'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    guard()
+    create_index_concurrently(
+        'ix_athletes_category_id_gender_age_live', 'athletes', ['category_id', 'gender', 'age'], where=LIVE
+    )
+    create_index_concurrently(
+        'ix_athletes_training_center_id_created_at_live', 'athletes', ['training_center_id', 'created_at'], where=LIVE
+    )
+    drop_index_concurrently('ix_athletes_category_id_live', 'athletes')
+    drop_index_concurrently('ix_athletes_training_center_id_live', 'athletes')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    guard()
+    create_index_concurrently('ix_athletes_category_id_live', 'athletes', ['category_id'], where=LIVE)
+    create_index_concurrently('ix_athletes_training_center_id_live', 'athletes', ['training_center_id'], where=LIVE)
+    drop_index_concurrently('ix_athletes_training_center_id_created_at_live', 'athletes')
+    drop_index_concurrently('ix_athletes_category_id_gender_age_live', 'athletes')
@@ -0,0 +1,117 @@
+"""partition_athletes
+
+Revision ID: 949d65b07007
+Revises: b8f70829e6fe
+Create Date: 2025-09-20 16:31:48.027114
+
+Optional: only runs when ATHLETE_PARTITIONS is set, hash partitioning
+`athletes` by `training_center_id` into that many partitions. Run it with the
+same setting the app uses, since `AthleteModel` follows it too.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from workout_api.configs.settings import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '949d65b07007'
+down_revision: Union[str, Sequence[str], None] = 'b8f70829e6fe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LIVE = 'WHERE deleted_at IS NULL'
+
+
+def _is_partitioned() -> bool:
+    return bool(op.get_bind().scalar(sa.text(
+        "SELECT count(*) FROM pg_partitioned_table WHERE partrelid = 'athletes'::regclass"
+    )))
+
+
+def _create_indexes(unique_keys: bool) -> None:
+    unique = 'UNIQUE ' if unique_keys else ''
+    op.execute(f'CREATE {unique}INDEX ix_athletes_id ON athletes (id)')
+    op.execute('CREATE INDEX ix_athletes_updated_at_pk_id ON athletes (updated_at, pk_id)')
+    op.execute(f'CREATE {unique}INDEX ix_athletes_document_live ON athletes (document) {LIVE}')
+    op.execute(f'CREATE INDEX ix_athletes_name_live ON athletes (name) {LIVE}')
+    op.execute(f'CREATE INDEX ix_athletes_category_id_live ON athletes (category_id) {LIVE}')
+    op.execute(f'CREATE INDEX ix_athletes_training_center_id_live ON athletes (training_center_id) {LIVE}')
+
+
+def _swap_table(partitions: int) -> None:
+    partition_by = ' PARTITION BY HASH (training_center_id)' if partitions else ''
+    op.execute(f'CREATE TABLE athletes_new (LIKE athletes INCLUDING DEFAULTS){partition_by}')
+    for remainder in range(partitions):
+        op.execute(
+            f'CREATE TABLE athletes_p{remainder} PARTITION OF athletes_new '
+            f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})'
+        )
+    op.execute('INSERT INTO athletes_new SELECT * FROM athletes')
+    op.execute('ALTER SEQUENCE athletes_pk_id_seq OWNED BY NONE')
+    op.execute('DROP TABLE athletes')
+    op.execute('ALTER TABLE athletes_new RENAME TO athletes')
+    op.execute('ALTER SEQUENCE athletes_pk_id_seq OWNED BY athletes.pk_id')
+
+    primary_key = 'pk_id, training_center_id' if partitions else 'pk_id'
+    op.execute(f'ALTER TABLE athletes ADD CONSTRAINT athletes_pkey PRIMARY KEY ({primary_key})')
+    op.execute(
+        'ALTER TABLE athletes ADD CONSTRAINT athletes_category_id_fkey '
+        'FOREIGN KEY (category_id) REFERENCES categories (pk_id)'
+    )
+    op.execute(
+        'ALTER TABLE athletes ADD CONSTRAINT athletes_training_center_id_fkey '
+        'FOREIGN KEY (training_center_id) REFERENCES training_centers (pk_id)'
+    )
+    _create_indexes(unique_keys=not partitions)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not settings.athlete_partitions or _is_partitioned():
+        return
+
+    _swap_table(settings.athlete_partitions)
+
+    # Global uniqueness of live documents and of ids, which the partitions
+    # cannot enforce on their own.
+    op.create_table('athlete_keys',
+    sa.Column('document', sa.String(length=14), nullable=False),
+    sa.Column('athlete_id', sa.UUID(), nullable=False),
+    sa.PrimaryKeyConstraint('document'),
+    sa.UniqueConstraint('athlete_id')
+    )
+    op.execute(f'INSERT INTO athlete_keys (document, athlete_id) SELECT document, id FROM athletes {LIVE}')
+    op.execute("""
+        CREATE FUNCTION athletes_sync_keys() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.deleted_at IS NULL THEN
+                DELETE FROM athlete_keys WHERE document = OLD.document;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.deleted_at IS NULL THEN
+                INSERT INTO athlete_keys (document, athlete_id) VALUES (NEW.document, NEW.id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER athletes_sync_keys
+        AFTER INSERT OR DELETE OR UPDATE OF document, deleted_at ON athletes
+        FOR EACH ROW EXECUTE PROCEDURE athletes_sync_keys()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _is_partitioned():
+        return
+
+    op.execute('DROP TRIGGER athletes_sync_keys ON athletes')
+    op.execute('DROP FUNCTION athletes_sync_keys()')
+    op.drop_table('athlete_keys')
+    _swap_table(0)
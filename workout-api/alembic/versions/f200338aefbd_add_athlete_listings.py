@@ -0,0 +1,165 @@
+"""add_athlete_listings
+
+Revision ID: f200338aefbd
+Revises: 88241355e8f6
+Create Date: 2025-09-28 09:41:27.560318
+
+Optional: only runs when ATHLETE_LISTINGS is set. Creates `athlete_listings`,
+a read model with the live athletes and their category and training center
+names, kept in sync by triggers on the three tables, so the athlete reads
+need no joins. Its indexes cover the lookups and the searches of
+`GET /athletes`, for index-only scans.
+
+Run it with the setting before enabling it in the app: existing athletes are
+copied in batches after the triggers are in place.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from workout_api.configs.settings import settings
+from workout_api.contrib.migrations import backfill_insert, guard
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f200338aefbd'
+down_revision: Union[str, Sequence[str], None] = '88241355e8f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = [
+    'pk_id', 'id', 'name', 'document', 'age', 'weight', 'height', 'gender',
+    'category_id', 'training_center_id', 'created_at', 'updated_at',
+]
+# Columns of `AthleteShort`, which every covering index includes.
+SHORT = ['id', 'name', 'created_at', 'updated_at', 'category_name', 'training_center_name']
+DETAIL = SHORT + ['document', 'age', 'weight', 'height', 'gender']
+
+_athlete_values = ', '.join(f'athletes.{column}' for column in COLUMNS)
+_new_values = ', '.join(f'NEW.{column}' for column in COLUMNS)
+_listing_columns = COLUMNS + ['category_name', 'training_center_name']
+
+
+def _create_read_model() -> None:
+    op.create_table('athlete_listings',
+    sa.Column('pk_id', sa.Integer(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('document', sa.String(length=14), nullable=False),
+    sa.Column('age', sa.Integer(), nullable=False),
+    sa.Column('weight', sa.Float(), nullable=False),
+    sa.Column('height', sa.Float(), nullable=False),
+    sa.Column('gender', sa.String(length=1), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('training_center_id', sa.Integer(), nullable=False),
+    sa.Column('category_name', sa.String(length=10), nullable=False),
+    sa.Column('training_center_name', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('pk_id')
+    )
+    # Built while the table is still empty.
+    op.create_index(
+        'ix_athlete_listings_id', 'athlete_listings', ['id'], unique=True,
+        postgresql_include=[column for column in DETAIL if column != 'id']
+    )
+    op.create_index(
+        'ix_athlete_listings_document', 'athlete_listings', ['document'], unique=True,
+        postgresql_include=[column for column in DETAIL if column != 'document']
+    )
+    op.create_index(
+        'ix_athlete_listings_category_id_gender_age', 'athlete_listings', ['category_id', 'gender', 'age'],
+        postgresql_include=SHORT + ['weight', 'pk_id']
+    )
+    op.create_index(
+        'ix_athlete_listings_training_center_id_created_at', 'athlete_listings',
+        ['training_center_id', 'created_at'],
+        postgresql_include=[column for column in SHORT if column != 'created_at'] + ['gender', 'pk_id']
+    )
+    op.create_index(
+        'ix_athlete_listings_updated_at_pk_id', 'athlete_listings', ['updated_at', 'pk_id'],
+        postgresql_include=[column for column in SHORT if column != 'updated_at']
+    )
+
+    op.execute(f"""
+        CREATE FUNCTION athlete_listings_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM athlete_listings WHERE pk_id = OLD.pk_id;
+            ELSIF NEW.deleted_at IS NOT NULL THEN
+                DELETE FROM athlete_listings WHERE pk_id = NEW.pk_id;
+            ELSE
+                INSERT INTO athlete_listings ({', '.join(_listing_columns)})
+                SELECT {_new_values}, categories.name, training_centers.name
+                FROM categories, training_centers
+                WHERE categories.pk_id = NEW.category_id AND training_centers.pk_id = NEW.training_center_id
+                ON CONFLICT (pk_id) DO UPDATE SET
+                    {', '.join(f'{column} = EXCLUDED.{column}' for column in COLUMNS[1:])},
+                    category_name = EXCLUDED.category_name,
+                    training_center_name = EXCLUDED.training_center_name;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER athlete_listings_sync
+        AFTER INSERT OR UPDATE OR DELETE ON athletes
+        FOR EACH ROW EXECUTE PROCEDURE athlete_listings_sync()
+    """)
+    for table, column in (('categories', 'category'), ('training_centers', 'training_center')):
+        op.execute(f"""
+            CREATE FUNCTION athlete_listings_sync_{column}() RETURNS trigger AS $$
+            BEGIN
+                UPDATE athlete_listings SET {column}_name = NEW.name WHERE {column}_id = NEW.pk_id;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(f"""
+            CREATE TRIGGER athlete_listings_sync_{column}
+            AFTER UPDATE OF name ON {table}
+            FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+            EXECUTE PROCEDURE athlete_listings_sync_{column}()
+        """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not settings.athlete_listings:
+        return
+
+    guard()
+    # Already there when a previous run failed while copying: resume the copy.
+    if op.get_bind().scalar(sa.text("SELECT to_regclass('athlete_listings')")) is None:
+        _create_read_model()
+
+    # Locking the batch makes writes to its athletes wait for it, so their
+    # triggers see the copied rows instead of racing with the copy.
+    backfill_insert(
+        'athlete_listings', _listing_columns,
+        f'SELECT {_athlete_values}, categories.name, training_centers.name FROM athletes '
+        'JOIN categories ON categories.pk_id = athletes.category_id '
+        'JOIN training_centers ON training_centers.pk_id = athletes.training_center_id '
+        'WHERE athletes.pk_id >= :start AND athletes.pk_id < :stop AND athletes.deleted_at IS NULL '
+        'FOR SHARE OF athletes',
+        'athletes',
+    )
+    # Index-only scans skip the table only for pages marked all-visible.
+    with op.get_context().autocommit_block():
+        op.execute('VACUUM ANALYZE athlete_listings')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    guard()
+    op.execute('DROP TRIGGER IF EXISTS athlete_listings_sync_training_center ON training_centers')
+    op.execute('DROP TRIGGER IF EXISTS athlete_listings_sync_category ON categories')
+    op.execute('DROP TRIGGER IF EXISTS athlete_listings_sync ON athletes')
+    op.execute('DROP FUNCTION IF EXISTS athlete_listings_sync_training_center()')
+    op.execute('DROP FUNCTION IF EXISTS athlete_listings_sync_category()')
+    op.execute('DROP FUNCTION IF EXISTS athlete_listings_sync()')
+    op.execute('DROP TABLE IF EXISTS athlete_listings')
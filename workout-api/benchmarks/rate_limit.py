@@ -0,0 +1,59 @@
+'''
+Check the rate limit backend of `RATE_LIMIT_URL` under concurrency.
+
+Several backend instances, standing in for workers, hammer one bucket for a
+few seconds; the requests let through must match what the bucket allows:
+`burst` plus `rate` per second. With a `redis://` URL, any Redis compatible
+server will do, e.g. a local `redis-server` or a container:
+
+    docker run --rm -p 6379:6379 redis:7-alpine
+    RATE_LIMIT_URL=redis://localhost:6379/0 python -m benchmarks.rate_limit
+'''
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from workout_api.configs.settings import RateLimit, settings
+from workout_api.contrib.ratelimit import create_bucket_backend
+
+
+async def main(args: argparse.Namespace) -> None:
+    limit = RateLimit(rate=args.rate, burst=args.burst)
+    # The memory backend is not shared: every worker would get its own.
+    workers = args.workers if not settings.rate_limit_url.startswith('memory://') else 1
+    backends = [create_bucket_backend(settings.rate_limit_url) for _ in range(workers)]
+    key = f'workout_api:ratelimit:check:{uuid.uuid4()}'
+    allowed = denied = 0
+
+    async def client(backend) -> None:
+        nonlocal allowed, denied
+        while time.monotonic() < deadline:
+            if (await backend.take(key, limit)).allowed:
+                allowed += 1
+            else:
+                denied += 1
+            await asyncio.sleep(0)
+
+    start = time.monotonic()
+    deadline = start + args.seconds
+    await asyncio.gather(*(client(backends[i % workers]) for i in range(args.clients)))
+    elapsed = time.monotonic() - start
+
+    expected = limit.burst + limit.rate * elapsed
+    print(f'{settings.rate_limit_url}: {allowed} allowed, {denied} denied in {elapsed:.1f} s '
+          f'by {args.clients} clients on {workers} workers; the bucket allows {expected:.0f}')
+    # One token of slack for the refill between the last take and the clock read.
+    if not expected - limit.rate - 1 <= allowed <= expected + 1:
+        raise SystemExit('The backend let through a different number of requests than its bucket')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rate', type=float, default=50)
+    parser.add_argument('--burst', type=int, default=100)
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=32)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,99 @@
+'''
+Per-request cost of the read path: ORM `AsyncSession` vs. a raw `AsyncConnection`.
+
+Runs the `GET /athletes/{id}` and `GET /categories` lookups both ways against
+the configured database and prints latency percentiles. Needs at least one
+athlete in the database.
+
+    python -m benchmarks.read_path -n 2000
+'''
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import select
+
+from workout_api.athlete.models import AthleteModel
+from workout_api.athlete.queries import athlete_columns, athlete_detail, to_athlete
+from workout_api.athlete.schemas import AthleteResponse
+from workout_api.category.models import CategoryModel
+from workout_api.category.queries import category_detail
+from workout_api.category.schemas import CategoryResponse
+from workout_api.configs.database import async_session_maker, engine, read_engine
+from workout_api.contrib.repository.models import *
+
+
+async def athlete_with_session(athlete_id):
+    async with async_session_maker() as session:
+        athlete = (
+            await session.execute(select(AthleteModel).filter_by(id=athlete_id))
+        ).scalars().first()
+        return AthleteResponse.model_validate(athlete)
+
+
+async def athlete_with_connection(athlete_id):
+    async with read_engine.connect() as connection:
+        athlete = (
+            await connection.execute(athlete_detail.where(athlete_columns.id == athlete_id))
+        ).mappings().first()
+        return AthleteResponse.model_validate(to_athlete(athlete))
+
+
+async def categories_with_session(_):
+    async with async_session_maker() as session:
+        categories = (await session.execute(select(CategoryModel))).scalars().all()
+        return [CategoryResponse.model_validate(category) for category in categories]
+
+
+async def categories_with_connection(_):
+    async with read_engine.connect() as connection:
+        categories = (await connection.execute(category_detail)).mappings().all()
+        return [CategoryResponse.model_validate(category) for category in categories]
+
+
+async def measure(func, arg, iterations: int) -> list[float]:
+    for _ in range(min(iterations, 100)):
+        await func(arg)
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await func(arg)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> float:
+    quantiles = statistics.quantiles(timings, n=100)
+    mean = statistics.fmean(timings)
+    print(f'{name:<28} mean {mean:7.3f} ms  p50 {quantiles[49]:7.3f} ms  p99 {quantiles[98]:7.3f} ms')
+    return mean
+
+
+async def main(iterations: int) -> None:
+    async with read_engine.connect() as connection:
+        athlete_id = (
+            await connection.execute(select(AthleteModel.id).where(AthleteModel.deleted_at.is_(None)).limit(1))
+        ).scalar()
+    if athlete_id is None:
+        raise SystemExit('No athletes found; create or seed some first.')
+
+    for label, with_session, with_connection, arg in (
+        ('GET /athletes/{id}', athlete_with_session, athlete_with_connection, athlete_id),
+        ('GET /categories', categories_with_session, categories_with_connection, None),
+    ):
+        print(label)
+        session_mean = report('  session', await measure(with_session, arg, iterations))
+        connection_mean = report('  connection', await measure(with_connection, arg, iterations))
+        print(f'  saved per request: {session_mean - connection_mean:.3f} ms '
+              f'({1 - connection_mean / session_mean:.0%})')
+
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--iterations', type=int, default=2000)
+    asyncio.run(main(parser.parse_args().iterations))
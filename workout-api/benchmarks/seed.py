@@ -0,0 +1,261 @@
+'''
+Seed the configured database with a large, plausible dataset.
+
+Creates a handful of categories, hundreds of training centers and any number
+of athletes, with valid unique CPFs, age, height and weight drawn from
+realistic distributions, and athletes spread over training centers by a
+Zipf-like law, so a few centers are large and most are small. Athletes are
+loaded with `COPY`, in chunks, in a single transaction.
+
+The same seed on the same database always gives the same data. Documents
+follow a fixed permutation of the CPF space, so seeding again continues after
+the athletes already there instead of colliding with them.
+
+    python -m benchmarks.seed -n 1000000 --training-centers 500 --seed 42
+'''
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from bisect import bisect
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+from operator import mul
+from typing import Iterator
+
+from sqlalchemy import func, insert, select, text
+
+from workout_api.athlete.models import AthleteModel
+from workout_api.category.models import CategoryModel
+from workout_api.configs.database import engine
+from workout_api.configs.settings import settings
+from workout_api.contrib.repository.models import *
+from workout_api.training_center.models import TrainingCenterModel
+
+CATEGORIES = {
+    'Iniciante': 'Primeiros meses de treino, movimentos adaptados.',
+    'Scaled': 'Treinos com cargas e movimentos escalados.',
+    'RX': 'Treinos como prescritos.',
+    'Elite': 'Atletas de competicao.',
+    'Teen': 'Atletas de 14 a 17 anos.',
+    'Master': 'Atletas a partir de 40 anos.',
+}
+# Adults pick one of these; teens and most masters get their own category.
+OPEN_CATEGORIES = ['Iniciante', 'Scaled', 'RX', 'Elite']
+OPEN_WEIGHTS = [30, 40, 24, 6]
+
+FIRST_NAMES = {
+    'M': ['Joao', 'Pedro', 'Lucas', 'Gabriel', 'Matheus', 'Rafael', 'Gustavo', 'Felipe', 'Bruno',
+          'Thiago', 'Rodrigo', 'Andre', 'Carlos', 'Daniel', 'Eduardo', 'Fernando', 'Marcelo',
+          'Leonardo', 'Vinicius', 'Diego', 'Henrique', 'Caio', 'Igor', 'Paulo', 'Ricardo'],
+    'F': ['Ana', 'Maria', 'Juliana', 'Fernanda', 'Camila', 'Beatriz', 'Larissa', 'Amanda', 'Bruna',
+          'Leticia', 'Gabriela', 'Mariana', 'Patricia', 'Aline', 'Carolina', 'Isabela', 'Natalia',
+          'Renata', 'Vanessa', 'Tatiana', 'Luana', 'Priscila', 'Bianca', 'Daniela', 'Helena'],
+}
+SURNAMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira',
+            'Lima', 'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes',
+            'Soares', 'Fernandes', 'Vieira', 'Barbosa', 'Rocha', 'Dias', 'Nascimento', 'Andrade',
+            'Moreira', 'Nunes', 'Marques', 'Machado', 'Mendes', 'Freitas', 'Cardoso', 'Ramos']
+CENTER_WORDS = ['King', 'Titan', 'Spartan', 'Iron', 'Alpha', 'Forge', 'Beast', 'Eagle', 'Lion',
+                'Wolf', 'Storm', 'Rocket', 'Steel', 'Phoenix', 'Atlas', 'Bravo', 'Delta', 'Force']
+CITIES = [('Sao Paulo', 'SP'), ('Rio de Janeiro', 'RJ'), ('Belo Horizonte', 'MG'), ('Curitiba', 'PR'),
+          ('Porto Alegre', 'RS'), ('Salvador', 'BA'), ('Recife', 'PE'), ('Fortaleza', 'CE'),
+          ('Brasilia', 'DF'), ('Goiania', 'GO'), ('Florianopolis', 'SC'), ('Campinas', 'SP')]
+
+# Athlete `i` gets the CPF base number `(i * _CPF_STEP + _CPF_SHIFT) mod 10^9`:
+# a bijection, since the step is coprime with 10^9. The last ten indexes
+# stand in for the bases with nine equal digits, which are not valid CPFs.
+_CPF_SPACE = 10 ** 9
+_CPF_LIMIT = _CPF_SPACE - 10
+_CPF_STEP = 387_420_489
+_CPF_SHIFT = 104_729
+
+ATHLETE_COLUMNS = [
+    'id', 'name', 'document', 'age', 'weight', 'height', 'gender',
+    'category_id', 'training_center_id', 'created_at', 'updated_at',
+]
+
+
+def cpf(index: int) -> str:
+    '''
+    The `index`-th CPF of the permutation, formatted `000.000.000-00`.
+    '''
+    if not 0 <= index < _CPF_LIMIT:
+        raise ValueError(f'No more than {_CPF_LIMIT} documents can be generated')
+    base = (index * _CPF_STEP + _CPF_SHIFT) % _CPF_SPACE
+    if base % 111_111_111 == 0:
+        base = ((_CPF_LIMIT + base // 111_111_111) * _CPF_STEP + _CPF_SHIFT) % _CPF_SPACE
+
+    number = f'{base:09d}'
+    digits = list(map(int, number))
+    first = sum(map(mul, digits, range(10, 1, -1))) % 11
+    first = 0 if first < 2 else 11 - first
+    second = (sum(map(mul, digits, range(11, 2, -1))) + first * 2) % 11
+    second = 0 if second < 2 else 11 - second
+
+    return f'{number[:3]}.{number[3:6]}.{number[6:]}-{first}{second}'
+
+
+def athletes(
+    rng: random.Random,
+    count: int,
+    offset: int,
+    categories: dict[str, int],
+    training_centers: list[int],
+    skew: float,
+) -> Iterator[tuple]:
+    '''
+    Athlete records in `ATHLETE_COLUMNS` order.
+    '''
+    # Shuffled, so the biggest centers are not simply the oldest ones.
+    centers = rng.sample(training_centers, len(training_centers))
+    center_weights = list(accumulate(1 / (rank + 1) ** skew for rank in range(len(centers))))
+    center_total = center_weights[-1]
+    open_weights = list(accumulate(OPEN_WEIGHTS))
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    for index in range(offset, offset + count):
+        gender = 'M' if rng.random() < 0.55 else 'F'
+        age = min(max(round(rng.gauss(31, 9)), 14), 75)
+        if gender == 'M':
+            height = min(max(rng.gauss(1.76, 0.07), 1.50), 2.10)
+            bmi = rng.gauss(25.5, 3.0)
+        else:
+            height = min(max(rng.gauss(1.63, 0.065), 1.40), 1.95)
+            bmi = rng.gauss(23.5, 3.0)
+        weight = min(max(bmi, 17.0), 40.0) * height ** 2
+
+        if age < 18:
+            category = 'Teen'
+        elif age >= 40 and rng.random() < 0.6:
+            category = 'Master'
+        else:
+            category = rng.choices(OPEN_CATEGORIES, cum_weights=open_weights)[0]
+
+        name = f'{rng.choice(FIRST_NAMES[gender])} {rng.choice(SURNAMES)} {rng.choice(SURNAMES)}'
+        created_at = now - timedelta(seconds=rng.randrange(730 * 24 * 3600))
+        updated_at = created_at + timedelta(seconds=rng.randrange(int((now - created_at).total_seconds()) + 1)) \
+            if rng.random() < 0.3 else created_at
+
+        yield (
+            uuid.UUID(int=rng.getrandbits(128), version=4),
+            name,
+            cpf(index),
+            age,
+            round(weight, 1),
+            round(height, 2),
+            gender,
+            categories[category],
+            centers[bisect(center_weights, rng.random() * center_total)],
+            created_at,
+            updated_at,
+        )
+
+
+async def seed_categories(connection) -> dict[str, int]:
+    existing = dict((
+        await connection.execute(
+            select(CategoryModel.name, CategoryModel.pk_id).where(CategoryModel.deleted_at.is_(None))
+        )
+    ).all())
+    missing = [
+        {'name': name, 'description': description}
+        for name, description in CATEGORIES.items() if name not in existing
+    ]
+    if missing:
+        rows = await connection.execute(
+            insert(CategoryModel).returning(CategoryModel.name, CategoryModel.pk_id), missing
+        )
+        existing.update(rows.all())
+    return existing
+
+
+async def seed_training_centers(connection, rng: random.Random, count: int) -> list[int]:
+    centers = []
+    for index in range(count):
+        city, state = rng.choice(CITIES)
+        centers.append({
+            'name': f'CT {rng.choice(CENTER_WORDS)} {index + 1:04d}',
+            'address': f'Rua {rng.choice(SURNAMES)} {rng.choice(SURNAMES)}, {rng.randint(1, 3000)} - {city}/{state}',
+            'property_name': f'{rng.choice(FIRST_NAMES["M"] + FIRST_NAMES["F"])} {rng.choice(SURNAMES)}',
+        })
+
+    existing = dict((
+        await connection.execute(
+            select(TrainingCenterModel.name, TrainingCenterModel.pk_id).where(
+                TrainingCenterModel.name.in_([center['name'] for center in centers]),
+                TrainingCenterModel.deleted_at.is_(None)
+            )
+        )
+    ).all())
+    missing = [center for center in centers if center['name'] not in existing]
+    if missing:
+        rows = await connection.execute(
+            insert(TrainingCenterModel).returning(TrainingCenterModel.name, TrainingCenterModel.pk_id), missing
+        )
+        existing.update(rows.all())
+    return [existing[center['name']] for center in centers]
+
+
+async def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+
+    async with engine.begin() as connection:
+        categories = await seed_categories(connection)
+        training_centers = await seed_training_centers(connection, rng, args.training_centers)
+        offset = args.offset
+        if offset is None:
+            offset = (await connection.execute(select(func.count()).select_from(AthleteModel))).scalar()
+
+        # Seeded by the offset too, so seeding again does not repeat the ids.
+        records = athletes(
+            random.Random(args.seed * _CPF_SPACE + offset),
+            args.athletes, offset, categories, training_centers, args.skew
+        )
+        next_chunk = lambda: list(islice(records, args.chunk_size))
+
+        driver = (await connection.get_raw_connection()).driver_connection
+        loaded = 0
+        chunk = next_chunk()
+        while chunk:
+            # Generate the next chunk while the server ingests this one.
+            copy = asyncio.ensure_future(driver.copy_records_to_table(
+                AthleteModel.__tablename__, records=chunk, columns=ATHLETE_COLUMNS
+            ))
+            following = await asyncio.to_thread(next_chunk)
+            await copy
+            loaded += len(chunk)
+            chunk = following
+            elapsed = time.perf_counter() - start
+            print(f'{loaded:>10} athletes  {loaded / elapsed:>9.0f} rows/s', flush=True)
+
+    async with engine.connect() as connection:
+        await connection.execute(text(
+            f'ANALYZE {CategoryModel.__tablename__}, {TrainingCenterModel.__tablename__}, '
+            f'{AthleteModel.__tablename__}'
+        ))
+    if settings.athlete_listings:
+        # Filled by trigger; vacuumed so its index-only scans skip the table.
+        async with engine.connect() as connection:
+            connection = await connection.execution_options(isolation_level='AUTOCOMMIT')
+            await connection.execute(text('VACUUM ANALYZE athlete_listings'))
+
+    print(f'Seeded {len(categories)} categories, {len(training_centers)} training centers and '
+          f'{args.athletes} athletes in {time.perf_counter() - start:.1f} s')
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--athletes', type=int, default=100_000)
+    parser.add_argument('--training-centers', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skew', type=float, default=1.1,
+                        help='Zipf exponent of athletes per training center; 0 spreads them evenly')
+    parser.add_argument('--offset', type=int, default=None,
+                        help='index of the first document; defaults to the number of athletes already stored')
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    asyncio.run(main(parser.parse_args()))
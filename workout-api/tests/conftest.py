@@ -0,0 +1,65 @@
+'''
+Fixtures of the test suite.
+
+Unit tests run anywhere. Tests using `client` run the app in process against
+the database of `DATABASE_URL`, migrated to head, and are skipped when it is
+not set.
+'''
+
+import os
+import random
+import uuid
+
+import httpx
+import pytest
+
+
+@pytest.fixture(scope='session')
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture(scope='session')
+def database_url() -> str:
+    url = os.environ.get('DATABASE_URL')
+    if not url:
+        pytest.skip('DATABASE_URL is not set')
+    return url
+
+
+@pytest.fixture
+async def client(database_url):
+    from workout_api.configs.database import engine
+    from workout_api.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        yield client
+    # Pooled connections belong to this test's event loop.
+    await engine.dispose()
+
+
+@pytest.fixture
+async def athlete(client):
+    '''
+    A new athlete, in a new category and training center, soft deleted
+    afterwards so that runs do not grow the unpaginated lists.
+    '''
+    suffix = uuid.uuid4().hex[:8]
+    category = await client.post('/categories/', json={'name': f'T{suffix}', 'description': 'Test'})
+    training_center = await client.post(
+        '/training-centers/',
+        json={'name': f'CT {suffix}', 'address': 'Rua do Teste, 1', 'property_name': 'Test'},
+    )
+    assert category.status_code == training_center.status_code == 201
+    response = await client.post('/athletes/', json={
+        'name': 'Test Athlete', 'document': f'{random.randrange(10 ** 11):011d}', 'age': 30,
+        'weight': 70.0, 'height': 1.75, 'gender': 'F',
+        'category_name': f'T{suffix}', 'training_center_name': f'CT {suffix}',
+    })
+    assert response.status_code == 201, response.text
+    yield response.json()
+
+    # Already gone when the test deleted them.
+    await client.delete(f"/athletes/{response.json()['id']}")
+    await client.delete(f"/categories/{category.json()['id']}")
+    await client.delete(f"/training-centers/{training_center.json()['id']}")
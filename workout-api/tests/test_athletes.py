@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def _sync_params(athlete: dict) -> dict:
+    # Past the watermark lag, so the fresh changes are in.
+    return {
+        'updated_since': (datetime.fromisoformat(athlete['created_at']) - timedelta(seconds=1)).isoformat(),
+        'updated_until': (datetime.now(timezone.utc) + timedelta(minutes=1)).isoformat(),
+        'name': athlete['name'],
+        'count': 'none',
+    }
+
+
+async def test_sync_returns_deleted_athletes_as_tombstones(client, athlete):
+    synced = (await client.get('/athletes/', params=_sync_params(athlete))).json()['items']
+    assert [(item['id'], item['deleted_at']) for item in synced if item['id'] == athlete['id']] == [
+        (athlete['id'], None)
+    ]
+
+    assert (await client.delete(f"/athletes/{athlete['id']}")).status_code == 204
+
+    synced = (await client.get('/athletes/', params=_sync_params(athlete))).json()['items']
+    tombstone, = [item for item in synced if item['id'] == athlete['id']]
+    assert tombstone['deleted_at'] is not None
+    assert tombstone['category'] == athlete['category']
+
+    listed = (await client.get('/athletes/', params={'name': athlete['name'], 'count': 'none'})).json()['items']
+    assert athlete['id'] not in [item['id'] for item in listed]
+
+
+async def test_sync_takes_bounds_without_offset_as_utc(client, athlete):
+    since = datetime.fromisoformat(athlete['created_at']).astimezone(timezone.utc).replace(tzinfo=None)
+    until = (datetime.now(timezone.utc) + timedelta(minutes=1)).replace(tzinfo=None, microsecond=0)
+    params = _sync_params(athlete) | {
+        'updated_since': (since - timedelta(seconds=1)).isoformat(), 'updated_until': until.isoformat(),
+    }
+
+    response = await client.get('/athletes/', params=params)
+
+    assert response.status_code == 200, response.text
+    assert athlete['id'] in [item['id'] for item in response.json()['items']]
+    assert datetime.fromisoformat(response.headers['X-Sync-Watermark']) == until.replace(tzinfo=timezone.utc)
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from workout_api.contrib.cache import Cache, MemoryBackend, RedisBackend
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def backend(request, monkeypatch):
+    if request.param == 'memory':
+        return MemoryBackend(max_size=100)
+    fakeredis = pytest.importorskip('fakeredis')
+    redis = pytest.importorskip('redis.asyncio')
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        redis.Redis, 'from_url',
+        classmethod(lambda cls, url, **kwargs: fakeredis.FakeAsyncRedis(server=server, **kwargs)),
+    )
+    return RedisBackend('redis://localhost:6379/0')
+
+
+class Loader:
+    def __init__(self, value, delay: float = 0.0) -> None:
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+async def test_stores_loaded_value(backend):
+    cache = Cache(backend, ttl=60)
+    loader = Loader({'name': 'Ana'})
+
+    assert await cache.get_or_load('athlete:1', loader) == {'name': 'Ana'}
+    assert await cache.get_or_load('athlete:1', loader) == {'name': 'Ana'}
+    assert loader.calls == 1
+
+
+async def test_concurrent_misses_share_one_load(backend):
+    cache = Cache(backend, ttl=60)
+    loader = Loader({'name': 'Ana'}, delay=0.05)
+
+    values = await asyncio.gather(*(cache.get_or_load('athlete:1', loader) for _ in range(20)))
+
+    assert values == [{'name': 'Ana'}] * 20
+    assert loader.calls == 1
+
+
+async def test_failed_load_reaches_every_waiter_and_is_not_stored(backend):
+    cache = Cache(backend, ttl=60)
+    loader = Loader(RuntimeError('database down'), delay=0.05)
+
+    results = await asyncio.gather(
+        *(cache.get_or_load('athlete:1', loader) for _ in range(5)), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert loader.calls == 1
+    assert await backend.get('workout_api:athlete:1') is None
+
+
+async def test_none_is_not_stored(backend):
+    cache = Cache(backend, ttl=60)
+    loader = Loader(None)
+
+    assert await cache.get_or_load('athlete:missing', loader) is None
+    assert await cache.get_or_load('athlete:missing', loader) is None
+    assert loader.calls == 2
+
+
+async def test_invalidate_drops_entry(backend):
+    cache = Cache(backend, ttl=60)
+    await cache.get_or_load('athlete:1', Loader({'age': 30}))
+
+    await cache.invalidate('athlete:1')
+
+    assert await cache.get_or_load('athlete:1', Loader({'age': 31})) == {'age': 31}
+
+
+async def test_load_running_during_invalidation_is_not_stored(backend):
+    cache = Cache(backend, ttl=60)
+    stale = asyncio.create_task(cache.get_or_load('athlete:1', Loader({'age': 30}, delay=0.05)))
+    await asyncio.sleep(0.01)
+
+    # The change commits while the old row is being read.
+    await cache.invalidate('athlete:1')
+
+    assert await stale == {'age': 30}
+    assert await cache.get_or_load('athlete:1', Loader({'age': 31})) == {'age': 31}
+
+
+async def test_load_running_during_invalidation_by_another_worker_is_not_stored(backend):
+    # Two workers: their loads are their own, the backend is shared.
+    cache, other = Cache(backend, ttl=60), Cache(backend, ttl=60)
+    stale = asyncio.create_task(cache.get_or_load('athlete:1', Loader({'age': 30}, delay=0.05)))
+    await asyncio.sleep(0.01)
+
+    await other.invalidate('athlete:1')
+
+    assert await stale == {'age': 30}
+    assert await backend.get('workout_api:athlete:1') is None
+    assert await other.get_or_load('athlete:1', Loader({'age': 31})) == {'age': 31}
+    assert await cache.get_or_load('athlete:1', Loader({'age': 32})) == {'age': 31}
+
+
+async def test_evicted_generation_still_blocks_a_stale_store():
+    backend = MemoryBackend(max_size=2)
+    generation = await backend.generation('athlete:1')
+    await backend.invalidate('athlete:1')
+
+    # Pushed out by other invalidations while the load runs.
+    await backend.invalidate('athlete:2', 'athlete:3')
+
+    assert not await backend.set('athlete:1', '{}', 60, generation)
+    assert await backend.set('athlete:1', '{}', 60, await backend.generation('athlete:1'))
+
+
+async def test_entries_expire(backend):
+    cache = Cache(backend, ttl=0.05)
+    await cache.get_or_load('athlete:1', Loader({'age': 30}))
+    await asyncio.sleep(0.1)
+
+    assert await cache.get_or_load('athlete:1', Loader({'age': 31})) == {'age': 31}
+
+
+async def test_update_invalidates_after_commit(client, athlete):
+    path = f"/athletes/{athlete['id']}"
+    assert (await client.get(path)).json()['age'] == 30
+
+    assert (await client.patch(path, json={'age': 31})).status_code == 200
+    assert (await client.get(path)).json()['age'] == 31
+
+    assert (await client.delete(path)).status_code == 204
+    assert (await client.get(path)).status_code == 404
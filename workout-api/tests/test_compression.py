@@ -0,0 +1,145 @@
+import gzip
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+
+from workout_api.contrib import compression
+from workout_api.contrib.compression import CompressionMiddleware, negotiate
+from workout_api.contrib.conditional import check_page_etag
+
+pytestmark = pytest.mark.anyio
+
+LARGE = {'items': [{'id': number, 'name': 'Test Athlete'} for number in range(200)]}
+
+
+@pytest.fixture
+def encodings(monkeypatch):
+    # All three, whichever packages are installed: negotiation only reads the names.
+    monkeypatch.setattr(compression, 'ENCODINGS', {'zstd': None, 'br': None, 'gzip': compression._gzip})
+
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('gzip', 'gzip'),
+    ('gzip, br', 'br'),
+    ('gzip;q=1.0, br;q=0.5', 'gzip'),
+    ('br;q=0.5, zstd;q=0.8, gzip;q=0.1', 'zstd'),
+    ('gzip;q=0', None),
+    ('*', 'zstd'),
+    ('*;q=0.5, zstd;q=0', 'br'),
+    ('gzip;q=0.3, *;q=0.6', 'zstd'),
+    ('*;q=0', None),
+    ('identity', None),
+    ('', None),
+    ('gzip;q=high, br', 'br'),
+    ('GZIP ; q=0.9', 'gzip'),
+])
+def test_negotiate_weighs_q_values(encodings, accept_encoding, expected):
+    assert negotiate(accept_encoding) == expected
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/large')
+    async def large():
+        return LARGE
+
+    @app.get('/small')
+    async def small():
+        return {'id': 1}
+
+    @app.get('/stream')
+    async def stream():
+        async def chunks():
+            for number in range(3):
+                yield f'{{"chunk": {number}}}\n'.encode()
+        return StreamingResponse(chunks(), media_type='application/json')
+
+    @app.get('/encoded')
+    async def encoded():
+        return Response(gzip.compress(b'{"id": 1}' * 500), media_type='application/json',
+                        headers={'Content-Encoding': 'gzip'})
+
+    @app.get('/binary')
+    async def binary():
+        return Response(b'\0' * 5000, media_type='application/octet-stream')
+
+    @app.get('/athletes')
+    async def athletes(request: Request, response: Response):
+        page = SimpleNamespace(total=200, items=LARGE['items'])
+        check_page_etag(request, response, page)
+        return LARGE
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1000)
+    return app
+
+
+@pytest.fixture
+def client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url='http://test')
+
+
+async def test_large_body_is_compressed(client):
+    response = await client.get('/large', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert int(response.headers['Content-Length']) < len(response.content)
+    assert response.json() == LARGE
+
+
+async def test_body_below_minimum_size_is_left_alone(client):
+    response = await client.get('/small', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.json() == {'id': 1}
+
+
+async def test_refused_encoding_is_not_used(client):
+    response = await client.get('/large', headers={'Accept-Encoding': 'gzip;q=0'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert int(response.headers['Content-Length']) == len(response.content)
+
+
+async def test_streamed_body_is_compressed_as_it_goes(client):
+    response = await client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.text == '{"chunk": 0}\n{"chunk": 1}\n{"chunk": 2}\n'
+
+
+async def test_encoded_response_passes_through(client):
+    response = await client.get('/encoded', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    # Decoded once by the client: not compressed a second time.
+    assert response.content == b'{"id": 1}' * 500
+
+
+async def test_incompressible_type_passes_through(client):
+    response = await client.get('/binary', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert len(response.content) == 5000
+
+
+async def test_weak_etag_matches_the_compressed_response(client):
+    response = await client.get('/athletes', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    etag = response.headers['ETag']
+    assert etag.startswith('W/"')
+
+    for accept_encoding in ('gzip', 'identity'):
+        response = await client.get(
+            '/athletes', headers={'Accept-Encoding': accept_encoding, 'If-None-Match': etag}
+        )
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert response.content == b''
@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import event
+
+from workout_api.contrib.conditional import check_page_etag
+
+
+def _request(query: str = '', if_none_match: str = '') -> Request:
+    headers = [(b'if-none-match', if_none_match.encode())] if if_none_match else []
+    return Request({
+        'type': 'http', 'method': 'GET', 'path': '/athletes/', 'query_string': query.encode(),
+        'headers': headers,
+    })
+
+
+def _etag(page, query: str = '') -> str:
+    response = Response()
+    check_page_etag(_request(query), response, page)
+    return response.headers['ETag']
+
+
+def test_page_etag_follows_items_total_and_query():
+    page = SimpleNamespace(total=2, items=[{'id': 1, 'name': 'Ana'}, {'id': 2, 'name': 'Bia'}])
+    etag = _etag(page)
+
+    assert etag.startswith('W/"')
+    assert _etag(page) == etag
+    assert _etag(SimpleNamespace(total=2, items=[{'id': 1, 'name': 'Ana'}, {'id': 2, 'name': 'Bea'}])) != etag
+    assert _etag(SimpleNamespace(total=3, items=page.items)) != etag
+    assert _etag(page, 'page=2') != etag
+
+
+def test_page_etag_answers_304_when_held():
+    page = SimpleNamespace(total=None, items=[{'id': 1}])
+    etag = _etag(page)
+
+    with pytest.raises(HTTPException) as raised:
+        check_page_etag(_request(if_none_match=f'"other", {etag}'), Response(), page)
+    assert raised.value.status_code == 304
+    assert raised.value.headers['ETag'] == etag
+
+
+@pytest.mark.anyio
+async def test_athlete_listing_costs_no_extra_query(client, athlete):
+    from workout_api.configs.database import engine
+
+    # A name of its own, so that the athlete is on the page whatever else is stored.
+    name = f'Etag {uuid4().hex[:8]}'
+    await client.patch(f"/athletes/{athlete['id']}", json={'name': name})
+    params = {'count': 'none', 'name': name}
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine.sync_engine, 'after_cursor_execute', listener)
+    try:
+        response = await client.get('/athletes/', params=params)
+    finally:
+        event.remove(engine.sync_engine, 'after_cursor_execute', listener)
+
+    assert response.status_code == 200
+    assert len(statements) == 1, statements
+    etag = response.headers['ETag']
+
+    response = await client.get('/athletes/', params=params, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+    await client.patch(f"/athletes/{athlete['id']}", json={'age': 41})
+    response = await client.get('/athletes/', params=params, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
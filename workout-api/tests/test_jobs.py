@@ -0,0 +1,120 @@
+import csv
+import io
+import random
+
+import pytest
+from sqlalchemy import func, select
+
+from workout_api.jobs.models import JobModel, job_files, job_uploads
+from workout_api.jobs.worker import JobWorker, handlers
+
+pytestmark = pytest.mark.anyio
+
+
+async def _job(job_id) -> dict:
+    from workout_api.configs.database import engine
+
+    async with engine.connect() as connection:
+        job = (await connection.execute(
+            select(JobModel.pk_id, JobModel.kind, JobModel.payload, JobModel.status, JobModel.max_attempts)
+            .where(JobModel.id == job_id)
+        )).mappings().one()
+        parts = await connection.scalar(
+            select(func.count()).select_from(job_uploads).where(job_uploads.c.job_id == job['pk_id'])
+        )
+        file_parts = await connection.scalar(
+            select(func.count()).select_from(job_files).where(job_files.c.job_id == job['pk_id'])
+        )
+    return {**job, 'id': job_id, 'parts': parts, 'file_parts': file_parts}
+
+
+async def _run(job: dict, attempt: int) -> dict:
+    # As claimed by the worker of any node.
+    await JobWorker(0)._run({**job, 'attempts': attempt})
+    return await _job(job['id'])
+
+
+@pytest.fixture
+def small_parts(monkeypatch):
+    from workout_api.configs.settings import settings
+
+    monkeypatch.setattr(settings, 'jobs_file_part_size', 64)
+
+
+async def _submit_import(client, athlete) -> tuple[dict, str]:
+    document = f'{random.randrange(10 ** 11):011d}'
+    body = (
+        'name,document,age,weight,height,gender,category_name,training_center_name\n'
+        f"Imported Athlete,{document},25,60.0,1.65,F,{athlete['category']['name']},"
+        f"{athlete['training_center']['name']}\n"
+    )
+    response = await client.post('/jobs/athletes/import', content=body, headers={'Content-Type': 'text/csv'})
+    assert response.status_code == 202, response.text
+    return await _job(response.json()['id']), document
+
+
+async def test_import_reads_the_upload_from_the_database(client, athlete, small_parts):
+    job, document = await _submit_import(client, athlete)
+    assert job['parts'] > 1
+
+    job = await _run(job, 1)
+
+    assert job['status'] == 'succeeded'
+    assert job['parts'] == 0
+    imported = await client.get(f'/athletes/document/{document}')
+    assert imported.status_code == 200
+    await client.delete(f"/athletes/{imported.json()['id']}")
+
+    # The report of an import whose row is rejected.
+    job, _ = await _submit_import(client, {**athlete, 'category': {'name': 'Missing'}})
+    job = await _run(job, 1)
+    report = await client.get(f"/jobs/{job['id']}/file")
+    assert report.status_code == 200
+    assert list(csv.reader(io.StringIO(report.text)))[0] == ['line', 'document', 'reason']
+    assert 'Category not found: Missing' in report.text
+
+
+async def test_export_file_is_served_from_the_database(client, athlete, small_parts):
+    response = await client.post('/jobs/athletes/export', json={'category_name': athlete['category']['name']})
+    assert response.status_code == 202, response.text
+    job = await _job(response.json()['id'])
+
+    job = await _run(job, 1)
+    assert job['status'] == 'succeeded'
+    assert job['file_parts'] > 1
+
+    response = await client.get(f"/jobs/{job['id']}/file")
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/csv')
+    assert 'attachment' in response.headers['Content-Disposition']
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row['id'] for row in rows] == [athlete['id']]
+
+    # Another attempt replaces the file instead of adding to it.
+    job = await _run(job, 2)
+    assert (await client.get(f"/jobs/{job['id']}/file")).text == response.text
+
+
+async def test_upload_is_kept_for_retries_and_dropped_on_final_failure(client, athlete, monkeypatch, small_parts):
+    async def fail(context, payload):
+        raise RuntimeError('database down')
+
+    monkeypatch.setitem(handlers, 'athlete.import', fail)
+    job, _ = await _submit_import(client, athlete)
+
+    job = await _run(job, 1)
+    assert job['status'] == 'queued'
+    assert job['parts'] > 0
+
+    job = await _run(job, job['max_attempts'])
+    assert job['status'] == 'failed'
+    assert job['parts'] == 0
+
+
+async def test_import_without_the_columns_is_rejected(client):
+    response = await client.post(
+        '/jobs/athletes/import', content='name,age\nAna,30\n', headers={'Content-Type': 'text/csv'}
+    )
+
+    assert response.status_code == 400
+    assert 'document' in response.json()['detail']
@@ -0,0 +1,270 @@
+'''
+Query budgets and timing baselines of the athlete, category and training
+center routes, and the query budget of the composite read.
+
+Each route is requested in process, counting through the engine events the
+statements it executes and the rows they return or change. A route fails
+when it goes over its budget, e.g. when a listing starts loading a relation
+per item. Budgets follow from the statements each route builds, noted per
+case; their rows are bounded by the page size, or for the unpaginated lists
+by the live rows of the table, never by how much was seeded.
+
+Timings are opt-in, with `QUERY_TIMINGS=1`: the read routes of bounded
+results then fail when their median time regresses past `THRESHOLD` of
+`baselines.json`, unless the database is seeded and the baselines are not,
+or the other way around. The baselines are milliseconds of one machine:
+record them on yours first, with `UPDATE_BASELINES=1` as well. Every row
+the tests create is deleted afterwards, so the measured data stays the same.
+'''
+
+import json
+import os
+import random
+import statistics
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional, Union
+
+import pytest
+from sqlalchemy import event, func, select
+
+from workout_api.athlete.models import AthleteModel
+from workout_api.category.models import CategoryModel
+from workout_api.training_center.models import TrainingCenterModel
+
+pytestmark = pytest.mark.anyio
+
+BASELINES = Path(__file__).parent / 'baselines.json'
+# Fraction of its baseline a median may grow by, and milliseconds it may
+# grow by whatever the fraction, below which a regression is noise.
+THRESHOLD = 1.0
+MIN_DELTA = 2.0
+ROUNDS = 10
+PAGE_SIZE = 50
+# From here on a dataset is seeded, and timed apart from the test data.
+SEEDED = 10_000
+
+# Filled per test: the athlete of the `athlete` fixture and the names of its
+# category and training center, a category and a training center without
+# athletes, and the live rows of the tables.
+Fixtures = dict[str, Any]
+
+
+class Case(NamedTuple):
+    name: str
+    method: str
+    path: Union[str, Callable[[Fixtures], str]]
+    # Most statements and rows a request may take.
+    statements: int
+    rows: Union[int, Callable[[Fixtures], int]]
+    body: Optional[Callable[[Fixtures], dict]] = None
+    status: int = 200
+
+
+def _athlete_post(f: Fixtures) -> dict:
+    return {
+        'name': 'Budget Check', 'document': f'{random.randrange(10 ** 11):011d}', 'age': 30, 'weight': 70.0,
+        'height': 1.75, 'gender': 'F', 'category_name': f['category_name'],
+        'training_center_name': f['training_center_name'],
+    }
+
+
+READS = [
+    # The page and its count.
+    Case('list athletes', 'GET', '/athletes/', 2, PAGE_SIZE + 1),
+    # Plus the category lookup.
+    Case('list athletes, filtered and sorted', 'GET',
+         lambda f: f'/athletes/?category_name={f["category_name"]}&gender=F&min_age=20&max_age=40&sort=-age',
+         3, PAGE_SIZE + 2),
+    # The page and the planner's estimate.
+    Case('list athletes, estimated count', 'GET', '/athletes/?count=estimated', 2, PAGE_SIZE + 1),
+    Case('list athletes, no count', 'GET', '/athletes/?count=none', 1, PAGE_SIZE),
+    # As synced, without a count: it would grow with the deleted rows.
+    Case('sync athletes', 'GET', '/athletes/?updated_since=2000-01-01T00:00:00Z&count=none', 1, PAGE_SIZE),
+    Case('athlete changes', 'GET', f'/athletes/changes?limit={PAGE_SIZE}', 1, PAGE_SIZE),
+    Case('athlete by id', 'GET', lambda f: f'/athletes/{f["athlete_id"]}', 1, 1),
+    Case('athlete by document', 'GET', lambda f: f'/athletes/document/{f["document"]}', 1, 1),
+    # The ETag fingerprint, then every live row: unbounded, so not timed.
+    Case('list categories', 'GET', '/categories/', 2, lambda f: f['categories'] + 1),
+    Case('category by id', 'GET', lambda f: f'/categories/{f["category_id"]}', 1, 1),
+    Case('list training centers', 'GET', '/training-centers/', 2, lambda f: f['training_centers'] + 1),
+    Case('training center by id', 'GET', lambda f: f'/training-centers/{f["training_center_id"]}', 1, 1),
+]
+
+# Reads whose results do not grow with the tables.
+TIMED = [case for case in READS if not callable(case.rows)]
+
+WRITES = [
+    Case('create category', 'POST', '/categories/', 2, 2,
+         body=lambda f: {'name': f'B{uuid.uuid4().hex[:8]}', 'description': 'Query budget check'}, status=201),
+    Case('create training center', 'POST', '/training-centers/', 2, 2,
+         body=lambda f: {'name': f'Budget {uuid.uuid4().hex[:8]}', 'address': 'Rua do Teste, 1',
+                         'property_name': 'Budget'},
+         status=201),
+    # Name lookups, lock, insert, outbox event, then the refresh and its relations.
+    Case('create athlete', 'POST', '/athletes/', 8, 8, body=_athlete_post, status=201),
+    Case('update athlete', 'PATCH', lambda f: f'/athletes/{f["athlete_id"]}', 10, 10,
+         body=lambda f: {'age': 31, 'weight': 71.5, 'category_name': f['category_name']}),
+    Case('delete athlete', 'DELETE', lambda f: f'/athletes/{f["athlete_id"]}', 6, 6, status=204),
+    Case('delete category', 'DELETE', lambda f: f'/categories/{f["category_id"]}', 3, 3, status=204),
+    Case('delete training center', 'DELETE',
+         lambda f: f'/training-centers/{f["training_center_id"]}', 3, 3, status=204),
+]
+
+
+class Counter:
+    '''
+    Statements executed and rows they returned or changed, on any connection.
+    '''
+
+    def __init__(self, engine) -> None:
+        self.engine = engine
+        self.statements = 0
+        self.rows = 0
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements += 1
+        self.rows += max(cursor.rowcount, 0)
+
+    def __enter__(self) -> 'Counter':
+        event.listen(self.engine.sync_engine, 'after_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine.sync_engine, 'after_cursor_execute', self._record)
+
+
+@pytest.fixture
+async def fixtures(client, athlete):
+    from workout_api.configs.database import read_engine
+
+    # Without athletes, so that they can be deleted.
+    category = await client.post(
+        '/categories/', json={'name': f'E{uuid.uuid4().hex[:8]}', 'description': 'Query budget check'}
+    )
+    training_center = await client.post('/training-centers/', json={
+        'name': f'Empty {uuid.uuid4().hex[:8]}', 'address': 'Rua do Teste, 1', 'property_name': 'Budget',
+    })
+    async with read_engine.connect() as connection:
+        athletes = await connection.scalar(
+            select(func.count()).select_from(AthleteModel).where(AthleteModel.deleted_at.is_(None))
+        )
+        categories = await connection.scalar(
+            select(func.count()).select_from(CategoryModel).where(CategoryModel.deleted_at.is_(None))
+        )
+        training_centers = await connection.scalar(
+            select(func.count()).select_from(TrainingCenterModel).where(TrainingCenterModel.deleted_at.is_(None))
+        )
+    yield {
+        'athlete_id': athlete['id'],
+        'document': athlete['document'],
+        'category_name': athlete['category']['name'],
+        'training_center_name': athlete['training_center']['name'],
+        'category_id': category.json()['id'],
+        'training_center_id': training_center.json()['id'],
+        'athletes': athletes,
+        'categories': categories,
+        'training_centers': training_centers,
+    }
+
+    # Already gone when deleted by the case.
+    await client.delete(f"/categories/{category.json()['id']}")
+    await client.delete(f"/training-centers/{training_center.json()['id']}")
+
+
+async def _request(client, case: Case, f: Fixtures) -> tuple[int, int, float]:
+    from workout_api.configs.database import engine
+
+    path = case.path(f) if callable(case.path) else case.path
+    with Counter(engine) as counter:
+        start = time.perf_counter()
+        response = await client.request(case.method, path, json=case.body(f) if case.body else None)
+        elapsed = time.perf_counter() - start
+    assert response.status_code == case.status, f'{case.method} {path}: {response.text[:200]}'
+    if case.method == 'POST':
+        await client.delete(f"{path}{response.json()['id']}")
+    return counter.statements, counter.rows, elapsed
+
+
+@pytest.mark.parametrize('case', READS + WRITES, ids=lambda case: case.name)
+async def test_route_keeps_its_query_budget(client, fixtures, case):
+    statements, rows, _ = await _request(client, case, fixtures)
+
+    budget = case.rows(fixtures) if callable(case.rows) else case.rows
+    assert statements <= case.statements, f'{statements} statements, over the budget of {case.statements}'
+    assert rows <= budget, f'{rows} rows, over the budget of {budget}'
+
+
+@pytest.mark.skipif(not os.environ.get('QUERY_TIMINGS'), reason='Timings are compared with QUERY_TIMINGS=1')
+async def test_read_routes_keep_their_timings(client, fixtures):
+    seeded = fixtures['athletes'] >= SEEDED
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else None
+    update = bool(os.environ.get('UPDATE_BASELINES')) or baselines is None
+    if not update and baselines['seeded'] != seeded:
+        pytest.skip(f"The baselines were recorded {'with' if baselines['seeded'] else 'with less than'} "
+                    f"{SEEDED} athletes: run with UPDATE_BASELINES=1 to compare against this database")
+
+    timings = {case.name: [] for case in TIMED}
+    for _ in range(ROUNDS):
+        for case in TIMED:
+            timings[case.name].append((await _request(client, case, fixtures))[2])
+    medians = {name: round(statistics.median(values) * 1000, 3) for name, values in timings.items()}
+
+    if update:
+        BASELINES.write_text(json.dumps({'seeded': seeded, 'timings': medians}, indent=2) + '\n')
+        return
+    regressions = {
+        name: f'{p50:.2f} ms, regressed from {baseline:.2f} ms'
+        for name, p50 in medians.items()
+        if (baseline := baselines['timings'].get(name)) is not None
+        and p50 > baseline * (1 + THRESHOLD) and p50 - baseline > MIN_DELTA
+    }
+    assert not regressions, regressions
+
+
+@pytest.fixture
+async def athletes(client, athlete):
+    '''
+    The athlete of the `athlete` fixture and two more, each in a category and
+    training center of its own.
+    '''
+    created = []
+    for _ in range(2):
+        suffix = uuid.uuid4().hex[:8]
+        category = await client.post('/categories/', json={'name': f'C{suffix}', 'description': 'Composite'})
+        training_center = await client.post('/training-centers/', json={
+            'name': f'Composite {suffix}', 'address': 'Rua do Teste, 1', 'property_name': 'Composite',
+        })
+        response = await client.post('/athletes/', json={
+            'name': 'Composite Check', 'document': f'{random.randrange(10 ** 11):011d}', 'age': 30,
+            'weight': 70.0, 'height': 1.75, 'gender': 'F',
+            'category_name': f'C{suffix}', 'training_center_name': f'Composite {suffix}',
+        })
+        assert response.status_code == 201, response.text
+        created.append((response.json()['id'], category.json()['id'], training_center.json()['id']))
+    yield [athlete['id']] + [athlete_id for athlete_id, _, _ in created]
+
+    for athlete_id, category_id, training_center_id in created:
+        await client.delete(f'/athletes/{athlete_id}')
+        await client.delete(f'/categories/{category_id}')
+        await client.delete(f'/training-centers/{training_center_id}')
+
+
+@pytest.mark.parametrize('count', [1, 3])
+async def test_composite_read_batches_its_relations(client, athletes, count):
+    from workout_api.configs.database import read_engine
+
+    # The athletes, then their categories and their training centers: one
+    # query each, however many athletes are read.
+    with Counter(read_engine) as counter:
+        response = await client.post('/composite/', json={
+            'athletes': {'ids': athletes[:count], 'include': ['category', 'training_center']},
+        })
+    assert response.status_code == 200, response.text
+
+    expanded = response.json()['athletes']
+    assert sorted(item['id'] for item in expanded) == sorted(athletes[:count])
+    assert len({item['category']['id'] for item in expanded}) == count
+    assert len({item['training_center']['id'] for item in expanded}) == count
+    assert counter.statements == 3, f'{counter.statements} statements for {count} athletes'
@@ -0,0 +1,54 @@
+import hashlib
+import uuid
+
+import httpx
+import pytest
+from starlette.responses import PlainTextResponse
+
+from workout_api.configs.settings import RateLimit, settings
+from workout_api.contrib.ratelimit import MemoryBucketBackend, RateLimitMiddleware
+
+pytestmark = pytest.mark.anyio
+
+KNOWN_KEY = 'known-key'
+
+
+def _client(monkeypatch, api_keys: set[str]) -> httpx.AsyncClient:
+    monkeypatch.setattr(settings, 'rate_limit_api_keys', api_keys)
+    app = RateLimitMiddleware(
+        PlainTextResponse('ok'),
+        limits={'athletes': RateLimit(rate=0.001, burst=2)},
+        backend=MemoryBucketBackend(max_size=100),
+    )
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test')
+
+
+@pytest.fixture
+def client(monkeypatch):
+    return _client(monkeypatch, {hashlib.sha256(KNOWN_KEY.encode()).hexdigest()})
+
+
+async def _statuses(client, keys) -> list[int]:
+    return [
+        (await client.get('/athletes/', headers={'X-API-Key': key} if key else {})).status_code
+        for key in keys
+    ]
+
+
+async def test_unknown_keys_share_the_bucket_of_their_ip(client):
+    keys = [str(uuid.uuid4()) for _ in range(4)]
+
+    assert await _statuses(client, keys) == [200, 200, 429, 429]
+    assert await _statuses(client, [None]) == [429]
+
+
+async def test_known_key_has_a_bucket_of_its_own(client):
+    assert await _statuses(client, [None, None, None]) == [200, 200, 429]
+
+    assert await _statuses(client, [KNOWN_KEY] * 3) == [200, 200, 429]
+
+
+async def test_keys_are_ignored_when_none_is_known(monkeypatch):
+    client = _client(monkeypatch, set())
+
+    assert await _statuses(client, [KNOWN_KEY, 'other', KNOWN_KEY]) == [200, 200, 429]
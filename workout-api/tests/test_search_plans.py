@@ -0,0 +1,142 @@
+'''
+The common athlete searches of `GET /athletes` use their indexes.
+
+EXPLAINs the listing and count statements the endpoint builds for each
+filter combination, and checks the expected index is scanned; with
+`ATHLETE_LISTINGS` set, the indexes of the read model. Plans depend on the
+data: below `SEEDED` athletes, as many are staged in 20 categories and 200
+training centers, analyzed and rolled back with the test's transaction, and
+sequential scans are disabled, so the test checks the index can serve the
+search. Seed a realistic dataset to check the planner picks it on its own:
+
+    python -m benchmarks.seed -n 200000
+'''
+
+import json
+
+import pytest
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.dialects import postgresql
+
+from workout_api.athlete.models import AthleteModel
+from workout_api.athlete.queries import AthleteSort, athlete_count, athlete_order, athlete_search, athlete_short
+from workout_api.configs.settings import settings
+
+pytestmark = pytest.mark.anyio
+
+SEEDED = 10_000
+PAGE_SIZE = 50
+INDEX_SCANS = {'Index Scan', 'Index Only Scan', 'Bitmap Index Scan'}
+if settings.athlete_listings:
+    CATEGORY_GENDER_AGE = 'ix_athlete_listings_category_id_gender_age'
+    TRAINING_CENTER_CREATED_AT = 'ix_athlete_listings_training_center_id_created_at'
+else:
+    CATEGORY_GENDER_AGE = 'ix_athletes_category_id_gender_age_live'
+    TRAINING_CENTER_CREATED_AT = 'ix_athletes_training_center_id_created_at_live'
+
+SEARCHES = [
+    pytest.param(CATEGORY_GENDER_AGE, lambda c, t: athlete_search(c, gender='F', min_age=25, max_age=29), None,
+                 id='category, gender and age range'),
+    pytest.param(CATEGORY_GENDER_AGE, lambda c, t: athlete_search(c, min_age=25, max_age=29), None,
+                 id='category and age range'),
+    pytest.param(CATEGORY_GENDER_AGE,
+                 lambda c, t: athlete_search(c, gender='M', min_age=30, max_age=39, min_weight=70, max_weight=90),
+                 None, id='category, gender, age and weight ranges'),
+    pytest.param(CATEGORY_GENDER_AGE, lambda c, t: athlete_search(c, gender='F', min_age=20, max_age=34),
+                 AthleteSort.age, id='category, gender and age, by age'),
+    pytest.param(TRAINING_CENTER_CREATED_AT, lambda c, t: athlete_search(training_center_id=t), None,
+                 id='training center'),
+    pytest.param(TRAINING_CENTER_CREATED_AT, lambda c, t: athlete_search(training_center_id=t),
+                 AthleteSort.created_at_desc, id='training center, newest first'),
+    pytest.param(TRAINING_CENTER_CREATED_AT, lambda c, t: athlete_search(training_center_id=t, gender='M'), None,
+                 id='training center and gender'),
+]
+
+
+def _scanned_indexes(plan: dict) -> set[str]:
+    indexes = {plan['Index Name']} if plan['Node Type'] in INDEX_SCANS else set()
+    for child in plan.get('Plans', ()):
+        indexes |= _scanned_indexes(child)
+    return indexes
+
+
+def _median_of(column) -> Select:
+    # The group of median size: neither a tiny nor a dominant one.
+    sizes = (
+        select(column, func.count().label('size'))
+        .where(AthleteModel.deleted_at.is_(None))
+        .group_by(column)
+        .subquery()
+    )
+    return select(sizes.c[0]).order_by(sizes.c.size).offset(
+        select(func.count() / 2).select_from(sizes).scalar_subquery()
+    ).limit(1)
+
+
+_STAGE = text(f'''
+WITH categories AS (
+    INSERT INTO categories (id, name, description, created_at, updated_at)
+    SELECT md5(random()::text)::uuid, 'P' || substr(md5(random()::text), 1, 8), 'Search plans', now(), now()
+    FROM generate_series(1, 20)
+    RETURNING pk_id
+), training_centers AS (
+    INSERT INTO training_centers (id, name, address, property_name, created_at, updated_at)
+    SELECT md5(random()::text)::uuid, 'Plans ' || md5(random()::text), 'Rua do Teste, 1', 'Plans', now(), now()
+    FROM generate_series(1, 200)
+    RETURNING pk_id
+)
+INSERT INTO athletes (
+    id, name, document, age, weight, height, gender, category_id, training_center_id, created_at, updated_at
+)
+SELECT md5(random()::text)::uuid, 'Plans ' || n, 'P' || lpad(n::text, 12, '0'), 18 + n % 40, 50 + n % 50,
+       1.5 + (n % 50) / 100.0, CASE WHEN n % 2 = 0 THEN 'F' ELSE 'M' END,
+       (SELECT array_agg(pk_id) FROM categories)[1 + n % 20],
+       (SELECT array_agg(pk_id) FROM training_centers)[1 + n % 200],
+       now() - n * interval '1 minute', now()
+FROM generate_series(1, {SEEDED}) n
+''')
+
+
+@pytest.fixture
+async def explain(client):
+    from workout_api.configs.database import engine
+
+    # Rolled back when the connection closes.
+    async with engine.connect() as connection:
+        athletes = await connection.scalar(
+            select(func.count()).select_from(AthleteModel).where(AthleteModel.deleted_at.is_(None))
+        )
+        if athletes < SEEDED:
+            await connection.execute(_STAGE)
+            await connection.execute(text(
+                f"ANALYZE categories, training_centers, {'athlete_listings' if settings.athlete_listings else 'athletes'}"
+            ))
+            await connection.execute(text('SET LOCAL enable_seqscan = off'))
+        category_id = await connection.scalar(_median_of(AthleteModel.category_id))
+        training_center_id = await connection.scalar(_median_of(AthleteModel.training_center_id))
+
+        async def explain(search, statement: Select) -> dict:
+            statement = statement(search(category_id, training_center_id))
+            sql = statement.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True})
+            plan = await connection.scalar(text(f'EXPLAIN (FORMAT JSON) {sql}'))
+            return (json.loads(plan) if isinstance(plan, str) else plan)[0]['Plan']
+
+        yield explain
+
+
+@pytest.mark.parametrize('index, search, sort', SEARCHES)
+@pytest.mark.parametrize('kind', ['page', 'count'])
+async def test_search_scans_its_index(explain, index, search, sort, kind):
+    def statement(filters) -> Select:
+        if kind == 'count':
+            return select(func.count()).select_from(athlete_count.where(*filters).subquery())
+        listing = athlete_short.where(*filters)
+        if sort:
+            listing = listing.order_by(*athlete_order(sort))
+        return listing.limit(PAGE_SIZE)
+
+    plan = await explain(search, statement)
+
+    indexes = _scanned_indexes(plan)
+    # On a partitioned table, the partitions' indexes are scanned.
+    assert any(name == index or name.startswith(f'{index[:58]}_') for name in indexes), indexes or plan['Node Type']
@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def _naive(days_ago: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days_ago)).replace(tzinfo=None, microsecond=0).isoformat()
+
+
+@pytest.mark.parametrize('bounds', [
+    lambda: {'since': _naive(7)},
+    lambda: {'since': _naive(7), 'until': _naive(1)},
+    lambda: {'since': _naive(7), 'until': _naive(1) + '-03:00'},
+    lambda: {'until': _naive(1)},
+])
+async def test_leaderboard_accepts_bounds_without_offset(client, bounds):
+    response = await client.get('/workout-results/leaderboard', params={'workout': 'fran'} | bounds())
+
+    assert response.status_code == 200, response.text
+
+
+async def test_leaderboard_rejects_reversed_period(client):
+    response = await client.get('/workout-results/leaderboard', params={
+        'workout': 'fran', 'since': _naive(1), 'until': _naive(7) + 'Z',
+    })
+
+    assert response.status_code == 400
+
+
+async def test_ranks_of_unknown_athlete_is_404(client):
+    response = await client.get(
+        '/workout-results/leaderboards/athletes/3fa85f64-5717-4562-b3fc-2c963f66afa6',
+        params={'workout': 'fran'},
+    )
+
+    assert response.status_code == 404
+
+
+async def test_ranks_of_athlete_without_results_is_empty(client, athlete):
+    response = await client.get(
+        f"/workout-results/leaderboards/athletes/{athlete['id']}", params={'workout': 'fran'}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+async def test_periodic_refresh_is_skipped_within_the_interval_of_any_process(client):
+    from workout_api.workout_result.leaderboards import refresh_leaderboards
+
+    # On demand, whenever the last refresh was.
+    assert await refresh_leaderboards()
+    # The check of any other process within the interval.
+    assert not await refresh_leaderboards(unless_within=60)
+
+    await asyncio.sleep(0.05)
+    assert await refresh_leaderboards(unless_within=0.01)
@@ -1,3 +1,6 @@
 from workout_api.category.models import CategoryModel
 from workout_api.athlete.models import AthleteModel
 from workout_api.training_center.models import TrainingCenterModel
+from workout_api.outbox.models import OutboxModel
+from workout_api.jobs.models import JobModel
+from workout_api.workout_result.models import WorkoutResultModel
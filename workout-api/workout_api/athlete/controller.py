@@ -1,17 +1,29 @@
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import uuid4
-from fastapi import APIRouter, Body, HTTPException, status
-from fastapi_pagination import Page, add_pagination
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response, status
+from fastapi_pagination import add_pagination
 from pydantic import UUID4
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
 from workout_api.athlete.models import AthleteModel
+from workout_api.athlete.queries import (
+    AthleteSort, athlete_by_document, athlete_by_id, athlete_columns, athlete_count,
+    athlete_order, athlete_search, athlete_short, athlete_sync, athlete_sync_count, to_athlete
+)
 from workout_api.athlete.schemas import AthletePost, AthleteResponse, AthleteShort, AthleteUpdate
-from workout_api.category.models import CategoryModel
-from workout_api.training_center.models import TrainingCenterModel
-from workout_api.contrib.dependencies import DatabaseDependency
+from workout_api.category.queries import category_pk_by_name
+from workout_api.training_center.queries import training_center_pk_by_name
+from workout_api.configs.database import read_engine
+from workout_api.contrib.cache import cache
+from workout_api.contrib.conditional import check_page_etag
+from workout_api.contrib.dependencies import DatabaseDependency, ReadConnectionDependency
+from workout_api.contrib.pagination import CountStrategy, CountedPage, paginate
+from workout_api.contrib.timestamps import as_utc
+from workout_api.configs.settings import settings
+from workout_api.outbox.events import add_event, read_feed
+from workout_api.outbox.schemas import ChangeFeed
 
 router = APIRouter()
 
@@ -30,22 +42,20 @@ async def create_athlete(
     category_name = athlete_post.category_name
     training_center_name = athlete_post.training_center_name
 
-    category = (
-        await db_session.execute(
-            select(CategoryModel).filter_by(name=category_name)
-    )).scalars().first()
+    category_id = (
+        await db_session.execute(category_pk_by_name(category_name))
+    ).scalar()
 
-    if not category:
+    if not category_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Category not found: {category_name}")
 
-    training_center = (
-        await db_session.execute(
-            select(TrainingCenterModel).filter_by(name=training_center_name)
-    )).scalars().first()
+    training_center_id = (
+        await db_session.execute(training_center_pk_by_name(training_center_name))
+    ).scalar()
 
-    if not training_center:
+    if not training_center_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Training Center not found: {training_center_name}")
@@ -55,10 +65,14 @@ async def create_athlete(
         athlete_model = AthleteModel(
             id=uuid4(),
             **athlete_data,
-            category_id=category.pk_id,
-            training_center_id=training_center.pk_id
+            category_id=category_id,
+            training_center_id=training_center_id
         )
         db_session.add(athlete_model)
+        await add_event(
+            db_session, 'athlete', athlete_model.id, 'created',
+            athlete_post.model_dump() | {'id': athlete_model.id}
+        )
         await db_session.commit()
         await db_session.refresh(athlete_model)
     except IntegrityError:
@@ -96,16 +110,16 @@ async def update_athlete(
     athlete_data = athlete_update.model_dump(exclude_unset=True)
 
     if category_name := athlete_data.get('category_name'):
-        category = (await db_session.execute(select(CategoryModel).filter_by(name=category_name))).scalars().first()
-        if not category:
+        category_id = (await db_session.execute(category_pk_by_name(category_name))).scalar()
+        if not category_id:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Category not found: {category_name}")
-        athlete.category_id = category.pk_id
+        athlete.category_id = category_id
 
     if training_center_name := athlete_data.get('training_center_name'):
-        training_center = (await db_session.execute(select(TrainingCenterModel).filter_by(name=training_center_name))).scalars().first()
-        if not training_center:
+        training_center_id = (await db_session.execute(training_center_pk_by_name(training_center_name))).scalar()
+        if not training_center_id:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Training Center not found: {training_center_name}")
-        athlete.training_center_id = training_center.pk_id
+        athlete.training_center_id = training_center_id
 
     for key, value in athlete_data.items():
         if key not in ['category_name', 'training_center_name']:
@@ -114,33 +128,159 @@ async def update_athlete(
     # Note: The IntegrityError for 'document' is not handled here because 'document' is not part of AthleteUpdate.
     # This is good practice, as unique identifiers like CPF should generally not be updatable via PATCH.
 
+    await add_event(db_session, 'athlete', athlete.id, 'updated', athlete_data | {'id': athlete.id})
     await db_session.commit()
+    await cache.invalidate(f'athlete:id:{athlete.id}', f'athlete:document:{athlete.document}')
     await db_session.refresh(athlete)
 
     return athlete
 
 
+@router.delete(
+    "/{athlete_id}",
+    summary="Delete an athlete by ID",
+    description="Endpoint to soft delete an existing athlete by their unique ID.",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def delete_athlete(
+    athlete_id: UUID4,
+    db_session: DatabaseDependency,
+) -> None:
+    athlete = (
+        (await db_session.execute(
+            select(AthleteModel).filter_by(id=athlete_id)
+        )).scalars().first()
+    )
+
+    if not athlete:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ID Athlete not found: {athlete_id}"
+        )
+
+    athlete.deleted_at = datetime.now(timezone.utc)
+    await add_event(db_session, 'athlete', athlete.id, 'deleted', {'id': athlete.id})
+    await db_session.commit()
+    await cache.invalidate(f'athlete:id:{athlete.id}', f'athlete:document:{athlete.document}')
+
+
 @router.get(
     "/",
     summary="Retrieve all athletes",
-    description="Endpoint to retrieve a list of all athletes in the system.",
+    description="Endpoint to retrieve a list of all athletes in the system. "
+                "With `updated_since`, only the athletes changed after it are returned, oldest first, "
+                "and the `X-Sync-Watermark` header holds the value to send as `updated_until` on the "
+                "next pages and as `updated_since` on the next sync. Deleted athletes are "
+                "included in a sync as tombstones, with `deleted_at` set, so that copies can drop them. "
+                "`count` picks how `total` is computed: `exact`, `estimated` from the planner, "
+                "`cached` exact count or `none`. "
+                "Outside of a sync, a weak `ETag` is sent and `If-None-Match` is answered "
+                "with 304 when the filtered athletes are unchanged, and `sort` orders the "
+                "athletes (`-` for descending).",
     status_code=status.HTTP_200_OK,
-    response_model=Page[AthleteShort],
+    response_model=CountedPage[AthleteShort],
 )
 async def get_all(
-    db_session: DatabaseDependency,
+    db_connection: ReadConnectionDependency,
+    request: Request,
+    response: Response,
     name: Optional[str] = None,
     document: Optional[str] = None,
-) -> Page[AthleteShort]:
-    query = select(AthleteModel)
+    category_name: Optional[str] = None,
+    training_center_name: Optional[str] = None,
+    gender: Optional[str] = Query(None, min_length=1, max_length=1),
+    min_age: Optional[int] = Query(None, ge=0, le=120),
+    max_age: Optional[int] = Query(None, ge=0, le=120),
+    min_weight: Optional[float] = Query(None, gt=0),
+    max_weight: Optional[float] = Query(None, gt=0),
+    sort: Optional[AthleteSort] = None,
+    updated_since: Optional[datetime] = None,
+    updated_until: Optional[datetime] = None,
+    count: CountStrategy = CountStrategy.exact,
+) -> CountedPage[AthleteShort]:
+    category_id = None
+    if category_name:
+        category_id = (await db_connection.execute(category_pk_by_name(category_name))).scalar()
+        if not category_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Category not found: {category_name}"
+            )
+
+    training_center_id = None
+    if training_center_name:
+        training_center_id = (
+            await db_connection.execute(training_center_pk_by_name(training_center_name))
+        ).scalar()
+        if not training_center_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Training Center not found: {training_center_name}"
+            )
+
+    # A sync reads `athletes` itself, where the deleted athletes are kept.
+    columns = AthleteModel if updated_since else athlete_columns
+    filters = athlete_search(
+        category_id, training_center_id, gender, min_age, max_age, min_weight, max_weight, columns
+    )
 
     if name:
-        query = query.filter(AthleteModel.name.ilike(f'%{name}%'))
+        filters.append(columns.name.ilike(f'%{name}%'))
 
     if document:
-        query = query.filter_by(document=document)
+        filters.append(columns.document == document)
+
+    if updated_since:
+        updated_since, updated_until = as_utc(updated_since), as_utc(updated_until)
+        # Rows are stamped before their transaction commits, so the watermark
+        # trails the clock to leave room for writes still in flight.
+        watermark = updated_until or datetime.now(timezone.utc) - timedelta(seconds=settings.sync_watermark_lag)
+        filters += [columns.updated_at > updated_since, columns.updated_at <= watermark]
+        response.headers['X-Sync-Watermark'] = watermark.isoformat()
+
+    if updated_since:
+        query = athlete_sync.where(*filters).order_by(columns.updated_at, columns.pk_id)
+        count_query = athlete_sync_count.where(*filters)
+    else:
+        query = athlete_short.where(*filters)
+        if sort:
+            query = query.order_by(*athlete_order(sort))
+        count_query = athlete_count.where(*filters)
+
+    page = await paginate(
+        db_connection, query, count,
+        count_query=count_query,
+        transformer=to_athlete
+    )
+    if not updated_since:
+        # A sync page depends on the clock through its watermark, so only
+        # plain listings are validated, from the page itself: a fingerprint
+        # of all the filtered athletes costs the count `count` can avoid.
+        check_page_etag(request, response, page)
+    return page
+
 
-    return await paginate(db_session, query)
+@router.get(
+    "/changes",
+    summary="Stream athlete changes",
+    description="Endpoint to read the athlete change events recorded after a cursor. "
+                "With `wait`, the request is held until new events arrive or the timeout expires.",
+    status_code=status.HTTP_200_OK,
+    response_model=ChangeFeed,
+)
+async def get_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    wait: int = Query(0, ge=0, le=settings.outbox_max_wait),
+) -> ChangeFeed:
+    return await read_feed('athlete', since, limit, wait)
+
+
+async def _load_athlete(statement) -> Optional[dict]:
+    # Borrows a connection only on a cache miss.
+    async with read_engine.connect() as connection:
+        athlete = (await connection.execute(statement)).mappings().first()
+    return to_athlete(athlete) if athlete else None
 
 
 @router.get(
@@ -150,14 +290,9 @@ async def get_all(
     status_code=status.HTTP_200_OK,
     response_model=AthleteResponse,
 )
-async def get_by_id(
-    athlete_id: UUID4,
-    db_session: DatabaseDependency,
-) -> AthleteResponse:
-    athlete = (
-        (await db_session.execute(
-            select(AthleteModel).filter_by(id=athlete_id)
-        )).scalars().first()
+async def get_by_id(athlete_id: UUID4) -> AthleteResponse:
+    athlete = await cache.get_or_load(
+        f'athlete:id:{athlete_id}', lambda: _load_athlete(athlete_by_id(athlete_id))
     )
     if not athlete:
         raise HTTPException(
@@ -173,14 +308,9 @@ async def get_by_id(
     status_code=status.HTTP_200_OK,
     response_model=AthleteResponse,
 )
-async def get_by_document(
-    athlete_document: str,
-    db_session: DatabaseDependency,
-) -> AthleteResponse:
-    athlete = (
-        (await db_session.execute(
-            select(AthleteModel).filter_by(document=athlete_document)
-        )).scalars().first()
+async def get_by_document(athlete_document: str) -> AthleteResponse:
+    athlete = await cache.get_or_load(
+        f'athlete:document:{athlete_document}', lambda: _load_athlete(athlete_by_document(athlete_document))
     )
     if not athlete:
         raise HTTPException(
@@ -0,0 +1,362 @@
+'''
+Background jobs over the athletes.
+
+They work in batches of `JOBS_BATCH_SIZE` rows (`JOBS_IMPORT_BATCH_SIZE` for
+imports), so a large table or file is handled with bounded memory and short
+transactions. The files they write go to a temporary file, then to the
+database as the file of the job.
+'''
+
+import asyncio
+import csv
+import io
+import tempfile
+from datetime import datetime, timedelta, timezone
+from itertools import chain, islice
+from typing import Any, BinaryIO, Iterator, Literal, TextIO
+from uuid import uuid4
+
+from pydantic import ValidationError
+from sqlalchemy import (
+    Column, Float, Integer, MetaData, String, Table, and_, delete, exists, func, insert, literal, select, update
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateTable
+
+from workout_api.athlete.models import AthleteModel
+from workout_api.athlete.queries import athlete_columns, athlete_detail
+from workout_api.athlete.schemas import AthletePost
+from workout_api.category.models import CategoryModel
+from workout_api.configs.database import engine, read_engine
+from workout_api.configs.settings import settings
+from workout_api.contrib.cache import cache
+from workout_api.jobs.models import job_uploads
+from workout_api.jobs.worker import JobContext, job_handler, read_parts
+from workout_api.outbox.events import OUTBOX_LOCK_KEY
+from workout_api.outbox.models import OutboxModel
+from workout_api.training_center.models import TrainingCenterModel
+from workout_api.workout_result.models import WorkoutResultModel
+
+EXPORT_COLUMNS = [
+    'id', 'name', 'document', 'age', 'weight', 'height', 'gender',
+    'category_name', 'training_center_name', 'created_at', 'updated_at',
+]
+
+
+def _write_rows(file: TextIO, rows: list[Any], header: bool) -> None:
+    writer = csv.writer(file)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows([[row[column] for column in EXPORT_COLUMNS] for row in rows])
+
+
+@job_handler('athlete.export')
+async def export_athletes(context: JobContext, payload: dict[str, Any]) -> dict[str, Any]:
+    '''
+    Write the live athletes, optionally of one category and/or training
+    center, to a CSV file stored with the job.
+    '''
+    query = athlete_detail
+    if category_name := payload.get('category_name'):
+        query = query.where(query.selected_columns.category_name == category_name)
+    if training_center_name := payload.get('training_center_name'):
+        query = query.where(query.selected_columns.training_center_name == training_center_name)
+
+    async with read_engine.connect() as connection:
+        total = (await connection.execute(
+            select(func.count()).select_from(query.subquery())
+        )).scalar_one()
+
+    written = 0
+    with tempfile.TemporaryFile() as output:
+        file = io.TextIOWrapper(output, newline='', encoding='utf-8')
+        # Server side cursors need a transaction, so not the autocommit engine.
+        async with engine.connect() as connection:
+            result = await connection.stream(
+                query.order_by(athlete_columns.pk_id).execution_options(yield_per=settings.jobs_batch_size)
+            )
+            async for rows in result.mappings().partitions():
+                await asyncio.to_thread(_write_rows, file, rows, written == 0)
+                written += len(rows)
+                await context.progress(written / total if total else 1.0)
+
+        if not written:
+            await asyncio.to_thread(_write_rows, file, [], True)
+        await asyncio.to_thread(file.flush)
+        await context.store_file(output)
+
+    return {'file': f'athletes-{uuid4()}.csv', 'rows': written}
+
+
+@job_handler('athlete.purge')
+async def purge_athletes(context: JobContext, payload: dict[str, Any]) -> dict[str, Any]:
+    '''
+    Permanently remove the athletes soft deleted more than
+    `older_than_days` days ago, with their workout results.
+    '''
+    cutoff = datetime.now(timezone.utc) - timedelta(days=payload['older_than_days'])
+    purgeable = AthleteModel.deleted_at < cutoff
+
+    async with read_engine.connect() as connection:
+        total = (await connection.execute(
+            select(func.count()).select_from(AthleteModel).where(purgeable)
+        )).scalar_one()
+
+    deleted = 0
+    while True:
+        async with engine.begin() as connection:
+            batch = (await connection.execute(
+                select(AthleteModel.pk_id).where(purgeable).limit(settings.jobs_batch_size)
+            )).scalars().all()
+            if not batch:
+                break
+            # Results go first for their foreign key; on a partitioned
+            # `athletes` they have none, and nothing else would remove them.
+            await connection.execute(
+                delete(WorkoutResultModel).where(WorkoutResultModel.athlete_id.in_(batch))
+            )
+            await connection.execute(
+                delete(AthleteModel).where(AthleteModel.pk_id.in_(batch))
+            )
+        deleted += len(batch)
+        await context.progress(deleted / total if total else 1.0)
+
+    return {'deleted': deleted}
+
+
+IMPORT_COLUMNS = list(AthletePost.model_fields)
+REPORT_COLUMNS = ['line', 'document', 'reason']
+
+# Staging table of an import batch: filled by COPY, merged into `athletes`
+# and dropped at commit.
+athlete_import = Table(
+    'athlete_import',
+    MetaData(),
+    Column('line', Integer),
+    Column('id', UUID(as_uuid=True)),
+    Column('event_id', UUID(as_uuid=True)),
+    Column('name', String(50)),
+    Column('document', String(14)),
+    Column('age', Integer),
+    Column('weight', Float),
+    Column('height', Float),
+    Column('gender', String(1)),
+    Column('category_id', Integer),
+    Column('training_center_id', Integer),
+    Column('category_name', String),
+    Column('training_center_name', String),
+    prefixes=['TEMPORARY'],
+    postgresql_on_commit='DROP',
+)
+
+_staged = athlete_import.c
+_live = and_(AthleteModel.document == _staged.document, AthleteModel.deleted_at.is_(None))
+
+
+def missing_import_columns(header: list[str]) -> list[str]:
+    return [column for column in IMPORT_COLUMNS if column not in header]
+
+
+def _read_rows(
+    reader: csv.DictReader,
+    size: int,
+    categories: dict[str, int],
+    training_centers: dict[str, int],
+) -> tuple[int, list[tuple], list[list]]:
+    '''
+    Validate the next `size` rows: staging records for the valid ones, report
+    lines for the others.
+    '''
+    read, records, rejected = 0, [], []
+    for row in islice(reader, size):
+        read += 1
+        try:
+            athlete = AthletePost.model_validate({column: row[column] for column in IMPORT_COLUMNS})
+        except ValidationError as error:
+            reason = '; '.join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors())
+            rejected.append([reader.line_num, row['document'], reason])
+            continue
+
+        category_id = categories.get(athlete.category_name)
+        training_center_id = training_centers.get(athlete.training_center_name)
+        if not category_id:
+            rejected.append([reader.line_num, athlete.document, f'Category not found: {athlete.category_name}'])
+        elif not training_center_id:
+            rejected.append([
+                reader.line_num, athlete.document, f'Training Center not found: {athlete.training_center_name}'
+            ])
+        else:
+            records.append((
+                reader.line_num, uuid4(), uuid4(), athlete.name, athlete.document, athlete.age,
+                athlete.weight, athlete.height, athlete.gender, category_id, training_center_id,
+                athlete.category_name, athlete.training_center_name,
+            ))
+    return read, records, rejected
+
+
+def _write_report(file: TextIO, rows: list[list], header: bool) -> None:
+    writer = csv.writer(file)
+    if header:
+        writer.writerow(REPORT_COLUMNS)
+    writer.writerows(rows)
+
+
+def _event(athlete_id, event_type: str, columns: list[str]) -> Iterator:
+    '''
+    Outbox columns of the event of a staged athlete, with the API's payload.
+    '''
+    yield from (
+        _staged.event_id.label('event_id'),
+        literal('athlete').label('aggregate_type'),
+        athlete_id.label('aggregate_id'),
+        literal(f'athlete.{event_type}').label('event_type'),
+        func.jsonb_build_object(
+            'id', athlete_id, *chain.from_iterable((column, _staged[column]) for column in columns)
+        ).label('payload'),
+        func.now().label('created_at'),
+    )
+
+
+_EVENT_COLUMNS = ['id', 'aggregate_type', 'aggregate_id', 'event_type', 'payload', 'created_at']
+_STAGED_EVENT_COLUMNS = ['event_id', *_EVENT_COLUMNS[1:]]
+_UPDATED_COLUMNS = [column for column in IMPORT_COLUMNS if column != 'document']
+_MERGED_COLUMNS = ['name', 'age', 'weight', 'height', 'gender', 'category_id', 'training_center_id']
+
+
+async def _merge(
+    connection: AsyncConnection,
+    records: list[tuple],
+    on_conflict: Literal['skip', 'update'],
+) -> tuple[dict[str, int], list[list], list[str]]:
+    '''
+    Merge a batch into `athletes`, with its outbox events.
+
+    Returns the counts, the report lines and the cache keys to invalidate.
+    '''
+    await connection.execute(CreateTable(athlete_import))
+    driver = (await connection.get_raw_connection()).driver_connection
+    await driver.copy_records_to_table(
+        athlete_import.name, records=records, columns=[column.name for column in athlete_import.c]
+    )
+
+    # A document repeated in the file: the last row wins an update, the first a skip.
+    other = athlete_import.alias('other')
+    kept = other.c.line > _staged.line if on_conflict == 'update' else other.c.line < _staged.line
+    duplicates = (await connection.execute(
+        delete(athlete_import)
+        .where(other.c.document == _staged.document, kept)
+        .returning(_staged.line, _staged.document)
+    )).all()
+    report = [[line, document, 'Document repeated in the file'] for line, document in duplicates]
+
+    await connection.execute(select(func.pg_advisory_xact_lock(OUTBOX_LOCK_KEY)))
+
+    updated, cache_keys = 0, []
+    if on_conflict == 'update':
+        changed = (
+            update(AthleteModel)
+            .where(_live)
+            .values(**{column: _staged[column] for column in _MERGED_COLUMNS}, updated_at=func.now())
+            .returning(AthleteModel.id, AthleteModel.document, *_event(AthleteModel.id, 'updated', _UPDATED_COLUMNS))
+            .cte('changed')
+        )
+        events = insert(OutboxModel).from_select(
+            _EVENT_COLUMNS, select(*(changed.c[column] for column in _STAGED_EVENT_COLUMNS))
+        ).cte('events')
+        for athlete_id, document in await connection.execute(
+            select(changed.c.id, changed.c.document).add_cte(events)
+        ):
+            updated += 1
+            cache_keys += [f'athlete:id:{athlete_id}', f'athlete:document:{document}']
+    else:
+        skipped = (await connection.execute(select(_staged.line, _staged.document).where(exists().where(_live)))).all()
+        report += [[line, document, 'An athlete with this document already exists'] for line, document in skipped]
+
+    # Matched on the live documents rather than with ON CONFLICT, which needs
+    # the unique index a partitioned `athletes` does not have.
+    new_columns = ['id', 'document', *_MERGED_COLUMNS]
+    added = (
+        insert(AthleteModel)
+        .from_select(
+            [*new_columns, 'created_at', 'updated_at'],
+            select(*(_staged[column] for column in new_columns), func.now(), func.now()).where(~exists().where(_live))
+        )
+        .returning(AthleteModel.id)
+        .cte('added')
+    )
+    events = insert(OutboxModel).from_select(
+        _EVENT_COLUMNS,
+        select(*_event(_staged.id, 'created', IMPORT_COLUMNS)).join_from(added, athlete_import, added.c.id == _staged.id)
+    ).cte('events')
+    inserted = await connection.scalar(select(func.count()).select_from(added).add_cte(events))
+
+    counts = {'inserted': inserted, 'updated': updated, 'skipped': len(report) - len(duplicates)}
+    return counts, report, cache_keys
+
+
+async def _download_upload(job_pk_id: int, file: BinaryIO) -> int:
+    '''
+    Copy the file sent with a job to `file`, rewound, and return its size.
+    '''
+    async for data in read_parts(job_uploads, job_pk_id):
+        await asyncio.to_thread(file.write, data)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+@job_handler('athlete.import')
+async def import_athletes(context: JobContext, payload: dict[str, Any]) -> dict[str, Any]:
+    '''
+    Load the athletes of an uploaded CSV file, with the `AthletePost` columns.
+
+    Rows are validated as they are read; each batch is copied into a staging
+    table and merged on `document`: with `on_conflict` `skip` the athletes
+    already registered are kept, with `update` they are overwritten. Invalid
+    and skipped rows go to a report stored with the job.
+    '''
+    on_conflict = payload['on_conflict']
+
+    async with read_engine.connect() as connection:
+        categories = dict((await connection.execute(
+            select(CategoryModel.name, CategoryModel.pk_id).where(CategoryModel.deleted_at.is_(None))
+        )).all())
+        training_centers = dict((await connection.execute(
+            select(TrainingCenterModel.name, TrainingCenterModel.pk_id).where(TrainingCenterModel.deleted_at.is_(None))
+        )).all())
+
+    totals = {'inserted': 0, 'updated': 0, 'skipped': 0, 'rejected': 0}
+    with tempfile.TemporaryFile() as upload, tempfile.TemporaryFile() as output:
+        report_file = io.TextIOWrapper(output, newline='', encoding='utf-8')
+        await asyncio.to_thread(_write_report, report_file, [], True)
+        size = await _download_upload(context.pk_id, upload)
+        file = io.TextIOWrapper(upload, newline='', encoding='utf-8-sig')
+        reader = csv.DictReader(file)
+        if missing := missing_import_columns(reader.fieldnames or []):
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+        while True:
+            read, records, report = await asyncio.to_thread(
+                _read_rows, reader, settings.jobs_import_batch_size, categories, training_centers
+            )
+            if not read:
+                break
+            totals['rejected'] += len(report)
+
+            if records:
+                async with engine.begin() as connection:
+                    counts, merge_report, cache_keys = await _merge(connection, records, on_conflict)
+                await cache.invalidate(*cache_keys)
+                for key, count in counts.items():
+                    totals[key] += count
+                totals['rejected'] += len(merge_report) - counts['skipped']
+                report += merge_report
+
+            await asyncio.to_thread(_write_report, report_file, report, False)
+            await context.progress(file.buffer.tell() / size if size else 1.0)
+
+        await asyncio.to_thread(report_file.flush)
+        await context.store_file(output)
+
+    return {'file': f'athletes-import-{uuid4()}.csv', **totals}
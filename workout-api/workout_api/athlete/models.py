@@ -3,19 +3,45 @@ Models and Schemas for Athlete data representation.
 '''
 
 from datetime import datetime, timezone
-from sqlalchemy import ForeignKey, Integer, String, Float, DateTime
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Float, DateTime, Table, column, table, text
 from sqlalchemy.orm import  Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
-from workout_api.contrib.models import BaseModel
+from workout_api.configs.settings import settings
+from workout_api.contrib.models import BaseModel, SoftDeleteMixin
 
-class AthleteModel(BaseModel):
+# With `ATHLETE_PARTITIONS` set, `athletes` is hash partitioned by training
+# center (see the `partition_athletes` migration). Postgres only enforces
+# unique indexes that contain the partition key there, so `document` and `id`
+# uniqueness moves to the trigger-maintained `athlete_keys` table.
+ATHLETES_PARTITIONED = settings.athlete_partitions > 0
+
+class AthleteModel(BaseModel, SoftDeleteMixin):
     '''
     SQLAlchemy model for athlete data.
     '''
 
     __tablename__ = 'athletes'
+    __table_args__ = (
+        # Range scans for delta sync (`updated_since`), in a stable order.
+        Index('ix_athletes_updated_at_pk_id', 'updated_at', 'pk_id'),
+        # Live-row indexes: their predicate matches the soft delete filter.
+        Index('ix_athletes_document_live', 'document', unique=not ATHLETES_PARTITIONED, postgresql_where=text('deleted_at IS NULL')),
+        Index('ix_athletes_name_live', 'name', postgresql_where=text('deleted_at IS NULL')),
+        # Search filters (`GET /athletes`); they also serve the foreign keys.
+        Index('ix_athletes_category_id_gender_age_live', 'category_id', 'gender', 'age', postgresql_where=text('deleted_at IS NULL')),
+        Index('ix_athletes_training_center_id_created_at_live', 'training_center_id', 'created_at', postgresql_where=text('deleted_at IS NULL')),
+        {'postgresql_partition_by': 'HASH (training_center_id)'} if ATHLETES_PARTITIONED else {},
+    )
+
+    if ATHLETES_PARTITIONED:
+        id: Mapped[UUID] = mapped_column(
+            UUID(as_uuid=True),
+            default=uuid.uuid4,
+            nullable=False,
+            index=True
+        )
 
     pk_id: Mapped[int] = mapped_column(
         Integer, 
@@ -30,7 +56,6 @@ class AthleteModel(BaseModel):
 
     document: Mapped[str] = mapped_column(
         String(14),
-        unique=True,
         nullable=False
     )
     age: Mapped[int] = mapped_column(
@@ -70,6 +95,7 @@ class AthleteModel(BaseModel):
 
     training_center_id: Mapped[int] = mapped_column(
         ForeignKey('training_centers.pk_id'),
+        primary_key=ATHLETES_PARTITIONED,
         nullable=False
     )
     
@@ -84,3 +110,35 @@ class AthleteModel(BaseModel):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc)
     )
+
+
+if ATHLETES_PARTITIONED:
+    athlete_keys = Table(
+        'athlete_keys',
+        BaseModel.metadata,
+        Column('document', String(14), primary_key=True),
+        Column('athlete_id', UUID(as_uuid=True), nullable=False, unique=True),
+    )
+
+
+# With `ATHLETE_LISTINGS` set, the athlete reads go to `athlete_listings`: the
+# live athletes with their category and training center names, kept in sync
+# by triggers (see the `add_athlete_listings` migration). Not part of the
+# models' metadata, which would have autogenerate create it.
+athlete_listings = table(
+    'athlete_listings',
+    column('pk_id', Integer),
+    column('id', UUID(as_uuid=True)),
+    column('name', String),
+    column('document', String),
+    column('age', Integer),
+    column('weight', Float),
+    column('height', Float),
+    column('gender', String),
+    column('category_id', Integer),
+    column('training_center_id', Integer),
+    column('category_name', String),
+    column('training_center_name', String),
+    column('created_at', DateTime(timezone=True)),
+    column('updated_at', DateTime(timezone=True)),
+)
@@ -0,0 +1,158 @@
+'''
+Statements for the athlete queries.
+
+The hot lookups are lambda statements: they are built and cached once, and
+each call only binds its parameters.
+
+With `ATHLETE_LISTINGS` set, every statement reads the `athlete_listings`
+read model alone: it already holds the names and only the live athletes, and
+its covering indexes answer the lookups and searches with index-only scans.
+'''
+
+from enum import Enum
+from typing import Any, Optional
+
+from sqlalchemy import ColumnElement, RowMapping, StatementLambdaElement, lambda_stmt, select, true
+
+from workout_api.athlete.models import AthleteModel, athlete_listings
+from workout_api.category.models import CategoryModel
+from workout_api.configs.settings import settings
+from workout_api.training_center.models import TrainingCenterModel
+
+# Columns the athlete reads select, filter and sort on.
+athlete_columns = athlete_listings.c if settings.athlete_listings else AthleteModel
+
+# Criteria of the live athletes, for statements on `athlete_columns` alone.
+athlete_live = true() if settings.athlete_listings else AthleteModel.deleted_at.is_(None)
+
+
+def _joined_names(*columns):
+    return (
+        select(
+            *columns,
+            CategoryModel.name.label('category_name'),
+            TrainingCenterModel.name.label('training_center_name'),
+        )
+        .join(CategoryModel, CategoryModel.pk_id == AthleteModel.category_id)
+        .join(TrainingCenterModel, TrainingCenterModel.pk_id == AthleteModel.training_center_id)
+    )
+
+
+def _with_names(*columns):
+    if settings.athlete_listings:
+        return select(*columns, athlete_listings.c.category_name, athlete_listings.c.training_center_name)
+    return _joined_names(*columns).where(AthleteModel.deleted_at.is_(None))
+
+
+# Columns of `AthleteShort`.
+athlete_short = _with_names(
+    athlete_columns.id,
+    athlete_columns.created_at,
+    athlete_columns.updated_at,
+    athlete_columns.name,
+)
+
+# Columns of `AthleteResponse`.
+athlete_detail = _with_names(
+    athlete_columns.id,
+    athlete_columns.created_at,
+    athlete_columns.updated_at,
+    athlete_columns.name,
+    athlete_columns.document,
+    athlete_columns.age,
+    athlete_columns.weight,
+    athlete_columns.height,
+    athlete_columns.gender,
+)
+
+# Rows to count for a listing; the name joins do not change the total.
+athlete_count = select(athlete_columns.pk_id).where(athlete_live)
+
+# Columns of `AthleteShort` for a delta sync, deleted athletes included as
+# tombstones carrying `deleted_at`: read from `athletes` whatever the mode,
+# since `athlete_listings` only holds the live ones.
+athlete_sync = _joined_names(
+    AthleteModel.id,
+    AthleteModel.created_at,
+    AthleteModel.updated_at,
+    AthleteModel.name,
+    AthleteModel.deleted_at,
+)
+
+athlete_sync_count = select(AthleteModel.pk_id)
+
+
+class AthleteSort(str, Enum):
+    '''
+    Orders of an athlete listing; a leading `-` sorts descending.
+    '''
+    name = 'name'
+    name_desc = '-name'
+    age = 'age'
+    age_desc = '-age'
+    weight = 'weight'
+    weight_desc = '-weight'
+    created_at = 'created_at'
+    created_at_desc = '-created_at'
+
+
+def athlete_search(
+    category_id: Optional[int] = None,
+    training_center_id: Optional[int] = None,
+    gender: Optional[str] = None,
+    min_age: Optional[int] = None,
+    max_age: Optional[int] = None,
+    min_weight: Optional[float] = None,
+    max_weight: Optional[float] = None,
+    columns: Any = None,
+) -> list[ColumnElement[bool]]:
+    '''
+    Filters of an athlete search, on `columns` or else `athlete_columns`.
+    Category, gender and age match `ix_athletes_category_id_gender_age_live`,
+    in that order, or its `athlete_listings` counterpart.
+    '''
+    columns = athlete_columns if columns is None else columns
+    filters = []
+    if category_id is not None:
+        filters.append(columns.category_id == category_id)
+    if training_center_id is not None:
+        filters.append(columns.training_center_id == training_center_id)
+    if gender is not None:
+        filters.append(columns.gender == gender)
+    if min_age is not None:
+        filters.append(columns.age >= min_age)
+    if max_age is not None:
+        filters.append(columns.age <= max_age)
+    if min_weight is not None:
+        filters.append(columns.weight >= min_weight)
+    if max_weight is not None:
+        filters.append(columns.weight <= max_weight)
+    return filters
+
+
+def athlete_order(sort: AthleteSort) -> list[ColumnElement]:
+    '''
+    `ORDER BY` of a sorted listing, with `pk_id` to break ties between pages.
+    '''
+    column = getattr(athlete_columns, sort.value.lstrip('-'))
+    if sort.value.startswith('-'):
+        return [column.desc(), athlete_columns.pk_id.desc()]
+    return [column, athlete_columns.pk_id]
+
+
+def athlete_by_id(athlete_id) -> StatementLambdaElement:
+    return lambda_stmt(lambda: athlete_detail.where(athlete_columns.id == athlete_id))
+
+
+def athlete_by_document(document: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: athlete_detail.where(athlete_columns.document == document))
+
+
+def to_athlete(row: RowMapping) -> dict[str, Any]:
+    '''
+    Shape a row of `athlete_short`/`athlete_detail` like the response schemas.
+    '''
+    athlete = dict(row)
+    athlete['category'] = {'name': athlete.pop('category_name')}
+    athlete['training_center'] = {'name': athlete.pop('training_center_name')}
+    return athlete
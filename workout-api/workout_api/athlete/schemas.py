@@ -3,7 +3,7 @@ Schemas for athlete-related data.
 '''
 
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Optional
 from pydantic import UUID4, Field, PositiveFloat
 
 from workout_api.contrib.schemas import BaseSchema, OutMixin
@@ -24,6 +24,10 @@ class AthleteShort(OutMixin):
     name: Annotated[str, Field(description="Nome do atleta", example='Joao Silva Santos')]
     category: CategoryName
     training_center: TrainingCenterName
+    deleted_at: Annotated[
+        Optional[datetime],
+        Field(description="When the athlete was deleted, on the tombstones of a sync", example=None)
+    ] = None
 
 class AthleteBase(BaseSchema):
     '''
@@ -1,12 +1,16 @@
+from datetime import datetime, timezone
 from uuid import uuid4
-from fastapi import APIRouter, Body, HTTPException, status
+from fastapi import APIRouter, Body, HTTPException, Request, Response, status
 from pydantic import UUID4
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
+from workout_api.athlete.models import AthleteModel
 from workout_api.category.models import CategoryModel
+from workout_api.category.queries import category_by_id, category_detail
 from workout_api.category.schemas import CategoryPost, CategoryResponse
-from workout_api.contrib.dependencies import DatabaseDependency
+from workout_api.contrib.conditional import check_etag, fingerprint
+from workout_api.contrib.dependencies import DatabaseDependency, ReadConnectionDependency
 
 router = APIRouter()
 
@@ -37,15 +41,22 @@ async def create_category(
 @router.get(
     "/",
     summary="List all categories",
-    description="Endpoint to list all categories in the system.",
+    description="Endpoint to list all categories in the system. "
+                "Sends a weak `ETag` and answers `If-None-Match` with 304 when unchanged.",
     status_code=status.HTTP_200_OK,
     response_model=list[CategoryResponse]
 )
 async def get_all(
-    db_session: DatabaseDependency,
+    db_connection: ReadConnectionDependency,
+    request: Request,
+    response: Response,
 ) -> list[CategoryResponse]:
+    await check_etag(
+        request, response, db_connection,
+        fingerprint(CategoryModel.updated_at, CategoryModel.deleted_at.is_(None))
+    )
     categories = (
-        (await db_session.execute(select(CategoryModel))).scalars().all()
+        (await db_connection.execute(category_detail)).mappings().all()
     )
     return categories
 
@@ -59,16 +70,54 @@ async def get_all(
 )
 async def get_by_id(
     category_id: UUID4,
-    db_session: DatabaseDependency,
+    db_connection: ReadConnectionDependency,
 ) -> CategoryResponse:
+    category = (
+        (await db_connection.execute(
+            category_by_id(category_id)
+        )).mappings().first()
+    )
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Category not found with id: {category_id}"
+        )
+    return category
+
+
+@router.delete(
+    "/{category_id}",
+    summary="Delete a category by ID",
+    description="Endpoint to soft delete a category by its ID. "
+                "A category with athletes still assigned to it cannot be deleted.",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def delete_category(
+    category_id: UUID4,
+    db_session: DatabaseDependency,
+) -> None:
     category = (
         (await db_session.execute(
             select(CategoryModel).filter_by(id=category_id)
         )).scalars().first()
     )
+
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Category not found with id: {category_id}"
         )
-    return category
+
+    has_athletes = (
+        await db_session.execute(
+            select(AthleteModel.pk_id).filter_by(category_id=category.pk_id).limit(1)
+    )).first()
+
+    if has_athletes:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Category {category.name} still has athletes assigned."
+        )
+
+    category.deleted_at = datetime.now(timezone.utc)
+    await db_session.commit()
@@ -0,0 +1,30 @@
+'''
+Statements for the category queries.
+'''
+
+from sqlalchemy import StatementLambdaElement, lambda_stmt, select
+
+from workout_api.category.models import CategoryModel
+
+
+# Columns of `CategoryResponse`.
+category_detail = select(
+    CategoryModel.id,
+    CategoryModel.created_at,
+    CategoryModel.updated_at,
+    CategoryModel.name,
+    CategoryModel.description,
+).where(CategoryModel.deleted_at.is_(None))
+
+
+def category_by_id(category_id) -> StatementLambdaElement:
+    return lambda_stmt(lambda: category_detail.where(CategoryModel.id == category_id))
+
+
+def category_pk_by_name(name: str) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(CategoryModel.pk_id).where(
+            CategoryModel.name == name,
+            CategoryModel.deleted_at.is_(None)
+        )
+    )
@@ -0,0 +1,72 @@
+import asyncio
+
+from fastapi import APIRouter, Body, status
+
+from workout_api.athlete.queries import to_athlete
+from workout_api.composite.loaders import Loaders
+from workout_api.composite.schemas import CompositeQuery, CompositeResponse
+from workout_api.contrib.dependencies import ReadConnectionDependency
+
+router = APIRouter()
+
+
+def _missing(ids: list, found) -> list:
+    found = set(found)
+    return [id for id in ids if id not in found]
+
+
+async def _expand(athlete: dict, include: list[str], loaders: Loaders) -> dict:
+    category_pk = athlete.pop('category_id')
+    training_center_pk = athlete.pop('training_center_id')
+    athlete = to_athlete(athlete)
+    relations = {}
+    if 'category' in include:
+        relations['category'] = loaders.categories.load(category_pk)
+    if 'training_center' in include:
+        relations['training_center'] = loaders.training_centers.load(training_center_pk)
+    # Loaded together, so every athlete's relations go in the same batches.
+    for name, value in zip(relations, await asyncio.gather(*relations.values())):
+        athlete[name] = value
+    return athlete
+
+
+@router.post(
+    "/",
+    summary="Read athletes, categories and training centers at once",
+    description="Endpoint to read what one screen needs in one request. Athletes can include "
+                "their category and training center in full; those are read in one query per "
+                "relation, whatever the number of athletes.",
+    status_code=status.HTTP_200_OK,
+    response_model=CompositeResponse,
+)
+async def read(
+    db_connection: ReadConnectionDependency,
+    query: CompositeQuery = Body(...),
+) -> CompositeResponse:
+    loaders = Loaders(db_connection)
+    response = {'not_found': {}}
+
+    # First, so the relations of the athletes may already be loaded.
+    if query.categories:
+        categories = await loaders.list_categories(query.categories.ids)
+        response['categories'] = categories
+        if query.categories.ids and (missing := _missing(query.categories.ids, (c['id'] for c in categories))):
+            response['not_found']['categories'] = missing
+    if query.training_centers:
+        training_centers = await loaders.list_training_centers(query.training_centers.ids)
+        response['training_centers'] = training_centers
+        if query.training_centers.ids and (
+            missing := _missing(query.training_centers.ids, (t['id'] for t in training_centers))
+        ):
+            response['not_found']['training_centers'] = missing
+
+    if query.athletes:
+        ids = list(dict.fromkeys(query.athletes.ids))
+        athletes = [athlete for athlete in await loaders.athletes.load_many(ids) if athlete]
+        if missing := _missing(ids, (a['id'] for a in athletes)):
+            response['not_found']['athletes'] = missing
+        response['athletes'] = await asyncio.gather(
+            *(_expand(athlete, query.athletes.include, loaders) for athlete in athletes)
+        )
+
+    return response
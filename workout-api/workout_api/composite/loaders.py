@@ -0,0 +1,78 @@
+'''
+Batched reads of a composite request.
+
+Athletes load by public ID, categories and training centers by primary key,
+which is how athletes refer to them: expanding the relations of any number
+of athletes takes one query per relation. The lists selected directly prime
+the loaders, so the relations they already hold are not read again.
+'''
+
+import asyncio
+from typing import Any, Optional
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from workout_api.athlete.queries import athlete_columns, athlete_detail
+from workout_api.category.models import CategoryModel
+from workout_api.category.queries import category_detail
+from workout_api.contrib.dataloader import DataLoader
+from workout_api.training_center.models import TrainingCenterModel
+from workout_api.training_center.queries import training_center_detail
+
+
+class Loaders:
+    '''
+    The loaders of one request. They share its connection, which runs one
+    query at a time.
+    '''
+
+    def __init__(self, connection: AsyncConnection) -> None:
+        self._connection = connection
+        self._lock = asyncio.Lock()
+        self.athletes: DataLoader[Any, dict] = DataLoader(self._load_athletes)
+        self.categories: DataLoader[int, dict] = DataLoader(self._load_categories)
+        self.training_centers: DataLoader[int, dict] = DataLoader(self._load_training_centers)
+
+    async def _rows(self, statement: Select) -> list[dict]:
+        async with self._lock:
+            return [dict(row) for row in (await self._connection.execute(statement)).mappings()]
+
+    async def _load_athletes(self, ids: list) -> dict[Any, dict]:
+        rows = await self._rows(
+            athlete_detail
+            .add_columns(athlete_columns.category_id, athlete_columns.training_center_id)
+            .where(athlete_columns.id.in_(ids))
+        )
+        return {row['id']: row for row in rows}
+
+    async def _by_pk(self, statement: Select) -> dict[int, dict]:
+        return {row.pop('pk_id'): row for row in await self._rows(statement)}
+
+    async def _load_categories(self, pks: list[int]) -> dict[int, dict]:
+        return await self._by_pk(
+            category_detail.add_columns(CategoryModel.pk_id).where(CategoryModel.pk_id.in_(pks))
+        )
+
+    async def _load_training_centers(self, pks: list[int]) -> dict[int, dict]:
+        return await self._by_pk(
+            training_center_detail
+            .add_columns(TrainingCenterModel.pk_id)
+            .where(TrainingCenterModel.pk_id.in_(pks))
+        )
+
+    async def _list(self, loader: DataLoader, statement: Select, ids: Optional[list]) -> list[dict]:
+        if ids is not None:
+            statement = statement.where(statement.selected_columns.id.in_(ids))
+        values = await self._by_pk(statement)
+        for pk, value in values.items():
+            loader.prime(pk, value)
+        return list(values.values())
+
+    async def list_categories(self, ids: Optional[list] = None) -> list[dict]:
+        return await self._list(self.categories, category_detail.add_columns(CategoryModel.pk_id), ids)
+
+    async def list_training_centers(self, ids: Optional[list] = None) -> list[dict]:
+        return await self._list(
+            self.training_centers, training_center_detail.add_columns(TrainingCenterModel.pk_id), ids
+        )
@@ -0,0 +1,78 @@
+'''
+Schemas for the composite reads.
+'''
+
+from typing import Annotated, Literal, Optional
+from pydantic import UUID4, Field
+
+from workout_api.athlete.schemas import AthleteBase, CategoryName, TrainingCenterName
+from workout_api.category.schemas import CategoryResponse
+from workout_api.configs.settings import settings
+from workout_api.contrib.schemas import BaseSchema, OutMixin
+from workout_api.training_center.schemas import TrainingCenterResponse
+
+
+class AthleteSelection(BaseSchema):
+    '''
+    Athletes to read, and which of their relations to read in full.
+    '''
+    ids: Annotated[
+        list[UUID4],
+        Field(
+            description="IDs of the athletes",
+            max_length=settings.composite_max_ids
+        )
+    ]
+    include: Annotated[
+        list[Literal['category', 'training_center']],
+        Field(
+            description="Relations to return in full instead of by name",
+            example=['category', 'training_center']
+        )
+    ] = []
+
+
+class EntitySelection(BaseSchema):
+    '''
+    Categories or training centers to read: all of them when `ids` is absent.
+    '''
+    ids: Annotated[
+        Optional[list[UUID4]],
+        Field(
+            description="IDs to read, or null for all",
+            max_length=settings.composite_max_ids
+        )
+    ] = None
+
+
+class CompositeQuery(BaseSchema):
+    '''
+    Schema of a composite read: each selection is optional.
+    '''
+    athletes: Optional[AthleteSelection] = None
+    categories: Optional[EntitySelection] = None
+    training_centers: Optional[EntitySelection] = None
+
+
+class AthleteExpanded(AthleteBase, OutMixin):
+    '''
+    Schema for an athlete with its relations, in full when included.
+    '''
+    category: CategoryResponse | CategoryName | None
+    training_center: TrainingCenterResponse | TrainingCenterName | None
+
+
+class CompositeResponse(BaseSchema):
+    '''
+    Schema for the result of a composite read.
+    '''
+    athletes: list[AthleteExpanded] = []
+    categories: list[CategoryResponse] = []
+    training_centers: list[TrainingCenterResponse] = []
+    not_found: Annotated[
+        dict[str, list[UUID4]],
+        Field(
+            description="Requested IDs that were not found, by selection",
+            example={'athletes': ['3fa85f64-5717-4562-b3fc-2c963f66afa6']}
+        )
+    ] = {}
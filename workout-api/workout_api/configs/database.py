@@ -1,24 +1,247 @@
-from typing import AsyncGenerator
+'''
+The engine, and what protects requests from an unreachable database.
 
+Connecting gives up after `DATABASE_CONNECT_TIMEOUT` seconds instead of
+hanging. `database_breaker` counts connect failures and disconnects reported
+by the engine events: after `DATABASE_BREAKER_THRESHOLD` of them in a row,
+requests fail fast with `DatabaseUnavailable` (503) for
+`DATABASE_BREAKER_RESET` seconds, then one request probes the database.
+Reads, in autocommit, are safe to repeat: their connection retries them
+`DATABASE_RETRY_ATTEMPTS` times, with jittered backoff, while the breaker
+stays closed. Writes are not retried.
+'''
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import asyncio
+from contextlib import contextmanager
+from typing import AsyncGenerator, Iterator
+from uuid import uuid4
+
+
+from asyncpg.exceptions import CannotConnectNowError
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 
 from workout_api.configs.settings import settings
+from workout_api.contrib.resilience import CircuitBreaker, retry
+from workout_api.monitoring.phases import current_profile, phase
+
+
+def _connect_args() -> dict:
+    '''
+    asyncpg prepared statement options for the configured PgBouncer mode.
+    '''
+    if settings.database_pgbouncer == 'none':
+        return {
+            'timeout': settings.database_connect_timeout,
+            'prepared_statement_cache_size': settings.database_statement_cache_size,
+        }
+
+    # Behind PgBouncer a server connection is shared by many clients, so
+    # statement names must not collide between them.
+    connect_args = {
+        'timeout': settings.database_connect_timeout,
+        'prepared_statement_name_func': lambda: f'__asyncpg_{uuid4()}__',
+    }
+    if settings.database_pgbouncer == 'protocol':
+        # PgBouncer >= 1.21 with max_prepared_statements tracks prepared
+        # statements per client, so the cache can stay on.
+        connect_args['prepared_statement_cache_size'] = settings.database_statement_cache_size
+    else:
+        # Older PgBouncer in transaction mode cannot keep them at all.
+        connect_args['prepared_statement_cache_size'] = 0
+        connect_args['statement_cache_size'] = 0
+    return connect_args
+
 
+def _pool_options() -> dict:
+    '''
+    Pool of this process: its share of `DATABASE_MAX_CONNECTIONS` among the
+    `SERVER_WORKERS` processes, or SQLAlchemy's default pool without a budget.
+    '''
+    if not settings.database_max_connections:
+        return {}
+
+    share = settings.database_max_connections // max(settings.server_workers, 1)
+    if share < 1:
+        raise ValueError(
+            f'DATABASE_MAX_CONNECTIONS={settings.database_max_connections} leaves no connection '
+            f'to each of {settings.server_workers} workers'
+        )
+    # No overflow: the processes together never exceed the budget.
+    return {'pool_size': share, 'max_overflow': 0, 'pool_timeout': settings.database_pool_timeout}
+
+
+connect_args = _connect_args()
 
 engine = create_async_engine(
     settings.database_url,
-    echo=False
+    echo=False,
+    query_cache_size=settings.database_query_cache_size,
+    connect_args=connect_args,
+    pool_pre_ping=settings.database_pool_pre_ping,
+    **_pool_options()
 )
 
+# Same pool as `engine`; reads run without BEGIN/ROLLBACK round trips.
+read_engine = engine.execution_options(isolation_level='AUTOCOMMIT')
+
 async_session_maker = sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
+
+class QueryCacheStats:
+    '''
+    Counts how often executed statements were found in the compiled cache.
+    '''
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    def record(self, cache_hit) -> None:
+        if cache_hit is CACHE_HIT:
+            self.hits += 1
+        elif cache_hit is CACHE_MISS:
+            self.misses += 1
+        else:
+            self.uncached += 1
+
+    @property
+    def hit_ratio(self) -> float:
+        cached = self.hits + self.misses
+        return self.hits / cached if cached else 0.0
+
+
+query_cache_stats = QueryCacheStats()
+
+
+@event.listens_for(engine.sync_engine, 'after_cursor_execute')
+def _record_query_cache(conn, cursor, statement, parameters, context, executemany) -> None:
+    query_cache_stats.record(context.cache_hit)
+
+
+class DatabaseUnavailable(Exception):
+    '''
+    The database cannot be reached, or the breaker is open.
+    '''
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__('Database unavailable')
+        self.retry_after = retry_after
+
+
+# Raised as they are when connecting, unlike the errors of a connection.
+_CONNECT_ERRORS = (OSError, asyncio.TimeoutError, CannotConnectNowError)
+
+
+def is_unavailable(error: BaseException) -> bool:
+    '''
+    Whether `error` means the database could not be reached, rather than
+    that it rejected a statement.
+    '''
+    if isinstance(error, DBAPIError):
+        return error.connection_invalidated
+    return isinstance(error, _CONNECT_ERRORS)
+
+
+database_breaker = CircuitBreaker(settings.database_breaker_threshold, settings.database_breaker_reset)
+
+
+@event.listens_for(engine.sync_engine, 'do_connect')
+def _connect(dialect, conn_rec, cargs, cparams):
+    # Connect failures are raised as they are, without `handle_error`.
+    try:
+        return dialect.connect(*cargs, **cparams)
+    except Exception as error:
+        if is_unavailable(error):
+            database_breaker.record_failure()
+        raise
+
+
+@event.listens_for(engine.sync_engine, 'handle_error')
+def _record_disconnect(context) -> None:
+    # Failures to reconnect come here too, already counted by `_connect`.
+    if context.is_disconnect and not isinstance(context.original_exception, _CONNECT_ERRORS):
+        database_breaker.record_failure()
+
+
+@event.listens_for(engine.sync_engine, 'connect')
+@event.listens_for(engine.sync_engine, 'after_cursor_execute')
+def _record_success(*args) -> None:
+    database_breaker.record_success()
+
+
+def _check_breaker() -> None:
+    if not database_breaker.allow():
+        raise DatabaseUnavailable(database_breaker.retry_after())
+
+
+def _retryable(error: BaseException) -> bool:
+    return is_unavailable(error) and database_breaker.state == CircuitBreaker.CLOSED
+
+
+async def _retry(call):
+    return await retry(
+        call,
+        settings.database_retry_attempts,
+        settings.database_retry_backoff,
+        settings.database_retry_backoff_max,
+        _retryable,
+    )
+
+
+class ReadConnection(AsyncConnection):
+    '''
+    Connection of the read endpoints, running each statement again, on a new
+    connection, when the database went away under it.
+    '''
+
+    async def execute(self, statement, parameters=None, *, execution_options=None):
+        async def attempt():
+            if self.invalidated:
+                # Reconnects on the next statement.
+                await self.rollback()
+            return await super(ReadConnection, self).execute(
+                statement, parameters, execution_options=execution_options
+            )
+        return await _retry(attempt)
+
+
+@contextmanager
+def _unavailable_as_503() -> Iterator[None]:
+    try:
+        yield
+    except Exception as error:
+        if is_unavailable(error):
+            raise DatabaseUnavailable(database_breaker.retry_after()) from error
+        raise
+
+
 async def get_async_session() -> AsyncGenerator:
+    _check_breaker()
     async with async_session_maker() as session:
-        yield session
\ No newline at end of file
+        with _unavailable_as_503():
+            if current_profile() is not None:
+                # Check out up front, so the wait is timed apart from the endpoint.
+                with phase('pool'):
+                    await session.connection()
+            yield session
+
+async def get_async_connection() -> AsyncGenerator:
+    _check_breaker()
+    connection = ReadConnection(read_engine)
+    with _unavailable_as_503():
+        with phase('pool'):
+            await _retry(connection.start)
+        try:
+            yield connection
+        finally:
+            await connection.close()
@@ -0,0 +1,219 @@
+'''
+Cache shared by the workers, with the loads of a missing key coalesced.
+
+`CACHE_URL` picks the backend: `memory://` keeps the entries in the process,
+`redis://...` keeps them in Redis (needs the `redis` package, see
+`requeriments-redis.txt`) so every worker and node sees the same entries and
+invalidations.
+
+Each key has a generation, bumped when it is invalidated. A load stores its
+value only if the generation it read first is still current, so a value read
+before an invalidation on any worker is never stored after it.
+'''
+
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from workout_api.configs.settings import settings
+
+# Seconds the generation of an invalidated key is kept: past any load.
+GENERATION_TTL = 24 * 60 * 60
+
+
+class CacheBackend(ABC):
+    '''
+    Storage of serialized entries with an expiry, and of their generations.
+    '''
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def generation(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: float, generation: int) -> bool:
+        '''
+        Store `value` unless the generation of `key` is no longer `generation`.
+        '''
+
+    @abstractmethod
+    async def invalidate(self, *keys: str) -> None:
+        '''
+        Drop the entries of `keys` and bump their generations.
+        '''
+
+
+class MemoryBackend(CacheBackend):
+    '''
+    Bounded in-process backend, evicting the least recently used entries.
+    '''
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._generations: OrderedDict[str, int] = OrderedDict()
+        # Generation of the keys without one of their own. Past every evicted
+        # generation, so a load that read one is not stored after its eviction.
+        self._floor = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def generation(self, key: str) -> int:
+        return self._generations.get(key, self._floor)
+
+    async def set(self, key: str, value: str, ttl: float, generation: int) -> bool:
+        if self._generations.get(key, self._floor) != generation:
+            return False
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return True
+
+    async def invalidate(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+            self._generations[key] = max(self._generations.get(key, self._floor), self._floor) + 1
+            self._generations.move_to_end(key)
+        while len(self._generations) > self.max_size:
+            self._floor = max(self._floor, self._generations.popitem(last=False)[1])
+
+
+class RedisBackend(CacheBackend):
+    '''
+    Backend on a Redis server, shared by every worker.
+
+    The generation of a key is kept in `<key>:generation`, and compared with
+    the one read before the load by a script, in the same step as the store.
+    '''
+
+    _SET = '''
+    if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[3] then
+        return 0
+    end
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+    '''
+
+    def __init__(self, url: str) -> None:
+        try:
+            from redis.asyncio import Redis
+        except ImportError as error:
+            raise RuntimeError(f'The redis package is required for CACHE_URL={url}') from error
+        self._client = Redis.from_url(url, decode_responses=True)
+        self._set = self._client.register_script(self._SET)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def generation(self, key: str) -> int:
+        return int(await self._client.get(f'{key}:generation') or 0)
+
+    async def set(self, key: str, value: str, ttl: float, generation: int) -> bool:
+        return bool(await self._set(
+            keys=[key, f'{key}:generation'], args=[value, int(ttl * 1000), generation]
+        ))
+
+    async def invalidate(self, *keys: str) -> None:
+        async with self._client.pipeline(transaction=True) as pipeline:
+            for key in keys:
+                pipeline.incr(f'{key}:generation')
+                pipeline.expire(f'{key}:generation', GENERATION_TTL)
+            pipeline.delete(*keys)
+            await pipeline.execute()
+
+
+class Cache:
+    '''
+    JSON cache over a backend.
+
+    Concurrent misses on a key in this process share a single load, so a hot
+    key that expires costs one query instead of one per waiting request.
+    '''
+
+    def __init__(self, backend: CacheBackend, ttl: float, prefix: str = 'workout_api:') -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        self._loads: dict[str, asyncio.Future] = {}
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        '''
+        Return the entry of `key`, loading and storing it on a miss.
+
+        A `None` from `loader` is returned but not stored.
+        '''
+        key = self.prefix + key
+        cached = await self.backend.get(key)
+        if cached is not None:
+            return json.loads(cached)
+
+        while (load := self._loads.get(key)) is not None:
+            try:
+                return await asyncio.shield(load)
+            except asyncio.CancelledError:
+                # Only retry when the request running the load was cancelled.
+                if not load.cancelled():
+                    raise
+
+        load = asyncio.get_running_loop().create_future()
+        self._loads[key] = load
+        try:
+            # Read first: an invalidation during the load, on any worker, bumps it.
+            generation = await self.backend.generation(key)
+            value = jsonable_encoder(await loader())
+            if value is not None:
+                await self.backend.set(key, json.dumps(value), self.ttl, generation)
+        except Exception as error:
+            load.set_exception(error)
+            # Mark the exception as retrieved when nobody else was waiting.
+            load.exception()
+            raise
+        except BaseException:
+            load.cancel()
+            raise
+        else:
+            load.set_result(value)
+            return value
+        finally:
+            if self._loads.get(key) is load:
+                del self._loads[key]
+
+    async def invalidate(self, *keys: str) -> None:
+        '''
+        Drop the entries of `keys`. Call it after the change is committed.
+        '''
+        keys = [self.prefix + key for key in keys]
+        # Later misses load again instead of waiting for a stale load.
+        for key in keys:
+            self._loads.pop(key, None)
+        await self.backend.invalidate(*keys)
+
+
+def create_backend(url: str) -> CacheBackend:
+    if url.startswith('memory://'):
+        return MemoryBackend(settings.cache_size)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend(url)
+    raise ValueError(f'Unsupported CACHE_URL: {url}')
+
+
+cache = Cache(create_backend(settings.cache_url), settings.cache_ttl)
@@ -0,0 +1,169 @@
+'''
+Response compression negotiated from `Accept-Encoding`.
+
+gzip is always offered; zstd and brotli are offered when the `zstandard` and
+`brotli` packages are installed. Bodies sent in one piece are compressed only
+from `minimum_size` bytes; streamed bodies are always compressed.
+'''
+
+import zlib
+from typing import Callable, Optional, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    def flush(self) -> bytes:
+        ...
+
+
+class _Brotli:
+    def __init__(self) -> None:
+        self._compressor = brotli.Compressor(quality=4)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _gzip() -> Compressor:
+    return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+# Preferred first when the client accepts several with the same weight.
+ENCODINGS: dict[str, Callable[[], Compressor]] = {}
+if zstandard is not None:
+    ENCODINGS['zstd'] = lambda: zstandard.ZstdCompressor(level=3).compressobj()
+if brotli is not None:
+    ENCODINGS['br'] = _Brotli
+ENCODINGS['gzip'] = _gzip
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    '''
+    Pick the supported encoding with the highest weight in `accept_encoding`.
+    '''
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        weight = 1.0
+        if params.strip().startswith('q='):
+            try:
+                weight = float(params.strip()[2:])
+            except ValueError:
+                continue
+        weights[name.strip().lower()] = weight
+
+    candidates = [
+        (weights.get(encoding, weights.get('*', 0.0)), -rank, encoding)
+        for rank, encoding in enumerate(ENCODINGS)
+    ]
+    weight, _, encoding = max(candidates)
+    return encoding if weight > 0 else None
+
+
+class CompressionMiddleware:
+    '''
+    ASGI middleware compressing the responses of compressible media types.
+    '''
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressedResponse(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class _CompressedResponse:
+    '''
+    Send wrapper for a single response.
+    '''
+
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int) -> None:
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor: Optional[Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self._send)
+
+    async def _send(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            headers = Headers(raw=message['headers'])
+            content_type = headers.get('content-type', '')
+            self.passthrough = (
+                'content-encoding' in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                # Held until the first body chunk tells how large it is.
+                self.start = message
+            return
+
+        if message['type'] != 'http.response.body' or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=start['headers'])
+            headers.add_vary_header('Accept-Encoding')
+            if not more_body and (not body or len(body) < self.minimum_size):
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+
+            self.compressor = ENCODINGS[self.encoding]()
+            headers['Content-Encoding'] = self.encoding
+            if 'content-length' in headers:
+                del headers['Content-Length']
+            if not more_body:
+                body = self.compressor.compress(body) + self.compressor.flush()
+                headers['Content-Length'] = str(len(body))
+                await self.send(start)
+                await self.send({'type': 'http.response.body', 'body': body})
+                return
+            await self.send(start)
+
+        body = self.compressor.compress(body)
+        if not more_body:
+            body += self.compressor.flush()
+        await self.send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
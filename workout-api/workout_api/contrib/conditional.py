@@ -0,0 +1,63 @@
+'''
+Weak ETags for listings, answered with 304 when unchanged.
+
+`check_etag` derives the tag from the latest `updated_at` and the row count
+of the filtered rows, plus the request path and query string, so it is
+checked with one aggregate query before any row is read or serialized. That
+aggregate reads every matching row: for paginated listings of large tables,
+`check_page_etag` derives the tag from the page already read instead.
+'''
+
+import hashlib
+from typing import Any
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import ColumnElement, Select, func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+
+def fingerprint(updated_at: ColumnElement, *criteria: ColumnElement) -> Select:
+    '''
+    Latest `updated_at` and row count of the rows matching `criteria`.
+    '''
+    return select(func.max(updated_at), func.count()).where(*criteria)
+
+
+def _matches(etag: str, if_none_match: str) -> bool:
+    # Weak comparison: the W/ prefix is ignored on both sides.
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return '*' in tags or etag.removeprefix('W/') in tags
+
+
+async def check_etag(
+    request: Request,
+    response: Response,
+    db: AsyncSession | AsyncConnection,
+    statement: Select,
+) -> None:
+    '''
+    Set the ETag of the listing fingerprinted by `statement`, and raise
+    304 Not Modified when the client already holds it.
+    '''
+    latest, total = (await db.execute(statement)).one()
+    _check(request, response, f'{latest!r}|{total}')
+
+
+def check_page_etag(request: Request, response: Response, page: Any) -> None:
+    '''
+    Set the ETag of a page already read, derived from its items and total,
+    and raise 304 Not Modified when the client already holds it.
+    '''
+    _check(request, response, repr((page.total, page.items)))
+
+
+def _check(request: Request, response: Response, version: str) -> None:
+    digest = hashlib.blake2b(
+        f'{version}|{request.url.path}?{request.url.query}'.encode(),
+        digest_size=12
+    ).hexdigest()
+    etag = f'W/"{digest}"'
+
+    if _matches(etag, request.headers.get('if-none-match', '')):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    response.headers['ETag'] = etag
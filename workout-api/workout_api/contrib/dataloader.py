@@ -0,0 +1,73 @@
+'''
+Batching of lookups by key, after the DataLoader pattern.
+
+The `load` calls made while resolving independent items, in the same turn of
+the event loop, are answered by a single call of the batch function, e.g.
+one `WHERE pk_id IN (...)` query instead of one query per item.
+'''
+
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, Iterable, Mapping, Optional, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class DataLoader(Generic[K, V]):
+    '''
+    Loads values by key in batches, remembering them: create one per request.
+
+    `batch_load` gets the distinct keys not loaded yet and returns their
+    values by key; keys missing from the result load as `None`.
+    '''
+
+    def __init__(self, batch_load: Callable[[list[K]], Awaitable[Mapping[K, V]]]) -> None:
+        self._batch_load = batch_load
+        self._values: dict[K, asyncio.Future] = {}
+        self._pending: list[K] = []
+        self._batches: set[asyncio.Task] = set()
+
+    def load(self, key: K) -> Awaitable[Optional[V]]:
+        value = self._values.get(key)
+        if value is None:
+            loop = asyncio.get_running_loop()
+            value = self._values[key] = loop.create_future()
+            self._pending.append(key)
+            if len(self._pending) == 1:
+                # After the tasks already scheduled, which may load more keys.
+                loop.call_soon(self._dispatch)
+        return value
+
+    async def load_many(self, keys: Iterable[K]) -> list[Optional[V]]:
+        return list(await asyncio.gather(*map(self.load, keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        '''
+        Remember a value read by other means, unless `key` is already loaded.
+        '''
+        if key not in self._values:
+            future = self._values[key] = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+
+    def _dispatch(self) -> None:
+        keys, self._pending = self._pending, []
+        batch = asyncio.ensure_future(self._run(keys))
+        self._batches.add(batch)
+        batch.add_done_callback(self._batches.discard)
+
+    async def _run(self, keys: list[K]) -> None:
+        try:
+            values = await self._batch_load(keys)
+        except asyncio.CancelledError:
+            for key in keys:
+                self._values[key].cancel()
+            raise
+        except Exception as error:
+            # Raised to whoever awaits the keys, not left in this task.
+            for key in keys:
+                if not self._values[key].done():
+                    self._values[key].set_exception(error)
+            return
+        for key in keys:
+            if not self._values[key].done():
+                self._values[key].set_result(values.get(key))
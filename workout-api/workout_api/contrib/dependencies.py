@@ -1,7 +1,9 @@
 from typing_extensions import Annotated
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 from fastapi import Depends
 
-from workout_api.configs.database import get_async_session
+from workout_api.configs.database import get_async_connection, get_async_session
 
-DatabaseDependency = Annotated[AsyncSession, Depends(get_async_session)]
\ No newline at end of file
+DatabaseDependency = Annotated[AsyncSession, Depends(get_async_session)]
+
+ReadConnectionDependency = Annotated[AsyncConnection, Depends(get_async_connection)]
@@ -0,0 +1,351 @@
+'''
+Online, lock-safe migration helpers and the linter run by `alembic/env.py`.
+
+Most `ALTER TABLE` forms take an ACCESS EXCLUSIVE lock: queued behind a long
+query, they stall every later read of the table, and some of them (changing
+a column type, a volatile default, `SET NOT NULL`, validating a constraint)
+rewrite or scan the whole table while holding it. The helpers keep locks
+short:
+
+- `guard` bounds lock waits and statements with `lock_timeout` and
+  `statement_timeout`, so a blocked migration fails fast instead of stalling
+  the app; it can simply be retried.
+- `create_index_concurrently`/`drop_index_concurrently` build and drop
+  indexes without blocking writes.
+- `backfill` updates a table in short batches by key range, with progress,
+  and `backfill_insert` fills a new one the same way.
+- `add_not_null` and `add_foreign_key` validate existing rows under a lock
+  that still allows reads and writes.
+
+The concurrent operations cannot run in a transaction: they commit the
+migration up to that point, so put them last or in their own revision.
+'''
+
+import logging
+import re
+from contextlib import contextmanager
+from typing import Iterator, Optional, Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from alembic.util import CommandError
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+
+from workout_api.configs.settings import settings
+
+logger = logging.getLogger('alembic.online')
+
+# Set on the migration connection while a helper runs its own vetted DDL.
+_TRUSTED = 'online_migration_trusted'
+_LINTER = 'online_migration_linter'
+
+
+@contextmanager
+def _trusted() -> Iterator[None]:
+    info = op.get_bind().info
+    info[_TRUSTED] = True
+    try:
+        yield
+    finally:
+        info.pop(_TRUSTED, None)
+
+
+@contextmanager
+def _autocommit() -> Iterator[None]:
+    # Committing makes the findings so far permanent: fail before, in `error` mode.
+    linter = op.get_bind().info.get(_LINTER)
+    if linter is not None:
+        linter.check()
+    with op.get_context().autocommit_block(), _trusted():
+        yield
+
+
+def guard(
+    lock_timeout: str = settings.migration_lock_timeout,
+    statement_timeout: str = settings.migration_statement_timeout,
+) -> None:
+    '''
+    Bound lock waits and statement run time for the rest of the migration.
+    '''
+    op.execute(f"SET lock_timeout = '{lock_timeout}'")
+    op.execute(f"SET statement_timeout = '{statement_timeout}'")
+
+
+def _drop_invalid_index(name: str) -> None:
+    # A failed concurrent build leaves an invalid index behind.
+    invalid = op.get_bind().scalar(sa.text(
+        'SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid '
+        'WHERE pg_class.relname = :name AND NOT pg_index.indisvalid'
+    ), {'name': name})
+    if invalid:
+        op.execute(f'DROP INDEX CONCURRENTLY {name}')
+
+
+def _partitions(table: str) -> list[str]:
+    return list(op.get_bind().scalars(sa.text(
+        'SELECT inhrelid::regclass::text FROM pg_inherits '
+        'WHERE inhparent = to_regclass(:table) ORDER BY 1'
+    ), {'table': table}))
+
+
+def create_index_concurrently(
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    *,
+    unique: bool = False,
+    where: Optional[str] = None,
+    using: Optional[str] = None,
+) -> None:
+    '''
+    Build an index without blocking writes. Safe to rerun after a failure.
+
+    A partitioned table cannot build one concurrently: its partitions do,
+    and their indexes are attached to an index created on the table alone.
+    '''
+    if partitions := _partitions(table):
+        with _autocommit():
+            op.execute(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON ONLY {table}"
+                f"{f' USING {using}' if using else ''} ({', '.join(columns)})"
+                f"{f' WHERE {where}' if where else ''}"
+            )
+        for number, partition in enumerate(partitions):
+            child = f'{name[:58]}_{number}'
+            create_index_concurrently(child, partition, columns, unique=unique, where=where, using=using)
+            with _autocommit():
+                op.execute(f'ALTER INDEX {name} ATTACH PARTITION {child}')
+        return
+
+    with _autocommit():
+        _drop_invalid_index(name)
+        op.create_index(
+            name, table, list(columns),
+            unique=unique,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text(where) if where else None,
+            postgresql_using=using,
+        )
+
+
+def drop_index_concurrently(name: str, table: str) -> None:
+    '''
+    Drop an index without blocking reads and writes.
+
+    The index of a partitioned table cannot be dropped concurrently: it is
+    dropped outright with those of the partitions, so call `guard` first.
+    '''
+    with _autocommit():
+        if _partitions(table):
+            op.drop_index(name, table_name=table, if_exists=True)
+        else:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+
+def _in_batches(
+    action: str,
+    table: str,
+    statement: sa.TextClause,
+    *,
+    source: str,
+    key: str,
+    batch_size: int,
+) -> None:
+    # Runs `statement` for each range [:start, :stop) of `source.key`, committing each.
+    bind = op.get_bind()
+    with _autocommit():
+        low, high = bind.execute(sa.text(f'SELECT min({key}), max({key}) FROM {source}')).one()
+        if low is None:
+            return
+        for start in range(low, high + 1, batch_size):
+            rows = bind.execute(statement, {'start': start, 'stop': start + batch_size}).rowcount
+            done = min(start + batch_size, high + 1) - low
+            logger.info('%s of %s: %d%% (%d rows in the last batch)',
+                        action, table, 100 * done // (high + 1 - low), rows)
+
+
+def backfill(
+    table: str,
+    assignments: str,
+    where: str = 'true',
+    *,
+    key: str = 'pk_id',
+    batch_size: int = settings.migration_batch_size,
+) -> None:
+    '''
+    Run `UPDATE table SET assignments WHERE where` in batches of `batch_size`
+    consecutive `key` values, each committed on its own, so rows are never
+    locked for long and the update can be resumed.
+    '''
+    _in_batches('Backfill', table, sa.text(
+        f'UPDATE {table} SET {assignments} '
+        f'WHERE {key} >= :start AND {key} < :stop AND ({where})'
+    ), source=table, key=key, batch_size=batch_size)
+
+
+def backfill_insert(
+    table: str,
+    columns: Sequence[str],
+    query: str,
+    source: str,
+    *,
+    key: str = 'pk_id',
+    batch_size: int = settings.migration_batch_size,
+) -> None:
+    '''
+    Fill `table` with `INSERT INTO table (columns) query ON CONFLICT DO
+    NOTHING`, run once per batch of `batch_size` consecutive `key` values of
+    `source`, each committed on its own. `query` selects the rows with `key`
+    in `[:start, :stop)`; rows already inserted, say by a trigger, are kept.
+    '''
+    _in_batches('Backfill', table, sa.text(
+        f"INSERT INTO {table} ({', '.join(columns)}) {query} ON CONFLICT DO NOTHING"
+    ), source=source, key=key, batch_size=batch_size)
+
+
+def add_not_null(table: str, column: str) -> None:
+    '''
+    Make `column` NOT NULL, checking the existing rows without blocking writes.
+
+    From Postgres 12 the validated check lets `SET NOT NULL` skip its scan;
+    on Postgres 11 the scan still happens, but only reads the table.
+    '''
+    constraint = f'{table}_{column}_not_null'
+    with _trusted():
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({column} IS NOT NULL) NOT VALID')
+    with _autocommit():
+        op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}')
+    with _trusted():
+        op.alter_column(table, column, nullable=False)
+        op.drop_constraint(constraint, table)
+
+
+def add_foreign_key(
+    name: str,
+    source_table: str,
+    referent_table: str,
+    local_columns: Sequence[str],
+    remote_columns: Sequence[str],
+) -> None:
+    '''
+    Add a foreign key, checking the existing rows without blocking writes.
+    '''
+    with _trusted():
+        op.create_foreign_key(
+            name, source_table, referent_table, list(local_columns), list(remote_columns),
+            postgresql_not_valid=True
+        )
+    with _autocommit():
+        op.execute(f'ALTER TABLE {source_table} VALIDATE CONSTRAINT {name}')
+
+
+_NAME = r'"?([\w.]+)"?'
+
+_ALTER_TABLE = re.compile(rf'^ALTER TABLE (?:IF EXISTS )?(?:ONLY )?{_NAME}', re.I)
+_CREATE_INDEX = re.compile(
+    rf'^CREATE (?:UNIQUE )?INDEX (CONCURRENTLY )?(?:IF NOT EXISTS )?\S+ ON (?:ONLY )?{_NAME}', re.I
+)
+_CREATED = re.compile(rf'^CREATE (?:UNLOGGED )?(?:TABLE|MATERIALIZED VIEW) (?:IF NOT EXISTS )?{_NAME}', re.I)
+_SETS_LOCK_TIMEOUT = re.compile(r'^SET (?:LOCAL )?lock_timeout', re.I)
+
+# (pattern on an ALTER TABLE of an existing table, problem)
+_ALTER_RULES = [
+    (re.compile(r'ALTER COLUMN \S+ (?:SET DATA )?TYPE', re.I),
+     'changes a column type, which rewrites the table under an ACCESS EXCLUSIVE lock; '
+     'add a new column and backfill() it instead'),
+    (re.compile(r'SET NOT NULL', re.I),
+     'scans the table under an ACCESS EXCLUSIVE lock; use add_not_null()'),
+    (re.compile(r'ADD (?:COLUMN )?.*(?:DEFAULT\s+\(?(?:random|clock_timestamp|gen_random_uuid|uuid_generate_v\d|nextval)\b|\bSERIAL\b|\bBIGSERIAL\b)', re.I),
+     'adds a column with a volatile default, which rewrites the table; '
+     'add it without default and backfill() it'),
+    (re.compile(r'ADD (?:CONSTRAINT \S+ )?(?:FOREIGN KEY|CHECK)(?!.*NOT VALID)', re.I),
+     'validates the constraint under a lock that blocks writes; use add_foreign_key() or NOT VALID'),
+    (re.compile(r'ADD (?:CONSTRAINT \S+ )?(?:PRIMARY KEY|UNIQUE)(?!.*USING INDEX)', re.I),
+     'builds an index while blocking writes; create_index_concurrently() then ADD ... USING INDEX'),
+]
+
+_REWRITES = re.compile(r'^(?:VACUUM FULL|CLUSTER)\b', re.I)
+
+
+class MigrationLinter:
+    '''
+    Flags statements of a migration that block or rewrite an existing table.
+
+    Tables created by the same revision are exempt, as are the statements run
+    by the helpers above. With `MIGRATION_LINT=warn` the findings are logged
+    once the revision is applied; with `error` they abort the upgrade, which
+    rolls back unless a helper already committed it.
+    '''
+
+    def __init__(self, mode: str, exempt_revisions: set[str]) -> None:
+        self.mode = mode
+        self.exempt_revisions = exempt_revisions
+        self._reset()
+
+    def _reset(self) -> None:
+        self.findings: list[str] = []
+        self.created: set[str] = set()
+        self.guarded = False
+
+    def _flag(self, finding: str) -> None:
+        self.findings.append(finding)
+
+    def attach(self, connection: Connection) -> None:
+        if self.mode != 'off':
+            connection.info[_LINTER] = self
+            event.listen(connection, 'before_cursor_execute', self._inspect)
+
+    def check(self, revision: str = 'being applied') -> None:
+        if self.findings and self.mode == 'error':
+            report = '\n'.join(f'  - {finding}' for finding in self.findings)
+            raise CommandError(f'Revision {revision} blocks or rewrites live tables:\n{report}')
+
+    def _inspect(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        sql = ' '.join(statement.split())
+
+        if created := _CREATED.match(sql):
+            self.created.add(created.group(1))
+            return
+        if _SETS_LOCK_TIMEOUT.match(sql):
+            self.guarded = True
+            return
+        if conn.info.get(_TRUSTED):
+            return
+
+        if _REWRITES.match(sql):
+            self._flag(f'{sql[:80]}: rewrites the table under an ACCESS EXCLUSIVE lock')
+            return
+
+        if index := _CREATE_INDEX.match(sql):
+            concurrently, table = index.groups()
+            if not concurrently and table not in self.created:
+                self._flag(
+                    f'{sql[:80]}: blocks writes to {table} while it builds; use create_index_concurrently()'
+                )
+            return
+
+        if sql.upper().startswith('DROP INDEX') and 'CONCURRENTLY' not in sql.upper():
+            self._flag(f'{sql[:80]}: blocks the table while it waits; use drop_index_concurrently()')
+            return
+
+        if alter := _ALTER_TABLE.match(sql):
+            table = alter.group(1)
+            if table in self.created:
+                return
+            for pattern, problem in _ALTER_RULES:
+                if pattern.search(sql):
+                    self._flag(f'{sql[:80]}: {problem}')
+            if not self.guarded:
+                self._flag(
+                    f'{sql[:80]}: takes an ACCESS EXCLUSIVE lock on {table} without lock_timeout; call guard() first'
+                )
+
+    def on_version_apply(self, ctx, step, heads, run_args) -> None:
+        revision = step.up_revision_id
+        if self.findings and step.is_upgrade and revision not in self.exempt_revisions:
+            self.check(revision)
+            report = '\n'.join(f'  - {finding}' for finding in self.findings)
+            logger.warning('Revision %s blocks or rewrites live tables:\n%s', revision, report)
+        self._reset()
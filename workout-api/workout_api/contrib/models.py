@@ -2,10 +2,12 @@
 Model for the declarive base for app.
 '''
 
+from datetime import datetime
+from typing import Optional
 from uuid import uuid4
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.orm import DeclarativeBase, Mapped, ORMExecuteState, Session, mapped_column, with_loader_criteria
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
-from sqlalchemy import UUID
+from sqlalchemy import UUID, DateTime, StatementLambdaElement, event
 
 
 class BaseModel(DeclarativeBase):
@@ -19,3 +21,34 @@ class BaseModel(DeclarativeBase):
         unique=True,
         index=True
     )
+
+
+class SoftDeleteMixin:
+    '''
+    Mixin for models that are soft deleted by stamping `deleted_at`.
+
+    ORM selects skip deleted rows unless run with the `include_deleted`
+    execution option. Lambda statements are left alone, since adding options
+    to them would freeze their bound values: they filter `deleted_at` themselves.
+    '''
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _filter_soft_deleted(execute_state: ORMExecuteState) -> None:
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not isinstance(execute_state.statement, StatementLambdaElement)
+        and not execute_state.execution_options.get('include_deleted', False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(
+                SoftDeleteMixin,
+                lambda cls: cls.deleted_at.is_(None),
+                include_aliases=True
+            )
+        )
@@ -0,0 +1,146 @@
+'''
+Pagination with a selectable strategy for the total count.
+'''
+
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Annotated, Any, Callable, Generic, Optional, TypeVar
+
+from fastapi_pagination import Page, create_page, resolve_params
+from fastapi_pagination.types import GreaterEqualZero
+from pydantic import Field
+from sqlalchemy import ClauseElement, Executable, RowMapping, Select, func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.ext.compiler import compiles
+
+from workout_api.configs.settings import settings
+
+T = TypeVar('T')
+
+
+class CountStrategy(str, Enum):
+    '''
+    How the total of a paginated listing is obtained.
+    '''
+    exact = 'exact'
+    estimated = 'estimated'
+    cached = 'cached'
+    none = 'none'
+
+
+class CountedPage(Page[T], Generic[T]):
+    '''
+    Page whose total may be estimated or omitted.
+    '''
+    total: Optional[GreaterEqualZero] = None
+    pages: Optional[GreaterEqualZero] = None
+    count_strategy: Annotated[
+        CountStrategy,
+        Field(
+            description="How `total` was obtained",
+            example=CountStrategy.exact
+        )
+    ]
+
+
+class explain(Executable, ClauseElement):
+    '''
+    EXPLAIN of a statement, keeping its bound parameters.
+    '''
+    inherit_cache = False
+
+    def __init__(self, statement: Select) -> None:
+        self.statement = statement
+
+
+@compiles(explain, 'postgresql')
+def _compile_explain(element: explain, compiler, **kw) -> str:
+    return f'EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}'
+
+
+class _CountCache:
+    '''
+    Bounded in-process cache of exact counts, expiring after `ttl` seconds.
+    '''
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[Any, tuple[float, int]] = OrderedDict()
+
+    def get(self, key: Any) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key: Any, total: int) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, total)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+count_cache = _CountCache(settings.count_cache_ttl, settings.count_cache_size)
+
+
+async def count(
+    db: AsyncSession | AsyncConnection,
+    query: Select,
+    strategy: CountStrategy,
+) -> Optional[int]:
+    '''
+    Count the rows of `query` following `strategy`.
+    '''
+    query = query.order_by(None)
+
+    if strategy is CountStrategy.none:
+        return None
+
+    if strategy is CountStrategy.estimated:
+        plan = (await db.execute(explain(query))).scalar_one()
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    exact_query = select(func.count()).select_from(query.subquery())
+
+    if strategy is CountStrategy.cached:
+        compiled = query.compile()
+        key = (str(compiled), tuple(sorted(compiled.params.items(), key=repr)))
+        total = count_cache.get(key)
+        if total is None:
+            total = (await db.execute(exact_query)).scalar_one()
+            count_cache.set(key, total)
+        return total
+
+    return (await db.execute(exact_query)).scalar_one()
+
+
+async def paginate(
+    db: AsyncSession | AsyncConnection,
+    query: Select,
+    strategy: CountStrategy = CountStrategy.exact,
+    *,
+    count_query: Optional[Select] = None,
+    transformer: Callable[[RowMapping], Any] = dict,
+) -> CountedPage:
+    '''
+    Paginate the rows of `query` with the current page params.
+
+    The total is counted over `count_query` (defaults to `query`) with
+    `strategy`, and each row is shaped with `transformer`.
+    '''
+    params = resolve_params()
+    raw_params = params.to_raw_params().as_limit_offset()
+
+    total = await count(db, query if count_query is None else count_query, strategy)
+    rows = (
+        await db.execute(query.limit(raw_params.limit).offset(raw_params.offset))
+    ).mappings()
+
+    return create_page(
+        [transformer(row) for row in rows],
+        total=total,
+        params=params,
+        count_strategy=strategy
+    )
@@ -0,0 +1,213 @@
+'''
+Rate limiting per client and route group, with token buckets.
+
+`RATE_LIMITS` maps the route groups to limit, named by the first segment of
+the path, to their bucket, e.g.
+`{"athletes": {"rate": 20, "burst": 40}, "categories": {"rate": 5, "burst": 10}}`.
+Each client gets a bucket per group: it refills at `rate` tokens per second
+up to `burst`, a request takes one token and is answered 429 when there is
+none. Clients are told apart by their `RATE_LIMIT_KEY_HEADER` API key when
+it is a known one, its SHA-256 hex digest listed in `RATE_LIMIT_API_KEYS`,
+or else by IP address: unknown keys would let a client get a fresh bucket
+per request, and push the buckets of everyone else out of memory.
+
+`RATE_LIMIT_URL` picks the backend: `memory://` keeps the buckets in the
+process, so each worker limits on its own; `redis://...` keeps them in Redis
+(needs the `redis` package), shared by every worker and node. A failing
+backend lets requests through.
+
+Responses of limited groups carry the `RateLimit-Limit`, `RateLimit-Remaining`,
+`RateLimit-Reset` and `RateLimit-Policy` headers of the IETF draft, and
+`Retry-After` on a 429.
+'''
+
+import hashlib
+import json
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import NamedTuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from workout_api.configs.settings import RateLimit, settings
+
+logger = logging.getLogger(__name__)
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    # Tokens left in the bucket after the request.
+    tokens: float
+
+
+class BucketBackend(ABC):
+    '''
+    Storage of the token buckets, taking a token atomically.
+    '''
+
+    @abstractmethod
+    async def take(self, key: str, limit: RateLimit) -> Decision:
+        ...
+
+
+def _refill(tokens: float, elapsed: float, limit: RateLimit) -> float:
+    return min(limit.burst, tokens + max(elapsed, 0.0) * limit.rate)
+
+
+class MemoryBucketBackend(BucketBackend):
+    '''
+    Buckets of this process, forgetting the least recently used ones.
+    '''
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, limit: RateLimit) -> Decision:
+        now = time.monotonic()
+        tokens, stamp = self._buckets.get(key, (limit.burst, now))
+        tokens = _refill(tokens, now - stamp, limit)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_size:
+            self._buckets.popitem(last=False)
+        return Decision(allowed, tokens)
+
+
+# Same algorithm as `MemoryBucketBackend`, run atomically by Redis. A bucket
+# expires once it would be full again, which is the state of a missing one.
+_TAKE = '''
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local tokens = tonumber(bucket[1]) or burst
+local stamp = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(now - stamp, 0) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HMSET', KEYS[1], 'tokens', tostring(tokens), 'stamp', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+'''
+
+
+class RedisBucketBackend(BucketBackend):
+    '''
+    Buckets on a Redis server, shared by every worker. The clocks of the
+    nodes are assumed in sync.
+    '''
+
+    def __init__(self, url: str) -> None:
+        try:
+            from redis.asyncio import Redis
+        except ImportError as error:
+            raise RuntimeError(f'The redis package is required for RATE_LIMIT_URL={url}') from error
+        self._client = Redis.from_url(url, decode_responses=True)
+        self._take = self._client.register_script(_TAKE)
+
+    async def take(self, key: str, limit: RateLimit) -> Decision:
+        allowed, tokens = await self._take(keys=[key], args=[limit.rate, limit.burst, time.time()])
+        return Decision(bool(allowed), float(tokens))
+
+
+def create_bucket_backend(url: str) -> BucketBackend:
+    if url.startswith('memory://'):
+        return MemoryBucketBackend(settings.rate_limit_size)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBucketBackend(url)
+    raise ValueError(f'Unsupported RATE_LIMIT_URL: {url}')
+
+
+def rate_limit_headers(limit: RateLimit, decision: Decision) -> dict[str, str]:
+    '''
+    Headers describing the bucket of a client after a request.
+    '''
+    window = math.ceil(limit.burst / limit.rate)
+    headers = {
+        'RateLimit-Limit': str(limit.burst),
+        'RateLimit-Remaining': str(math.floor(decision.tokens)),
+        # Seconds until the bucket is full again.
+        'RateLimit-Reset': str(math.ceil((limit.burst - decision.tokens) / limit.rate)),
+        'RateLimit-Policy': f'{limit.burst};w={window}',
+    }
+    if not decision.allowed:
+        headers['Retry-After'] = str(math.ceil((1 - decision.tokens) / limit.rate))
+    return headers
+
+
+class RateLimitMiddleware:
+    '''
+    ASGI middleware taking a token from the client's bucket of the route
+    group of each request, answering 429 when it is empty.
+    '''
+
+    def __init__(self, app: ASGIApp, limits: dict[str, RateLimit], backend: BucketBackend) -> None:
+        self.app = app
+        self.limits = limits
+        self.backend = backend
+        self.key_header = settings.rate_limit_key_header.lower().encode('latin-1')
+        self.api_keys = {digest.lower() for digest in settings.rate_limit_api_keys}
+
+    def _client(self, scope: Scope) -> str:
+        if self.api_keys:
+            for name, value in scope['headers']:
+                if name == self.key_header and value:
+                    # Hashed, so keys are neither configured nor stored as sent.
+                    digest = hashlib.sha256(value).hexdigest()
+                    if digest in self.api_keys:
+                        return 'key:' + digest[:32]
+        client = scope.get('client')
+        return f'ip:{client[0]}' if client else 'ip:unknown'
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        group = scope['path'].strip('/').split('/', 1)[0]
+        limit = self.limits.get(group)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            decision = await self.backend.take(f'workout_api:ratelimit:{group}:{self._client(scope)}', limit)
+        except Exception as error:
+            logger.warning('Rate limit backend failed, letting the request through: %r', error)
+            await self.app(scope, receive, send)
+            return
+
+        headers = rate_limit_headers(limit, decision)
+        if not decision.allowed:
+            body = json.dumps({'detail': f'Rate limit exceeded for /{group}'}).encode()
+            await send({
+                'type': 'http.response.start',
+                'status': 429,
+                'headers': [
+                    (b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode()),
+                    *((name.lower().encode(), value.encode()) for name, value in headers.items()),
+                ],
+            })
+            await send({'type': 'http.response.body', 'body': body})
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                response_headers = MutableHeaders(scope=message)
+                for name, value in headers.items():
+                    response_headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
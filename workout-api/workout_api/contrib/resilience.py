@@ -0,0 +1,97 @@
+'''
+Failing fast and retrying around an unreliable dependency.
+'''
+
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar('T')
+
+
+class CircuitBreaker:
+    '''
+    Opens after `threshold` failures in a row, so callers fail fast instead
+    of waiting on a dependency that is down. After `reset_timeout` seconds it
+    is half open: one call goes through as a probe, closing it again when it
+    succeeds and reopening it when it fails.
+
+    Callers ask `allow()` before a call; the outcomes are reported apart,
+    with `record_success()` and `record_failure()`.
+    '''
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, threshold: int, reset_timeout: float) -> None:
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._probe_at = 0.0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        '''
+        Seconds until a probe may go through.
+        '''
+        if self._state == self.CLOSED:
+            return 0.0
+        return max(self.reset_timeout - (time.monotonic() - max(self.opened_at, self._probe_at)), 0.0)
+
+    def allow(self) -> bool:
+        if self._state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        # One probe per `reset_timeout`, in case one never reports back.
+        if now - max(self.opened_at, self._probe_at) < self.reset_timeout:
+            return False
+        self._probe_at = now
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._state != self.CLOSED or self.failures >= self.threshold:
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+def backoff(attempt: int, base: float, cap: float) -> float:
+    '''
+    Exponential backoff with full jitter: retries of many clients spread out
+    instead of arriving together.
+    '''
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+async def retry(
+    call: Callable[[], Awaitable[T]],
+    attempts: int,
+    base: float,
+    cap: float,
+    retryable: Callable[[BaseException], bool],
+) -> T:
+    '''
+    Await `call()`, calling it again up to `attempts` more times while it
+    raises `retryable` errors. Only for calls that are safe to repeat.
+    '''
+    for attempt in range(attempts):
+        try:
+            return await call()
+        except Exception as error:
+            if not retryable(error):
+                raise
+        await asyncio.sleep(backoff(attempt, base, cap))
+    return await call()
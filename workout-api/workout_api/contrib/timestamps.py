@@ -0,0 +1,16 @@
+'''
+Timestamps received from clients.
+'''
+
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    '''
+    Take a timestamp without an offset as UTC, like the stored ones, so that
+    it compares with them and round-trips with its offset.
+    '''
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
@@ -0,0 +1,191 @@
+import csv
+from typing import Literal
+from fastapi import APIRouter, Body, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import UUID4
+from sqlalchemy import insert, select
+
+from workout_api.athlete.jobs import IMPORT_COLUMNS, missing_import_columns  # also registers its job handlers
+import workout_api.workout_result.leaderboards  # noqa: F401, registers the leaderboard refresh
+from workout_api.configs.settings import settings
+from workout_api.contrib.dependencies import DatabaseDependency, ReadConnectionDependency
+from workout_api.jobs.models import JobModel, job_files, job_uploads
+from workout_api.jobs.schemas import AthleteExportPost, AthletePurgePost, JobResponse
+from workout_api.jobs.worker import enqueue, read_parts
+
+router = APIRouter()
+
+job_detail = select(*(column for column in JobModel.__table__.c if column.key not in ('pk_id', 'run_after')))
+
+
+async def _submit(db_session: DatabaseDependency, kind: str, payload: dict) -> JobModel:
+    job = await enqueue(db_session, kind, payload)
+    await db_session.commit()
+    await db_session.refresh(job)
+    return job
+
+
+@router.post(
+    "/athletes/export",
+    summary="Export athletes to CSV",
+    description="Endpoint to queue a CSV export of the athletes. "
+                "Once the job succeeds, the file is served at `/jobs/{job_id}/file`.",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobResponse,
+)
+async def submit_athlete_export(
+    db_session: DatabaseDependency,
+    export_post: AthleteExportPost = Body(AthleteExportPost()),
+) -> JobResponse:
+    return await _submit(db_session, 'athlete.export', export_post.model_dump(exclude_none=True))
+
+
+@router.post(
+    "/athletes/purge",
+    summary="Purge deleted athletes",
+    description="Endpoint to queue the permanent removal of long soft deleted athletes.",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobResponse,
+)
+async def submit_athlete_purge(
+    db_session: DatabaseDependency,
+    purge_post: AthletePurgePost = Body(...),
+) -> JobResponse:
+    return await _submit(db_session, 'athlete.purge', purge_post.model_dump())
+
+
+# Most bytes read looking for the end of the header line.
+_MAX_HEADER = 65_536
+
+
+def _check_header(data: bytes) -> None:
+    header = next(csv.reader([data.split(b'\n', 1)[0].decode('utf-8-sig', errors='replace')]), [])
+    if missing := missing_import_columns(header):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Missing columns: {', '.join(missing)}"
+        )
+
+
+async def _save_upload(db_session: DatabaseDependency, job: JobModel, request: Request) -> None:
+    '''
+    Stream the request body into `job_uploads`, in parts of
+    `JOBS_FILE_PART_SIZE` bytes, checking its header first.
+    '''
+    await db_session.flush()
+    part_size, part, buffer, checked = settings.jobs_file_part_size, 0, bytearray(), False
+
+    async def store(data: bytes) -> None:
+        nonlocal part
+        await db_session.execute(insert(job_uploads).values(job_id=job.pk_id, part=part, data=data))
+        part += 1
+
+    async for chunk in request.stream():
+        buffer += chunk
+        if not checked and (b'\n' in buffer or len(buffer) >= _MAX_HEADER):
+            _check_header(buffer)
+            checked = True
+        while checked and len(buffer) >= part_size:
+            await store(bytes(buffer[:part_size]))
+            del buffer[:part_size]
+    if not checked:
+        _check_header(buffer)
+    if buffer:
+        await store(bytes(buffer))
+
+
+@router.post(
+    "/athletes/import",
+    summary="Import athletes from CSV",
+    description="Endpoint to queue an import of the athletes of a CSV file, sent as the `text/csv` "
+                f"request body with the columns {', '.join(IMPORT_COLUMNS)}. "
+                "Athletes whose document is already registered are skipped, or updated with "
+                "`on_conflict=update`. Once the job succeeds, the rejected rows are served at "
+                "`/jobs/{job_id}/file`.",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobResponse,
+    openapi_extra={
+        'requestBody': {
+            'required': True,
+            'content': {'text/csv': {'schema': {'type': 'string', 'format': 'binary'}}}
+        }
+    },
+)
+async def submit_athlete_import(
+    request: Request,
+    db_session: DatabaseDependency,
+    on_conflict: Literal['skip', 'update'] = 'skip',
+) -> JobResponse:
+    job = await enqueue(db_session, 'athlete.import', {'on_conflict': on_conflict})
+    # Committed with the job, or not at all when the file is rejected.
+    await _save_upload(db_session, job, request)
+    await db_session.commit()
+    await db_session.refresh(job)
+    return job
+
+
+@router.post(
+    "/leaderboards/refresh",
+    summary="Refresh the leaderboards",
+    description="Endpoint to queue a refresh of the precomputed leaderboards.",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobResponse,
+)
+async def submit_leaderboard_refresh(db_session: DatabaseDependency) -> JobResponse:
+    return await _submit(db_session, 'leaderboard.refresh', {})
+
+
+@router.get(
+    "/{job_id}",
+    summary="Get job by ID",
+    description="Endpoint to retrieve the status and progress of a job.",
+    status_code=status.HTTP_200_OK,
+    response_model=JobResponse,
+)
+async def get_by_id(
+    job_id: UUID4,
+    db_connection: ReadConnectionDependency,
+) -> JobResponse:
+    job = (
+        (await db_connection.execute(job_detail.where(JobModel.id == job_id))).mappings().first()
+    )
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job not found: {job_id}"
+        )
+    return job
+
+
+@router.get(
+    "/{job_id}/file",
+    summary="Download the file of a job",
+    description="Endpoint to download the CSV written by a succeeded export job, "
+                "or the rejected rows of a succeeded import job.",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+)
+async def get_file(
+    job_id: UUID4,
+    db_connection: ReadConnectionDependency,
+) -> StreamingResponse:
+    job = (
+        await db_connection.execute(
+            select(JobModel.pk_id, JobModel.result).where(
+                JobModel.id == job_id,
+                JobModel.kind.in_(('athlete.export', 'athlete.import')),
+                JobModel.status == 'succeeded'
+            )
+        )
+    ).first()
+    if not job or not job.result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No file for job: {job_id}"
+        )
+    # Read from the database as it is sent, so any node serves it.
+    return StreamingResponse(
+        read_parts(job_files, job.pk_id),
+        media_type='text/csv',
+        headers={'Content-Disposition': f'attachment; filename="{job.result["file"]}"'}
+    )
@@ -0,0 +1,124 @@
+'''
+Model for the background job queue.
+'''
+
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import (
+    BigInteger, Column, DateTime, Float, ForeignKey, Index, Integer, LargeBinary, String, Table, Text, text
+)
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB
+
+from workout_api.contrib.models import BaseModel
+
+
+class JobModel(BaseModel):
+    '''
+    SQLAlchemy model for a job run by the worker pool.
+
+    While a job is queued, `run_after` is when it may start; while it runs,
+    it is when its lease expires and another worker may take it over.
+    '''
+
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        Index(
+            'ix_jobs_pending_run_after', 'run_after', 'pk_id',
+            postgresql_where=text("status IN ('queued', 'running')")
+        ),
+    )
+
+    pk_id: Mapped[int] = mapped_column(
+        BigInteger,
+        primary_key=True,
+        autoincrement=True
+    )
+
+    kind: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False
+    )
+
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        default='queued'
+    )
+
+    payload: Mapped[dict] = mapped_column(
+        JSONB,
+        nullable=False
+    )
+
+    result: Mapped[Optional[dict]] = mapped_column(
+        JSONB,
+        nullable=True
+    )
+
+    error: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True
+    )
+
+    progress: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0.0
+    )
+
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0
+    )
+
+    max_attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False
+    )
+
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc)
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc)
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc)
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
+
+
+# Files sent along with a job, e.g. the CSV of an import, in parts of up to
+# `JOBS_FILE_PART_SIZE` bytes. Kept in the database so that the worker of
+# any node can read them; dropped once the job succeeds or finally fails.
+job_uploads = Table(
+    'job_uploads',
+    BaseModel.metadata,
+    Column('job_id', BigInteger, ForeignKey('jobs.pk_id', ondelete='CASCADE'), primary_key=True),
+    Column('part', Integer, primary_key=True),
+    Column('data', LargeBinary, nullable=False),
+)
+
+# The file a job leaves to download, e.g. the CSV of an export, in parts of
+# the same size. Kept in the database so that any node can serve it; dropped
+# with its job.
+job_files = Table(
+    'job_files',
+    BaseModel.metadata,
+    Column('job_id', BigInteger, ForeignKey('jobs.pk_id', ondelete='CASCADE'), primary_key=True),
+    Column('part', Integer, primary_key=True),
+    Column('data', LargeBinary, nullable=False),
+)
@@ -0,0 +1,112 @@
+'''
+Schemas for the background jobs.
+'''
+
+from datetime import datetime
+from typing import Annotated, Any, Optional
+from pydantic import Field
+
+from workout_api.contrib.schemas import BaseSchema, OutMixin
+
+
+class JobResponse(OutMixin):
+    '''
+    Schema for the status of a job.
+    '''
+    kind: Annotated[
+        str,
+        Field(
+            description="The kind of job",
+            example="athlete.export"
+        )
+    ]
+    status: Annotated[
+        str,
+        Field(
+            description="queued, running, succeeded or failed",
+            example="running"
+        )
+    ]
+    progress: Annotated[
+        float,
+        Field(
+            description="Completed fraction, from 0 to 1",
+            example=0.4
+        )
+    ]
+    attempts: Annotated[
+        int,
+        Field(
+            description="How many times the job was started",
+            example=1
+        )
+    ]
+    max_attempts: Annotated[
+        int,
+        Field(
+            description="How many times the job may be started",
+            example=3
+        )
+    ]
+    payload: Annotated[
+        dict[str, Any],
+        Field(
+            description="The parameters of the job",
+            example={"category_name": "Scaled"}
+        )
+    ]
+    result: Annotated[
+        Optional[dict[str, Any]],
+        Field(
+            description="The outcome of a succeeded job",
+            example={"file": "athletes-3fa85f64-5717-4562-b3fc-2c963f66afa6.csv", "rows": 120}
+        )
+    ] = None
+    error: Annotated[
+        Optional[str],
+        Field(
+            description="The error of the last failed attempt",
+            example=None
+        )
+    ] = None
+    finished_at: Annotated[
+        Optional[datetime],
+        Field(
+            description="The timestamp when the job succeeded or failed",
+            example="2023-10-10T10:20:30.000Z"
+        )
+    ] = None
+
+
+class AthleteExportPost(BaseSchema):
+    '''
+    Schema for submitting an athlete export.
+    '''
+    category_name: Annotated[
+        Optional[str],
+        Field(
+            description="Export only the athletes of this category",
+            example="Scaled"
+        )
+    ] = None
+    training_center_name: Annotated[
+        Optional[str],
+        Field(
+            description="Export only the athletes of this training center",
+            example="CT King"
+        )
+    ] = None
+
+
+class AthletePurgePost(BaseSchema):
+    '''
+    Schema for submitting a purge of soft deleted athletes.
+    '''
+    older_than_days: Annotated[
+        int,
+        Field(
+            description="Remove the athletes deleted more than this many days ago",
+            example=30,
+            ge=0
+        )
+    ]
@@ -0,0 +1,239 @@
+'''
+Worker pool running the jobs queued in the `jobs` table.
+
+Jobs are claimed with `FOR UPDATE SKIP LOCKED`, so every process of the app
+can run its own pool against the same table. A claimed job holds a lease
+that its handler renews when reporting progress; if the process dies, the
+job is taken over once the lease expires.
+'''
+
+import asyncio
+import logging
+import random
+from datetime import timedelta
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Optional
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import RowMapping, Table, delete, func, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from workout_api.configs.database import engine
+from workout_api.configs.settings import settings
+from workout_api.jobs.models import JobModel, job_files, job_uploads
+
+logger = logging.getLogger(__name__)
+
+# Literal, so the planner can use the partial index on pending jobs.
+PENDING = text("status IN ('queued', 'running')")
+
+Handler = Callable[['JobContext', dict[str, Any]], Awaitable[Optional[dict[str, Any]]]]
+
+handlers: dict[str, Handler] = {}
+
+
+def job_handler(kind: str) -> Callable[[Handler], Handler]:
+    '''
+    Register the decorated coroutine as the handler of the jobs of `kind`.
+    '''
+    def register(handler: Handler) -> Handler:
+        handlers[kind] = handler
+        return handler
+    return register
+
+
+async def enqueue(
+    db_session: AsyncSession,
+    kind: str,
+    payload: dict[str, Any],
+    max_attempts: Optional[int] = None,
+) -> JobModel:
+    '''
+    Add a job to the current transaction; it is picked up once committed.
+    '''
+    if kind not in handlers:
+        raise ValueError(f'No handler for job kind: {kind}')
+    job = JobModel(
+        id=uuid4(),
+        kind=kind,
+        status='queued',
+        payload=jsonable_encoder(payload),
+        max_attempts=max_attempts or settings.jobs_max_attempts,
+    )
+    db_session.add(job)
+    return job
+
+
+def _lease():
+    return func.now() + timedelta(seconds=settings.jobs_lease)
+
+
+async def _update_job(pk_id: int, **values: Any) -> None:
+    async with engine.begin() as connection:
+        await connection.execute(
+            update(JobModel)
+            .where(JobModel.pk_id == pk_id)
+            .values(**values, updated_at=func.now())
+        )
+
+
+async def read_parts(table: Table, pk_id: int) -> AsyncIterator[bytes]:
+    '''
+    Yield the parts of the file of a job in `table`, in order.
+    '''
+    # Server side cursors need a transaction, so not the autocommit engine.
+    async with engine.connect() as connection:
+        result = await connection.stream(
+            select(table.c.data)
+            .where(table.c.job_id == pk_id)
+            .order_by(table.c.part)
+            .execution_options(yield_per=1)
+        )
+        async for data in result.scalars():
+            yield data
+
+
+async def _finish(pk_id: int, **values: Any) -> None:
+    '''
+    Record the final state of a job and drop the files sent with it.
+    '''
+    async with engine.begin() as connection:
+        await connection.execute(
+            update(JobModel)
+            .where(JobModel.pk_id == pk_id)
+            .values(**values, finished_at=func.now(), updated_at=func.now())
+        )
+        await connection.execute(delete(job_uploads).where(job_uploads.c.job_id == pk_id))
+
+
+class JobContext:
+    '''
+    Handle given to a running handler to report its progress.
+    '''
+
+    def __init__(self, pk_id: int, attempt: int) -> None:
+        self.pk_id = pk_id
+        self.attempt = attempt
+
+    async def progress(self, value: float) -> None:
+        '''
+        Record the completed fraction (0 to 1) and renew the lease.
+        '''
+        await _update_job(self.pk_id, progress=min(max(value, 0.0), 1.0), run_after=_lease())
+
+    async def store_file(self, file: BinaryIO) -> None:
+        '''
+        Store `file`, from its start, as the file of the job, replacing the
+        one of an earlier attempt.
+        '''
+        await asyncio.to_thread(file.seek, 0)
+        async with engine.begin() as connection:
+            await connection.execute(delete(job_files).where(job_files.c.job_id == self.pk_id))
+            part = 0
+            while data := await asyncio.to_thread(file.read, settings.jobs_file_part_size):
+                await connection.execute(insert(job_files).values(job_id=self.pk_id, part=part, data=data))
+                part += 1
+
+
+class JobWorker:
+    '''
+    Pool of `concurrency` tasks, each running one job at a time.
+    '''
+
+    def __init__(self, concurrency: int) -> None:
+        self.concurrency = concurrency
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f'job-worker-{number}')
+            for number in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception('Could not claim a job')
+                job = None
+
+            if job is None:
+                await asyncio.sleep(settings.jobs_poll_interval)
+            else:
+                await self._run(job)
+
+    async def _claim(self) -> Optional[RowMapping]:
+        pending = (
+            select(JobModel.pk_id)
+            .where(PENDING, JobModel.run_after <= func.now())
+            .order_by(JobModel.run_after, JobModel.pk_id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with engine.begin() as connection:
+            return (await connection.execute(
+                update(JobModel)
+                .where(JobModel.pk_id == pending)
+                .values(
+                    status='running',
+                    attempts=JobModel.attempts + 1,
+                    run_after=_lease(),
+                    updated_at=func.now()
+                )
+                .returning(
+                    JobModel.pk_id,
+                    JobModel.kind,
+                    JobModel.payload,
+                    JobModel.attempts,
+                    JobModel.max_attempts
+                )
+            )).mappings().first()
+
+    async def _run(self, job: RowMapping) -> None:
+        handler = handlers.get(job['kind'])
+        try:
+            if handler is None:
+                raise LookupError(f'No handler for job kind: {job["kind"]}')
+            if job['attempts'] > job['max_attempts']:
+                raise TimeoutError('The lease of the last attempt expired')
+            result = await handler(JobContext(job['pk_id'], job['attempts']), job['payload'])
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back without spending an attempt.
+            await asyncio.shield(_update_job(
+                job['pk_id'],
+                status='queued',
+                attempts=JobModel.attempts - 1,
+                run_after=func.now()
+            ))
+            raise
+        except Exception as error:
+            logger.exception('Job %s (%s) failed', job['pk_id'], job['kind'])
+            if handler is not None and job['attempts'] < job['max_attempts']:
+                delay = settings.jobs_retry_backoff * 2 ** (job['attempts'] - 1)
+                await _update_job(
+                    job['pk_id'],
+                    status='queued',
+                    error=repr(error),
+                    run_after=func.now() + timedelta(seconds=delay * random.uniform(0.5, 1.5))
+                )
+            else:
+                await _finish(job['pk_id'], status='failed', error=repr(error))
+        else:
+            await _finish(
+                job['pk_id'],
+                status='succeeded',
+                result=jsonable_encoder(result),
+                progress=1.0,
+                error=None
+            )
+
+
+job_worker = JobWorker(settings.jobs_workers)
@@ -1,17 +1,61 @@
-from fastapi import FastAPI
+import math
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 
+from workout_api.configs.database import DatabaseUnavailable, engine
+from workout_api.configs.settings import settings
+from workout_api.contrib.compression import CompressionMiddleware
+from workout_api.contrib.ratelimit import RateLimitMiddleware, create_bucket_backend
+from workout_api.jobs.worker import job_worker
+from workout_api.monitoring.profiling import (
+    ProfiledJSONResponse, ProfilingMiddleware, instrument, profiling_enabled
+)
 from workout_api.routers import api_router
+from workout_api.workout_result.leaderboards import leaderboard_refresher
 
-app = FastAPI(title="Workout API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_worker.start()
+    await leaderboard_refresher.start()
+    yield
+    await leaderboard_refresher.stop()
+    await job_worker.stop()
+    # Close the pooled connections now rather than leave them to the server.
+    await engine.dispose()
+
+
+app = FastAPI(
+    title="Workout API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ProfiledJSONResponse if profiling_enabled() else JSONResponse,
+)
+
+
+@app.exception_handler(DatabaseUnavailable)
+async def database_unavailable(request: Request, error: DatabaseUnavailable) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={'detail': 'The database is unavailable, try again later.'},
+        headers={'Retry-After': str(max(math.ceil(error.retry_after), 1))},
+    )
+
+
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
 
 app.include_router(api_router)
 
-""" if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run('main:app', host='0.0.0.0', port=8000, reload=True, log_level="info")
-    '''
-        "main:app" refers to the 'app' instance in the 'main.py' file.
-        "reload" enables auto-reloading on code changes.
-        "log_level" sets the logging verbosity.
-        "host" and "port" define where the server listens.
-    ''' """
\ No newline at end of file
+if settings.rate_limits:
+    # Outside compression, so a rejected request costs as little as possible.
+    app.add_middleware(
+        RateLimitMiddleware,
+        limits=settings.rate_limits,
+        backend=create_bucket_backend(settings.rate_limit_url),
+    )
+
+if profiling_enabled():
+    # Outermost, so the time spent compressing is accounted for.
+    app.add_middleware(ProfilingMiddleware)
+    instrument(app)
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, status
+
+from workout_api.configs.database import connect_args, query_cache_stats
+from workout_api.configs.settings import settings
+from workout_api.monitoring.schemas import QueryCacheResponse
+
+router = APIRouter()
+
+
+@router.get(
+    "/query-cache",
+    summary="Compiled statement cache stats",
+    description="Endpoint to check how often statements are served from the compiled cache.",
+    status_code=status.HTTP_200_OK,
+    response_model=QueryCacheResponse,
+)
+async def get_query_cache() -> QueryCacheResponse:
+    return QueryCacheResponse(
+        hits=query_cache_stats.hits,
+        misses=query_cache_stats.misses,
+        uncached=query_cache_stats.uncached,
+        hit_ratio=query_cache_stats.hit_ratio,
+        query_cache_size=settings.database_query_cache_size,
+        statement_cache_size=connect_args['prepared_statement_cache_size'],
+    )
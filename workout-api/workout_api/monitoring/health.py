@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+from fastapi import APIRouter, Query, Response, status
+from sqlalchemy import text
+
+from workout_api.configs.database import database_breaker, engine, read_engine
+from workout_api.configs.settings import settings
+from workout_api.monitoring.schemas import BreakerResponse, HealthResponse, PoolResponse
+
+router = APIRouter()
+
+
+async def _ping() -> bool:
+    try:
+        async with read_engine.connect() as connection:
+            await asyncio.wait_for(
+                connection.execute(text('SELECT 1')), settings.database_connect_timeout
+            )
+    except Exception:
+        # Counted by the breaker through the engine events.
+        return False
+    return True
+
+
+@router.get(
+    "/health",
+    summary="Service health",
+    description="Endpoint for load balancers and probes: 200 when the database is reachable, "
+                "503 otherwise. With `ping=false` it reports the breaker and the pool without "
+                "querying the database. While the breaker is open, it answers without querying.",
+    status_code=status.HTTP_200_OK,
+    response_model=HealthResponse,
+    responses={503: {"model": HealthResponse}},
+)
+async def get_health(
+    response: Response,
+    ping: bool = Query(True, description="Query the database"),
+) -> HealthResponse:
+    database = latency = None
+    if ping and database_breaker.allow():
+        start = time.perf_counter()
+        database = await _ping()
+        latency = time.perf_counter() - start
+    elif ping:
+        database = False
+
+    healthy = database is not False and database_breaker.state == database_breaker.CLOSED
+    if not healthy:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    pool = engine.pool
+    return HealthResponse(
+        status='ok' if healthy else 'unavailable',
+        database=database,
+        latency=latency,
+        breaker=BreakerResponse(
+            state=database_breaker.state,
+            failures=database_breaker.failures,
+            retry_after=database_breaker.retry_after(),
+        ),
+        pool=PoolResponse(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+        ),
+    )
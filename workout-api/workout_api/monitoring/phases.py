@@ -0,0 +1,49 @@
+'''
+Per-request phase timings, kept in a context variable.
+
+Only requests run under `ProfilingMiddleware` (see `profiling.py`) carry a
+profile; elsewhere `phase` does nothing.
+'''
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+PHASES = ('pool', 'sql', 'selectin', 'endpoint', 'validation', 'json')
+
+
+class RequestProfile:
+    '''
+    Seconds spent by a request in each phase.
+    '''
+
+    def __init__(self) -> None:
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.endpoint_end: Optional[float] = None
+
+    def add(self, phase: str, elapsed: float) -> None:
+        self.phases[phase] += elapsed
+
+
+_profile: ContextVar[Optional[RequestProfile]] = ContextVar('request_profile', default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _profile.get()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    '''
+    Add the time spent in the block to the phase `name` of the current request.
+    '''
+    profile = _profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - start)
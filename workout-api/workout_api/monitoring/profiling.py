@@ -0,0 +1,193 @@
+'''
+Opt-in request profiling.
+
+When `PROFILING_SAMPLE_RATE` or `PROFILING_SLOW_THRESHOLD` is set, every
+request is split into phases: pool wait, SQL, `selectin` loads, endpoint
+code, response validation and JSON encoding, plus whatever is left
+(middleware, routing, request parsing). This only costs a few clock reads.
+
+A sampled request, or one slower than the threshold, is written to
+`PROFILING_DIR` in the folded format read by flamegraph.pl, speedscope and
+most flamegraph viewers. Sampled requests are also profiled with pyinstrument
+when it is installed; its asyncio mode attributes awaited time to the
+coroutine that awaited it, and its call stacks go to a `.stacks.folded` file
+next to the phases.
+'''
+
+import asyncio
+import functools
+import random
+import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from workout_api.configs.database import engine
+from workout_api.configs.settings import settings
+from workout_api.monitoring.phases import RequestProfile, _profile
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+
+def profiling_enabled() -> bool:
+    return bool(settings.profiling_sample_rate or settings.profiling_slow_threshold)
+
+
+@event.listens_for(engine.sync_engine, 'before_cursor_execute')
+def _start_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _profile.get() is not None:
+        context._profile_start = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, 'after_cursor_execute')
+def _end_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _profile.get()
+    start = getattr(context, '_profile_start', None)
+    if profile is not None and start is not None:
+        name = context.execution_options.get('profile_phase', 'sql')
+        profile.add(name, time.perf_counter() - start)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _tag_relationship_load(execute_state: ORMExecuteState) -> None:
+    if _profile.get() is not None and execute_state.is_relationship_load:
+        execute_state.update_execution_options(profile_phase='selectin')
+
+
+def _timed_endpoint(call):
+    @functools.wraps(call)
+    async def endpoint(*args, **kwargs):
+        profile = _profile.get()
+        if profile is None:
+            return await call(*args, **kwargs)
+        start = time.perf_counter()
+        sql_before = profile.phases['pool'] + profile.phases['sql'] + profile.phases['selectin']
+        try:
+            return await call(*args, **kwargs)
+        finally:
+            profile.endpoint_end = time.perf_counter()
+            sql_after = profile.phases['pool'] + profile.phases['sql'] + profile.phases['selectin']
+            # Database time inside the endpoint is already in its own phases.
+            profile.add('endpoint', profile.endpoint_end - start - (sql_after - sql_before))
+    return endpoint
+
+
+class ProfiledJSONResponse(JSONResponse):
+    '''
+    JSON response timing its encoding, and the response validation before it.
+
+    Use it as the default response class while profiling.
+    '''
+
+    def render(self, content: Any) -> bytes:
+        profile = _profile.get()
+        if profile is None:
+            return super().render(content)
+        start = time.perf_counter()
+        if profile.endpoint_end is not None:
+            profile.add('validation', start - profile.endpoint_end)
+            profile.endpoint_end = None
+        try:
+            return super().render(content)
+        finally:
+            profile.add('json', time.perf_counter() - start)
+
+
+def instrument(app: FastAPI) -> None:
+    '''
+    Time the endpoints of every route of `app`. Call it after the routers
+    are included.
+    '''
+    for route in app.routes:
+        if isinstance(route, APIRoute) and asyncio.iscoroutinefunction(route.dependant.call):
+            route.dependant.call = _timed_endpoint(route.dependant.call)
+
+
+def _folded_frames(frame, stack: str, lines: list[str]) -> None:
+    name = f'{stack};{frame.function} ({frame.file_path_short}:{frame.line_no})'
+    self_time = int(frame.total_self_time * 1_000_000)
+    if self_time:
+        lines.append(f'{name} {self_time}')
+    for child in frame.children:
+        _folded_frames(child, name, lines)
+
+
+class ProfilingMiddleware:
+    '''
+    ASGI middleware profiling the requests picked by sampling or latency.
+    '''
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.directory = Path(settings.profiling_dir)
+        self._written: deque[Path] = deque()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _profile.set(profile)
+        sampled = random.random() < settings.profiling_sample_rate
+        profiler = None
+        if sampled and Profiler is not None:
+            profiler = Profiler(interval=settings.profiling_interval, async_mode='enabled')
+            profiler.start()
+
+        status_code = 0
+
+        async def send_status(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _profile.reset(token)
+            if profiler is not None:
+                profiler.stop()
+
+            slow = bool(settings.profiling_slow_threshold) and elapsed >= settings.profiling_slow_threshold
+            if sampled or slow:
+                await asyncio.to_thread(self._write, scope, status_code, elapsed, profile, profiler)
+
+    def _write(self, scope: Scope, status_code: int, elapsed: float, profile: RequestProfile, profiler) -> None:
+        root = f"{scope['method']} {scope['path']}"
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', scope['path']).strip('_') or 'root'
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+        name = f"{stamp}-{scope['method']}-{slug}-{status_code}-{int(elapsed * 1000)}ms"
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        phases = [*profile.phases.items(), ('other', elapsed - sum(profile.phases.values()))]
+        files = {f'{name}.folded': [
+            f'{root};{phase} {int(seconds * 1_000_000)}' for phase, seconds in phases if seconds > 0
+        ]}
+        if profiler is not None and profiler.last_session is not None:
+            frame = profiler.last_session.root_frame()
+            if frame is not None:
+                files[f'{name}.stacks.folded'] = stacks = []
+                _folded_frames(frame, root, stacks)
+
+        for file_name, lines in files.items():
+            path = self.directory / file_name
+            path.write_text('\n'.join(lines) + '\n')
+            self._written.append(path)
+        while len(self._written) > settings.profiling_max_files:
+            self._written.popleft().unlink(missing_ok=True)
@@ -0,0 +1,62 @@
+'''
+Schemas for runtime metrics.
+'''
+
+from typing import Annotated, Literal, Optional
+from pydantic import Field
+
+from workout_api.contrib.schemas import BaseSchema
+
+
+class QueryCacheResponse(BaseSchema):
+    '''
+    Schema for the compiled statement cache counters.
+    '''
+    hits: Annotated[int, Field(description="Statements compiled from the cache", example=980)]
+    misses: Annotated[int, Field(description="Statements compiled and added to the cache", example=20)]
+    uncached: Annotated[int, Field(description="Statements that cannot be cached", example=3)]
+    hit_ratio: Annotated[float, Field(description="hits / (hits + misses)", example=0.98)]
+    query_cache_size: Annotated[int, Field(description="Size of the compiled statement cache", example=1200)]
+    statement_cache_size: Annotated[
+        int,
+        Field(description="Size of each connection's prepared statement cache", example=500)
+    ]
+
+
+class BreakerResponse(BaseSchema):
+    '''
+    Schema for the state of the database circuit breaker.
+    '''
+    state: Annotated[
+        Literal['closed', 'open', 'half_open'],
+        Field(description="closed, open (failing fast) or half_open (probing)", example="closed")
+    ]
+    failures: Annotated[int, Field(description="Connection failures in a row", example=0)]
+    retry_after: Annotated[float, Field(description="Seconds until the next probe", example=0.0)]
+
+
+class PoolResponse(BaseSchema):
+    '''
+    Schema for the connection pool of this process.
+    '''
+    size: Annotated[int, Field(description="Connections kept open", example=5)]
+    checked_in: Annotated[int, Field(description="Idle connections", example=4)]
+    checked_out: Annotated[int, Field(description="Connections in use", example=1)]
+    overflow: Annotated[int, Field(description="Connections open beyond the size", example=0)]
+
+
+class HealthResponse(BaseSchema):
+    '''
+    Schema for the health of the service and its database.
+    '''
+    status: Annotated[Literal['ok', 'unavailable'], Field(example="ok")]
+    database: Annotated[
+        Optional[bool],
+        Field(description="Whether the database answered, null when not asked", example=True)
+    ]
+    latency: Annotated[
+        Optional[float],
+        Field(description="Seconds the database took to answer", example=0.002)
+    ]
+    breaker: BreakerResponse
+    pool: PoolResponse
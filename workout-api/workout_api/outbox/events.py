@@ -0,0 +1,82 @@
+'''
+Helpers to write and read change events from the outbox.
+'''
+
+import asyncio
+from typing import Any
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from workout_api.configs.database import read_engine
+from workout_api.configs.settings import settings
+from workout_api.outbox.models import OutboxModel
+from workout_api.outbox.schemas import ChangeEvent, ChangeFeed
+
+# Advisory lock taken by every transaction that writes to the outbox. It is
+# held from the event insert until commit, so cursors become visible in order
+# and a consumer never skips an event committed behind a later one.
+OUTBOX_LOCK_KEY = 7_260_026
+
+
+async def add_event(
+    db_session: AsyncSession,
+    aggregate_type: str,
+    aggregate_id: Any,
+    event_type: str,
+    payload: dict[str, Any],
+) -> None:
+    '''
+    Add a change event to the current transaction. Call it right before commit.
+    '''
+    await db_session.execute(select(func.pg_advisory_xact_lock(OUTBOX_LOCK_KEY)))
+    db_session.add(OutboxModel(
+        id=uuid4(),
+        aggregate_type=aggregate_type,
+        aggregate_id=aggregate_id,
+        event_type=f'{aggregate_type}.{event_type}',
+        payload=jsonable_encoder(payload),
+    ))
+
+
+async def read_feed(
+    aggregate_type: str,
+    since: int,
+    limit: int,
+    wait: float = 0,
+) -> ChangeFeed:
+    '''
+    Read the events after `since`, waiting up to `wait` seconds for new ones.
+
+    Each poll borrows its own connection, so a waiting request does not hold
+    one from the pool.
+    '''
+    query = (
+        select(
+            OutboxModel.pk_id.label('cursor'),
+            OutboxModel.id,
+            OutboxModel.event_type,
+            OutboxModel.aggregate_id,
+            OutboxModel.payload,
+            OutboxModel.created_at,
+        )
+        .filter(OutboxModel.aggregate_type == aggregate_type, OutboxModel.pk_id > since)
+        .order_by(OutboxModel.pk_id)
+        .limit(limit)
+    )
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+
+    while True:
+        async with read_engine.connect() as connection:
+            events = [
+                ChangeEvent.model_validate(dict(event))
+                for event in (await connection.execute(query)).mappings()
+            ]
+        if events or loop.time() >= deadline:
+            break
+        await asyncio.sleep(min(settings.outbox_poll_interval, deadline - loop.time()))
+
+    return ChangeFeed(events=events, cursor=events[-1].cursor if events else since)
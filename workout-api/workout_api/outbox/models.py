@@ -0,0 +1,56 @@
+'''
+Model for the transactional outbox of change events.
+'''
+
+from datetime import datetime, timezone
+from sqlalchemy import BigInteger, DateTime, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
+
+from workout_api.contrib.models import BaseModel
+
+
+class OutboxModel(BaseModel):
+    '''
+    SQLAlchemy model for change events written alongside the data they describe.
+
+    `pk_id` is the cursor served by the change feeds: it is assigned while the
+    outbox lock is held, so it grows in commit order.
+    '''
+
+    __tablename__ = 'outbox'
+    __table_args__ = (
+        Index('ix_outbox_aggregate_type_pk_id', 'aggregate_type', 'pk_id'),
+    )
+
+    pk_id: Mapped[int] = mapped_column(
+        BigInteger,
+        primary_key=True,
+        autoincrement=True
+    )
+
+    aggregate_type: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False
+    )
+
+    aggregate_id: Mapped[PG_UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        nullable=False
+    )
+
+    event_type: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False
+    )
+
+    payload: Mapped[dict] = mapped_column(
+        JSONB,
+        nullable=False
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc)
+    )
@@ -0,0 +1,71 @@
+'''
+Schemas for the change event feeds.
+'''
+
+from datetime import datetime
+from typing import Annotated, Any
+from pydantic import UUID4, Field
+
+from workout_api.contrib.schemas import BaseSchema
+
+
+class ChangeEvent(BaseSchema):
+    '''
+    Schema for a single change event.
+    '''
+    cursor: Annotated[
+        int,
+        Field(
+            description="Position of the event in the feed",
+            example=42
+        )
+    ]
+    id: Annotated[
+        UUID4,
+        Field(
+            description="The unique identifier of the event",
+            example="3fa85f64-5717-4562-b3fc-2c963f66afa6"
+        )
+    ]
+    event_type: Annotated[
+        str,
+        Field(
+            description="The kind of change (created, updated, ...)",
+            example="athlete.updated"
+        )
+    ]
+    aggregate_id: Annotated[
+        UUID4,
+        Field(
+            description="The unique identifier of the changed record",
+            example="3fa85f64-5717-4562-b3fc-2c963f66afa6"
+        )
+    ]
+    payload: Annotated[
+        dict[str, Any],
+        Field(
+            description="The changed fields",
+            example={"weight": 72.3}
+        )
+    ]
+    created_at: Annotated[
+        datetime,
+        Field(
+            description="The timestamp when the change was recorded",
+            example="2023-10-05T14:48:00.000Z"
+        )
+    ]
+
+
+class ChangeFeed(BaseSchema):
+    '''
+    Schema for a page of the change feed.
+    '''
+    events: list[ChangeEvent]
+    cursor: Annotated[
+        int,
+        Field(
+            description="Cursor to send as `since` on the next request",
+            example=42
+        )
+    ]
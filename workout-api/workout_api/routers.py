@@ -2,7 +2,12 @@ from fastapi import APIRouter
 
 from workout_api.athlete.controller import router as athlete_router
 from workout_api.category.controller import router as category_router
+from workout_api.composite.controller import router as composite_router
+from workout_api.jobs.controller import router as jobs_router
+from workout_api.monitoring.controller import router as monitoring_router
+from workout_api.monitoring.health import router as health_router
 from workout_api.training_center.controller import router as training_center_router
+from workout_api.workout_result.controller import router as workout_result_router
 
 api_router = APIRouter()
 
@@ -22,4 +27,33 @@ api_router.include_router(
     training_center_router,
     prefix="/training-centers",
     tags=["training centers"],
-)
\ No newline at end of file
+)
+
+api_router.include_router(
+    workout_result_router,
+    prefix="/workout-results",
+    tags=["workout results"],
+)
+
+api_router.include_router(
+    composite_router,
+    prefix="/composite",
+    tags=["composite"],
+)
+
+api_router.include_router(
+    jobs_router,
+    prefix="/jobs",
+    tags=["jobs"],
+)
+
+api_router.include_router(
+    monitoring_router,
+    prefix="/monitoring",
+    tags=["monitoring"],
+)
+
+api_router.include_router(
+    health_router,
+    tags=["health"],
+)
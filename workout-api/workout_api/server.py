@@ -0,0 +1,136 @@
+'''
+Production entry point:
+
+    python -m workout_api.server
+
+Runs `SERVER_WORKERS` processes (one per CPU by default) behind one socket,
+on uvloop and httptools when they are installed. Each process opens at most
+its share of `DATABASE_MAX_CONNECTIONS` (see `configs/database.py`).
+
+On SIGTERM or SIGINT the workers stop accepting connections, give in-flight
+requests up to `SERVER_GRACEFUL_TIMEOUT` seconds and close their pool.
+
+With `SERVER_PRELOAD`, gunicorn (when installed) imports the app once and
+forks the workers from it, so they share the pages of the loaded code
+instead of each importing it. Otherwise uvicorn spawns the workers, each
+importing the app on its own.
+'''
+
+import gc
+import logging
+import os
+from importlib.util import find_spec
+
+import uvicorn
+
+from workout_api.configs.settings import settings
+
+logger = logging.getLogger('workout_api.server')
+
+APP = 'workout_api.main:app'
+
+
+def worker_count() -> int:
+    return settings.server_workers or os.cpu_count() or 1
+
+
+def _loop() -> str:
+    return 'uvloop' if find_spec('uvloop') else 'asyncio'
+
+
+def _http() -> str:
+    return 'httptools' if find_spec('httptools') else 'h11'
+
+
+def run_uvicorn(workers: int) -> None:
+    uvicorn.run(
+        APP,
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=workers,
+        loop=_loop(),
+        http=_http(),
+        backlog=settings.server_backlog,
+        timeout_keep_alive=settings.server_keepalive,
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+        access_log=settings.server_access_log,
+        lifespan='on',
+    )
+
+
+def run_gunicorn(workers: int) -> None:
+    from gunicorn.app.base import BaseApplication
+    from uvicorn.workers import UvicornWorker
+
+    class Worker(UvicornWorker):
+        CONFIG_KWARGS = {
+            'loop': _loop(),
+            'http': _http(),
+            'lifespan': 'on',
+            'timeout_keep_alive': settings.server_keepalive,
+            'timeout_graceful_shutdown': settings.server_graceful_timeout,
+            'access_log': settings.server_access_log,
+        }
+
+    def when_ready(server) -> None:
+        # Objects of the loaded app are never collected again, so the
+        # collector does not touch, and copy, the pages the workers share.
+        gc.collect()
+        gc.freeze()
+
+    def post_fork(server, worker) -> None:
+        # Connections must not cross a fork: forget any the master opened,
+        # without closing them, which would close them for the master too.
+        from workout_api.configs.database import engine
+        engine.sync_engine.dispose(close=False)
+
+    class Application(BaseApplication):
+        def load_config(self) -> None:
+            options = {
+                'bind': f'{settings.server_host}:{settings.server_port}',
+                'workers': workers,
+                'worker_class': Worker,
+                'preload_app': True,
+                'backlog': settings.server_backlog,
+                'keepalive': settings.server_keepalive,
+                'graceful_timeout': settings.server_graceful_timeout,
+                'when_ready': when_ready,
+                'post_fork': post_fork,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from workout_api.main import app
+            return app
+
+    Application().run()
+
+
+def main() -> None:
+    workers = worker_count()
+    # Read by the workers to size their pools: spawned ones import the
+    # settings again, forked ones inherit this process's settings.
+    os.environ['SERVER_WORKERS'] = str(workers)
+    settings.server_workers = workers
+
+    if settings.database_max_connections and settings.database_max_connections < workers:
+        raise SystemExit(
+            f'DATABASE_MAX_CONNECTIONS={settings.database_max_connections} is less than one '
+            f'connection for each of {workers} workers'
+        )
+
+    logging.basicConfig(level=logging.INFO)
+    preload = settings.server_preload and find_spec('gunicorn') is not None
+    if settings.server_preload and not preload:
+        logger.warning('SERVER_PRELOAD needs gunicorn, which is not installed: workers import the app')
+    logger.info('Serving %s with %d workers on %s and %s%s', APP, workers, _loop(), _http(),
+                ', preloaded' if preload else '')
+    if preload:
+        run_gunicorn(workers)
+    else:
+        run_uvicorn(workers)
+
+
+if __name__ == '__main__':
+    main()
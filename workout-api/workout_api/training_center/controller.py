@@ -1,12 +1,16 @@
+from datetime import datetime, timezone
 from uuid import uuid4
-from fastapi import APIRouter, Body, HTTPException, status
+from fastapi import APIRouter, Body, HTTPException, Request, Response, status
 from pydantic import UUID4
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
+from workout_api.athlete.models import AthleteModel
 from workout_api.training_center.models import TrainingCenterModel
+from workout_api.training_center.queries import training_center_by_id, training_center_detail
 from workout_api.training_center.schemas import TrainingCenterPost, TrainingCenterResponse
-from workout_api.contrib.dependencies import DatabaseDependency
+from workout_api.contrib.conditional import check_etag, fingerprint
+from workout_api.contrib.dependencies import DatabaseDependency, ReadConnectionDependency
 
 router = APIRouter()
 
@@ -41,18 +45,26 @@ async def create_training_center(
 @router.get(
     "/",
     summary="List all training centers",
-    description="Endpoint to list all training centers in the system.",
+    description="Endpoint to list all training centers in the system. "
+                "Sends a weak `ETag` and answers `If-None-Match` with 304 when unchanged.",
     status_code=status.HTTP_200_OK,
     response_model=list[TrainingCenterResponse]
 )
 async def get_all(
-    db_session: DatabaseDependency,
+    db_connection: ReadConnectionDependency,
+    request: Request,
+    response: Response,
 ) -> list[TrainingCenterResponse]:
 
+    await check_etag(
+        request, response, db_connection,
+        fingerprint(TrainingCenterModel.updated_at, TrainingCenterModel.deleted_at.is_(None))
+    )
+
     training_centers = (
-        (await db_session.execute(
-            select(TrainingCenterModel)
-        )).scalars().all()
+        (await db_connection.execute(
+            training_center_detail
+        )).mappings().all()
     )
 
     return training_centers
@@ -66,8 +78,33 @@ async def get_all(
 )
 async def get_by_id(
     training_center_id: UUID4,
-    db_session: DatabaseDependency,
+    db_connection: ReadConnectionDependency,
 ) -> TrainingCenterResponse:
+    training_center = (
+        (await db_connection.execute(
+            training_center_by_id(training_center_id)
+        )).mappings().first()
+    )
+
+    if not training_center:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Training center not found with id: {training_center_id}"
+        )
+    return training_center
+
+
+@router.delete(
+    "/{training_center_id}",
+    summary="Delete a training center by ID",
+    description="Endpoint to soft delete a training center by its ID. "
+                "A training center with athletes still assigned to it cannot be deleted.",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def delete_training_center(
+    training_center_id: UUID4,
+    db_session: DatabaseDependency,
+) -> None:
     training_center = (
         (await db_session.execute(
             select(TrainingCenterModel).filter_by(id=training_center_id)
@@ -79,4 +116,17 @@ async def get_by_id(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Training center not found with id: {training_center_id}"
         )
-    return training_center
\ No newline at end of file
+
+    has_athletes = (
+        await db_session.execute(
+            select(AthleteModel.pk_id).filter_by(training_center_id=training_center.pk_id).limit(1)
+    )).first()
+
+    if has_athletes:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Training center {training_center.name} still has athletes assigned."
+        )
+
+    training_center.deleted_at = datetime.now(timezone.utc)
+    await db_session.commit()
@@ -1,16 +1,19 @@
-from workout_api.contrib.models import BaseModel
+from workout_api.contrib.models import BaseModel, SoftDeleteMixin
 
 from datetime import datetime, timezone
-from sqlalchemy import ForeignKey, Integer, String, DateTime
+from sqlalchemy import ForeignKey, Index, Integer, String, DateTime, text
 from sqlalchemy.orm import  Mapped, mapped_column, relationship
 
 
-class TrainingCenterModel(BaseModel):
+class TrainingCenterModel(BaseModel, SoftDeleteMixin):
     '''
     SQLAlchemy model for category data.
     '''
 
     __tablename__ = 'training_centers'
+    __table_args__ = (
+        Index('ix_training_centers_name_live', 'name', unique=True, postgresql_where=text('deleted_at IS NULL')),
+    )
 
     pk_id: Mapped[int] = mapped_column(
         Integer, 
@@ -20,7 +23,6 @@ class TrainingCenterModel(BaseModel):
 
     name: Mapped[str] = mapped_column(
         String(50),
-        unique=True,
         nullable=False
     )
 
@@ -0,0 +1,33 @@
+'''
+Statements for the training center queries.
+'''
+
+from sqlalchemy import StatementLambdaElement, lambda_stmt, select
+
+from workout_api.training_center.models import TrainingCenterModel
+
+
+# Columns of `TrainingCenterResponse`.
+training_center_detail = select(
+    TrainingCenterModel.id,
+    TrainingCenterModel.created_at,
+    TrainingCenterModel.updated_at,
+    TrainingCenterModel.name,
+    TrainingCenterModel.address,
+    TrainingCenterModel.property_name,
+).where(TrainingCenterModel.deleted_at.is_(None))
+
+
+def training_center_by_id(training_center_id) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: training_center_detail.where(TrainingCenterModel.id == training_center_id)
+    )
+
+
+def training_center_pk_by_name(name: str) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(TrainingCenterModel.pk_id).where(
+            TrainingCenterModel.name == name,
+            TrainingCenterModel.deleted_at.is_(None)
+        )
+    )
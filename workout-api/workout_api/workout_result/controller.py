@@ -0,0 +1,236 @@
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
+from fastapi import APIRouter, Body, HTTPException, Query, status
+from fastapi_pagination import add_pagination
+from pydantic import UUID4
+from sqlalchemy import insert
+
+from workout_api.athlete.models import AthleteModel
+from workout_api.category.queries import category_pk_by_name
+from workout_api.configs.settings import settings
+from workout_api.contrib.dependencies import DatabaseDependency, ReadConnectionDependency
+from workout_api.contrib.pagination import CountStrategy, CountedPage, paginate
+from workout_api.contrib.timestamps import as_utc
+from workout_api.training_center.queries import training_center_pk_by_name
+from workout_api.workout_result.leaderboards import ranks_of, top
+from workout_api.workout_result.models import WorkoutResultModel
+from workout_api.workout_result.queries import athlete_pk_by_id, athlete_refs, leaderboard, result_detail
+from workout_api.workout_result.schemas import (
+    LeaderboardEntry, LeaderboardRank, WorkoutResultBatch, WorkoutResultBatchResponse, WorkoutResultResponse
+)
+
+router = APIRouter()
+
+
+@router.post(
+    "/",
+    summary="Log workout results",
+    description="Endpoint to log a batch of workout results in a single insert.",
+    status_code=status.HTTP_201_CREATED,
+    response_model=WorkoutResultBatchResponse,
+)
+async def create_results(
+    db_session: DatabaseDependency,
+    batch: WorkoutResultBatch = Body(...)
+) -> WorkoutResultBatchResponse:
+    athlete_ids = {result.athlete_id for result in batch.results}
+    athletes = {
+        athlete.id: athlete
+        for athlete in (
+            await db_session.execute(athlete_refs.where(AthleteModel.id.in_(athlete_ids)))
+        ).all()
+    }
+
+    if missing := athlete_ids - athletes.keys():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Athletes not found: {', '.join(sorted(map(str, missing)))}"
+        )
+
+    await db_session.execute(
+        insert(WorkoutResultModel),
+        [
+            result.model_dump(exclude={'athlete_id'}) | {
+                'athlete_id': athletes[result.athlete_id].pk_id,
+                'category_id': athletes[result.athlete_id].category_id,
+                'training_center_id': athletes[result.athlete_id].training_center_id,
+            }
+            for result in batch.results
+        ]
+    )
+    await db_session.commit()
+
+    return WorkoutResultBatchResponse(inserted=len(batch.results))
+
+
+async def _scope_ids(
+    db_connection: ReadConnectionDependency,
+    category_name: Optional[str],
+    training_center_name: Optional[str],
+) -> tuple[Optional[int], Optional[int]]:
+    category_id = None
+    if category_name:
+        category_id = (await db_connection.execute(category_pk_by_name(category_name))).scalar()
+        if not category_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Category not found: {category_name}"
+            )
+
+    training_center_id = None
+    if training_center_name:
+        training_center_id = (
+            await db_connection.execute(training_center_pk_by_name(training_center_name))
+        ).scalar()
+        if not training_center_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Training Center not found: {training_center_name}"
+            )
+
+    return category_id, training_center_id
+
+
+@router.get(
+    "/leaderboard",
+    summary="Leaderboard of a workout",
+    description="Endpoint to rank the athletes by their best score on a workout in a period, "
+                "optionally within a category and/or training center, computed from the results "
+                "when asked, so it is always current. For all-time rankings use "
+                "`/leaderboards/top`, which reads them precomputed. "
+                "The period defaults to the last 30 days and may span at most "
+                "`RESULTS_LEADERBOARD_MAX_DAYS` days; bounds without an offset are in UTC.",
+    status_code=status.HTTP_200_OK,
+    response_model=list[LeaderboardEntry],
+)
+async def get_leaderboard(
+    db_connection: ReadConnectionDependency,
+    workout: str,
+    category_name: Optional[str] = None,
+    training_center_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    best: Literal['max', 'min'] = 'max',
+    limit: int = Query(10, ge=1, le=100),
+) -> list[LeaderboardEntry]:
+    until = as_utc(until) or datetime.now(timezone.utc)
+    since = as_utc(since) or until - timedelta(days=30)
+
+    if not since < until <= since + timedelta(days=settings.results_leaderboard_max_days):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The period must end after it starts and span at most "
+                   f"{settings.results_leaderboard_max_days} days"
+        )
+
+    category_id, training_center_id = await _scope_ids(
+        db_connection, category_name, training_center_name
+    )
+
+    return (
+        await db_connection.execute(
+            leaderboard(workout, since, until, best, limit, category_id, training_center_id)
+        )
+    ).mappings().all()
+
+
+@router.get(
+    "/leaderboards/top",
+    summary="Top of a precomputed leaderboard",
+    description="Endpoint to read the first athletes of the all-time leaderboard of a workout "
+                "in a category or in a training center (give exactly one). "
+                "Leaderboards are precomputed and trail new results by up to "
+                "`LEADERBOARD_REFRESH_INTERVAL` seconds. For a period, or for both a category and "
+                "a training center, use `/leaderboard`.",
+    status_code=status.HTTP_200_OK,
+    response_model=list[LeaderboardEntry],
+)
+async def get_leaderboard_top(
+    db_connection: ReadConnectionDependency,
+    workout: str,
+    category_name: Optional[str] = None,
+    training_center_name: Optional[str] = None,
+    best: Literal['max', 'min'] = 'max',
+    limit: int = Query(10, ge=1, le=100),
+) -> list[LeaderboardEntry]:
+    if bool(category_name) == bool(training_center_name):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give either category_name or training_center_name"
+        )
+
+    category_id, training_center_id = await _scope_ids(
+        db_connection, category_name, training_center_name
+    )
+    statement = (
+        top('category', category_id, workout, best, limit) if category_id
+        else top('training_center', training_center_id, workout, best, limit)
+    )
+    return (await db_connection.execute(statement)).mappings().all()
+
+
+@router.get(
+    "/leaderboards/athletes/{athlete_id}",
+    summary="Ranks of an athlete",
+    description="Endpoint to read the position of an athlete on the precomputed leaderboards "
+                "of a workout, in its categories and training centers; empty when the athlete "
+                "has no result on it yet.",
+    status_code=status.HTTP_200_OK,
+    response_model=list[LeaderboardRank],
+)
+async def get_leaderboard_ranks(
+    athlete_id: UUID4,
+    db_connection: ReadConnectionDependency,
+    workout: str,
+    best: Literal['max', 'min'] = 'max',
+) -> list[LeaderboardRank]:
+    ranks = (await db_connection.execute(ranks_of(athlete_id, workout, best))).mappings().all()
+    # Only without ranks: an athlete on a leaderboard exists.
+    if not ranks and not (await db_connection.execute(athlete_pk_by_id(athlete_id))).scalar():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ID Athlete not found: {athlete_id}"
+        )
+    return ranks
+
+
+@router.get(
+    "/athletes/{athlete_id}",
+    summary="Workout results of an athlete",
+    description="Endpoint to retrieve the results of an athlete, oldest first, "
+                "optionally within a period and for a single workout.",
+    status_code=status.HTTP_200_OK,
+    response_model=CountedPage[WorkoutResultResponse],
+)
+async def get_by_athlete(
+    athlete_id: UUID4,
+    db_connection: ReadConnectionDependency,
+    workout: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    count: CountStrategy = CountStrategy.exact,
+) -> CountedPage[WorkoutResultResponse]:
+    athlete_pk = (await db_connection.execute(athlete_pk_by_id(athlete_id))).scalar()
+
+    if not athlete_pk:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ID Athlete not found: {athlete_id}"
+        )
+
+    filters = [WorkoutResultModel.athlete_id == athlete_pk]
+    if workout:
+        filters.append(WorkoutResultModel.workout == workout)
+    if since:
+        filters.append(WorkoutResultModel.performed_at >= as_utc(since))
+    if until:
+        filters.append(WorkoutResultModel.performed_at < as_utc(until))
+
+    return await paginate(
+        db_connection,
+        result_detail.where(*filters).order_by(WorkoutResultModel.performed_at, WorkoutResultModel.pk_id),
+        count
+    )
+
+
+add_pagination(router)
@@ -0,0 +1,149 @@
+'''
+Precomputed leaderboards, read from the `workout_leaderboards` materialized
+view (see the `add_workout_leaderboards` migration).
+
+The view holds every live athlete's best score per workout, already ranked
+within the category and the training center of the results, so a top N or a
+rank lookup is an index range scan. It is refreshed concurrently, so reads
+never block, on demand through the `leaderboard.refresh` job and every
+`LEADERBOARD_REFRESH_INTERVAL` seconds: every process checks as often, but
+skips the refresh when `view_refreshes` shows one within the interval, so
+the view is refreshed once per interval whatever the number of processes.
+
+The view only holds all-time bests, so it cannot answer the leaderboard of a
+period: `GET /workout-results/leaderboard` computes those from the results,
+bounded by `RESULTS_LEADERBOARD_MAX_DAYS`, and stays the one to use for them.
+'''
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, Literal
+
+from sqlalchemy import Select, column, func, select, table, text
+from sqlalchemy.dialects.postgresql import insert
+
+from workout_api.category.models import CategoryModel
+from workout_api.configs.database import engine
+from workout_api.configs.settings import settings
+from workout_api.jobs.worker import JobContext, job_handler
+from workout_api.training_center.models import TrainingCenterModel
+from workout_api.workout_result.models import view_refreshes
+
+logger = logging.getLogger(__name__)
+
+# Taken while refreshing, so the workers of every process refresh in turn.
+LEADERBOARD_LOCK_KEY = 7_260_037
+
+Scope = Literal['category', 'training_center']
+
+# Not part of the models' metadata, which would have autogenerate create it.
+workout_leaderboards = table(
+    'workout_leaderboards',
+    column('scope'),
+    column('scope_id'),
+    column('workout'),
+    column('athlete_id'),
+    column('name'),
+    column('high'),
+    column('low'),
+    column('high_rank'),
+    column('low_rank'),
+)
+
+_view = workout_leaderboards.c
+
+
+def top(scope: Scope, scope_id: int, workout: str, best: Literal['max', 'min'], limit: int) -> Select:
+    '''
+    First `limit` athletes of a leaderboard.
+    '''
+    rank, score = (_view.high_rank, _view.high) if best == 'max' else (_view.low_rank, _view.low)
+    return (
+        select(rank.label('rank'), _view.athlete_id, _view.name, score.label('score'))
+        .where(_view.scope == scope, _view.scope_id == scope_id, _view.workout == workout)
+        .order_by(rank)
+        .limit(limit)
+    )
+
+
+def ranks_of(athlete_id, workout: str, best: Literal['max', 'min']) -> Select:
+    '''
+    Position of an athlete on every leaderboard of `workout` it is on.
+    '''
+    rank, score = (_view.high_rank, _view.high) if best == 'max' else (_view.low_rank, _view.low)
+    return (
+        select(
+            _view.scope,
+            func.coalesce(CategoryModel.name, TrainingCenterModel.name).label('name'),
+            rank.label('rank'),
+            score.label('score'),
+        )
+        .outerjoin(CategoryModel, (_view.scope == 'category') & (CategoryModel.pk_id == _view.scope_id))
+        .outerjoin(
+            TrainingCenterModel,
+            (_view.scope == 'training_center') & (TrainingCenterModel.pk_id == _view.scope_id)
+        )
+        .where(_view.athlete_id == athlete_id, _view.workout == workout)
+        .order_by(_view.scope)
+    )
+
+
+async def refresh_leaderboards(unless_within: float = 0) -> bool:
+    '''
+    Refresh the view, unless another process is already at it or, with
+    `unless_within`, did it less than that many seconds ago.
+    '''
+    async with engine.begin() as connection:
+        if not await connection.scalar(select(func.pg_try_advisory_xact_lock(LEADERBOARD_LOCK_KEY))):
+            return False
+        if unless_within and await connection.scalar(
+            select(view_refreshes.c.refreshed_at > func.now() - timedelta(seconds=unless_within))
+            .where(view_refreshes.c.name == 'workout_leaderboards')
+        ):
+            return False
+        await connection.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY workout_leaderboards'))
+        # When this transaction started: the next check of this process,
+        # `interval` seconds after this one, does not skip its turn.
+        refreshed = insert(view_refreshes).values(name='workout_leaderboards', refreshed_at=func.now())
+        await connection.execute(refreshed.on_conflict_do_update(
+            index_elements=[view_refreshes.c.name], set_={'refreshed_at': refreshed.excluded.refreshed_at}
+        ))
+    return True
+
+
+@job_handler('leaderboard.refresh')
+async def refresh_job(context: JobContext, payload: dict[str, Any]) -> dict[str, Any]:
+    return {'refreshed': await refresh_leaderboards()}
+
+
+class LeaderboardRefresher:
+    '''
+    Task refreshing the view every `interval` seconds, unless a process
+    already did within the interval; 0 disables it.
+    '''
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._task = None
+
+    async def start(self) -> None:
+        if self.interval:
+            self._task = asyncio.create_task(self._refresh(), name='leaderboard-refresher')
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresh(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await refresh_leaderboards(unless_within=self.interval)
+            except Exception:
+                logger.exception('Could not refresh the leaderboards')
+
+
+leaderboard_refresher = LeaderboardRefresher(settings.leaderboard_refresh_interval)
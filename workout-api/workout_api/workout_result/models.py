@@ -0,0 +1,96 @@
+'''
+Model for the workout results logged by the athletes.
+'''
+
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, Index, Integer, String, Table
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from workout_api.athlete.models import ATHLETES_PARTITIONED
+from workout_api.contrib.models import BaseModel
+
+
+class WorkoutResultModel(BaseModel):
+    '''
+    SQLAlchemy model for a workout result.
+
+    The table is append only: rows are inserted in batches and never updated,
+    so they land in roughly `performed_at` order and a BRIN index prunes time
+    ranges at a tiny fraction of a btree's size. The athlete's category and
+    training center are copied at logging time, so leaderboards read this
+    table alone. The athlete foreign key needs `athletes.pk_id` to be unique
+    on its own, which it is not when the table is partitioned.
+    '''
+
+    __tablename__ = 'workout_results'
+    __table_args__ = (
+        Index('ix_workout_results_performed_at_brin', 'performed_at', postgresql_using='brin'),
+        Index('ix_workout_results_athlete_id_performed_at', 'athlete_id', 'performed_at'),
+    )
+
+    # No index on `id`: results are looked up by athlete and time only.
+    id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        default=uuid.uuid4,
+        nullable=False
+    )
+
+    pk_id: Mapped[int] = mapped_column(
+        BigInteger,
+        primary_key=True,
+        autoincrement=True
+    )
+
+    if ATHLETES_PARTITIONED:
+        athlete_id: Mapped[int] = mapped_column(
+            Integer,
+            nullable=False
+        )
+    else:
+        athlete_id: Mapped[int] = mapped_column(
+            ForeignKey('athletes.pk_id'),
+            nullable=False
+        )
+
+    category_id: Mapped[int] = mapped_column(
+        ForeignKey('categories.pk_id'),
+        nullable=False
+    )
+
+    training_center_id: Mapped[int] = mapped_column(
+        ForeignKey('training_centers.pk_id'),
+        nullable=False
+    )
+
+    workout: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False
+    )
+
+    score: Mapped[float] = mapped_column(
+        Float,
+        nullable=False
+    )
+
+    performed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc)
+    )
+
+
+# When each materialized view was last refreshed, so that the processes of
+# the app refresh it once per interval between them, not once each.
+view_refreshes = Table(
+    'view_refreshes',
+    BaseModel.metadata,
+    Column('name', String(63), primary_key=True),
+    Column('refreshed_at', DateTime(timezone=True), nullable=False),
+)
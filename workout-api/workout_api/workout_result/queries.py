@@ -0,0 +1,81 @@
+'''
+Statements for the workout result queries.
+
+Every query is bounded by athlete or by a `performed_at` range, so it reads
+through `ix_workout_results_athlete_id_performed_at` or the BRIN index
+instead of the whole table.
+'''
+
+from datetime import datetime
+from typing import Literal, Optional
+
+from sqlalchemy import Select, func, select
+
+from workout_api.athlete.models import AthleteModel
+from workout_api.workout_result.models import WorkoutResultModel
+
+# Columns of `WorkoutResultResponse`.
+result_detail = select(
+    WorkoutResultModel.id,
+    WorkoutResultModel.workout,
+    WorkoutResultModel.score,
+    WorkoutResultModel.performed_at,
+)
+
+# Columns copied from the athlete when a result is logged.
+athlete_refs = select(
+    AthleteModel.id,
+    AthleteModel.pk_id,
+    AthleteModel.category_id,
+    AthleteModel.training_center_id,
+).where(AthleteModel.deleted_at.is_(None))
+
+
+def athlete_pk_by_id(athlete_id) -> Select:
+    return select(AthleteModel.pk_id).where(AthleteModel.id == athlete_id, AthleteModel.deleted_at.is_(None))
+
+
+def leaderboard(
+    workout: str,
+    since: datetime,
+    until: datetime,
+    best: Literal['max', 'min'],
+    limit: int,
+    category_id: Optional[int] = None,
+    training_center_id: Optional[int] = None,
+) -> Select:
+    '''
+    Top `limit` live athletes by their best score on `workout` performed
+    between `since` (inclusive) and `until` (exclusive).
+    '''
+    criteria = [
+        WorkoutResultModel.workout == workout,
+        WorkoutResultModel.performed_at >= since,
+        WorkoutResultModel.performed_at < until,
+    ]
+    if category_id is not None:
+        criteria.append(WorkoutResultModel.category_id == category_id)
+    if training_center_id is not None:
+        criteria.append(WorkoutResultModel.training_center_id == training_center_id)
+
+    best_score = func.max if best == 'max' else func.min
+    scores = (
+        select(WorkoutResultModel.athlete_id, best_score(WorkoutResultModel.score).label('score'))
+        .where(*criteria)
+        .group_by(WorkoutResultModel.athlete_id)
+        .subquery()
+    )
+    order = scores.c.score.desc() if best == 'max' else scores.c.score.asc()
+
+    return (
+        select(
+            func.rank().over(order_by=order).label('rank'),
+            AthleteModel.id.label('athlete_id'),
+            AthleteModel.name,
+            scores.c.score,
+        )
+        .join(AthleteModel, AthleteModel.pk_id == scores.c.athlete_id)
+        .where(AthleteModel.deleted_at.is_(None))
+        .order_by(order, AthleteModel.pk_id)
+        .limit(limit)
+    )
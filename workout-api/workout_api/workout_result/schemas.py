@@ -0,0 +1,159 @@
+'''
+Schemas for workout result data.
+'''
+
+from datetime import datetime
+from typing import Annotated, Literal
+from pydantic import UUID4, Field
+
+from workout_api.configs.settings import settings
+from workout_api.contrib.schemas import BaseSchema
+
+
+class WorkoutResultBase(BaseSchema):
+    '''
+    Base schema for workout result data.
+    '''
+    workout: Annotated[
+        str,
+        Field(
+            description="The name of the workout",
+            example='Fran',
+            max_length=50
+        )
+    ]
+    score: Annotated[
+        float,
+        Field(
+            description="The score of the workout (reps, load, seconds, ...)",
+            example=185.0
+        )
+    ]
+    performed_at: Annotated[
+        datetime,
+        Field(
+            description="The timestamp when the workout was performed",
+            example="2023-10-05T07:30:00.000Z"
+        )
+    ]
+
+
+class WorkoutResultIn(WorkoutResultBase):
+    '''
+    Schema for a logged workout result.
+    '''
+    athlete_id: Annotated[
+        UUID4,
+        Field(
+            description="The unique identifier of the athlete",
+            example="3fa85f64-5717-4562-b3fc-2c963f66afa6"
+        )
+    ]
+
+
+class WorkoutResultBatch(BaseSchema):
+    '''
+    Schema for a batch of logged workout results.
+    '''
+    results: Annotated[
+        list[WorkoutResultIn],
+        Field(
+            description="The results to log",
+            min_length=1,
+            max_length=settings.results_batch_size
+        )
+    ]
+
+
+class WorkoutResultBatchResponse(BaseSchema):
+    '''
+    Schema for the outcome of a batch of workout results.
+    '''
+    inserted: Annotated[
+        int,
+        Field(
+            description="How many results were logged",
+            example=500
+        )
+    ]
+
+
+class WorkoutResultResponse(WorkoutResultBase):
+    '''
+    Schema for workout result response data.
+    '''
+    id: Annotated[
+        UUID4,
+        Field(
+            description="The unique identifier",
+            example="3fa85f64-5717-4562-b3fc-2c963f66afa6"
+        )
+    ]
+
+
+class LeaderboardEntry(BaseSchema):
+    '''
+    Schema for an athlete's position on a leaderboard.
+    '''
+    rank: Annotated[
+        int,
+        Field(
+            description="The position of the athlete; ties share it",
+            example=1
+        )
+    ]
+    athlete_id: Annotated[
+        UUID4,
+        Field(
+            description="The unique identifier of the athlete",
+            example="3fa85f64-5717-4562-b3fc-2c963f66afa6"
+        )
+    ]
+    name: Annotated[
+        str,
+        Field(
+            description="The athlete's full name",
+            example='Joao Silva Santos'
+        )
+    ]
+    score: Annotated[
+        float,
+        Field(
+            description="The best score of the athlete",
+            example=185.0
+        )
+    ]
+
+
+class LeaderboardRank(BaseSchema):
+    '''
+    Schema for an athlete's position on a precomputed leaderboard.
+    '''
+    scope: Annotated[
+        Literal['category', 'training_center'],
+        Field(
+            description="Whether the leaderboard is of a category or of a training center",
+            example='category'
+        )
+    ]
+    name: Annotated[
+        str,
+        Field(
+            description="The name of the category or training center",
+            example='Scaled'
+        )
+    ]
+    rank: Annotated[
+        int,
+        Field(
+            description="The position of the athlete; ties share it",
+            example=3
+        )
+    ]
+    score: Annotated[
+        float,
+        Field(
+            description="The best score of the athlete",
+            example=185.0
+        )
+    ]